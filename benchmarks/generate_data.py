@@ -0,0 +1,224 @@
+"""Генератор синтетических данных для нагрузочных тестов.
+
+Создаёт функции, конфигурации во всех окружениях, привязки функций к конфигурациям
+и историю версий и загружает их через COPY. Один и тот же --seed на любой машине
+даёт одинаковые данные, включая UUID, поэтому прогоны можно сравнивать между собой.
+
+Распределения задаются строкой:
+    fixed:N             ровно N
+    uniform:A:B         равномерно от A до B
+    normal:MEAN:STD     нормальное, обрезанное снизу нулём
+    pareto:ALPHA:MIN    длинный хвост: большинство около MIN, редкие большие значения
+
+    python benchmarks/generate_data.py --truncate --seed 42 \\
+        --features 100000 --configs 1000 \\
+        --features-per-config uniform:4000:6000 --versions-per-config pareto:1.2:20
+
+Нужен Postgres из настроек с применёнными миграциями.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+import asyncpg
+
+from database.models import Environment
+from src.config import settings
+
+CHUNK_SIZE = 100_000
+NAME_ALPHABET = string.ascii_lowercase + string.digits + "_"
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], int]:
+    kind, *params = spec.split(":")
+    values = [float(param) for param in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: int(values[0])
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.randint(int(values[0]), int(values[1]))
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0, round(rng.gauss(values[0], values[1])))
+    if kind == "pareto" and len(values) == 2:
+        return lambda rng: int(values[1] * rng.paretovariate(values[0]))
+    raise argparse.ArgumentTypeError(f"Invalid distribution '{spec}'")
+
+
+def make_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def make_name(rng: random.Random, prefix: str, index: int, length: int) -> str:
+    # Индекс в имени гарантирует уникальность, случайный хвост добирает длину
+    base = f"{prefix}_{index}_"
+    tail = max(0, min(length, 64) - len(base))
+    return base + "".join(rng.choices(NAME_ALPHABET, k=tail))
+
+
+def chunks(records: Iterator[tuple], size: int = CHUNK_SIZE) -> Iterator[list[tuple]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.name_length = args.name_length
+        self.feature_ids: list[uuid.UUID] = []
+        self.configs: list[tuple[uuid.UUID, datetime]] = []
+
+    def features(self) -> Iterator[tuple]:
+        for index in range(self.args.features):
+            feature_id = make_uuid(self.rng)
+            self.feature_ids.append(feature_id)
+            created_at = EPOCH + timedelta(minutes=index)
+            description = f"Synthetic feature {index}" if self.rng.random() < 0.7 else None
+            name = make_name(self.rng, "feature", index, self.name_length(self.rng))
+            yield feature_id, name, description, created_at, created_at
+
+    def feature_configs(self) -> Iterator[tuple]:
+        environments = [environment.name for environment in Environment]
+        for index in range(self.args.configs):
+            config_id = make_uuid(self.rng)
+            created_at = EPOCH + timedelta(hours=index)
+            self.configs.append((config_id, created_at))
+            name = make_name(self.rng, "config", index, self.name_length(self.rng))
+            is_active = self.rng.random() < self.args.active_ratio
+            environment = environments[index % len(environments)]
+            yield config_id, name, environment, None, is_active, created_at, created_at
+
+    def bindings(self) -> Iterator[tuple]:
+        population = range(len(self.feature_ids))
+        for config_id, created_at in self.configs:
+            count = min(self.args.features_per_config(self.rng), len(self.feature_ids))
+            for feature_index in self.rng.sample(population, count):
+                is_enabled = self.rng.random() < self.args.enabled_ratio
+                message = None if is_enabled or self.rng.random() < 0.8 else "Temporarily disabled"
+                yield (
+                    config_id,
+                    self.feature_ids[feature_index],
+                    is_enabled,
+                    self.rng.random() < 0.1,
+                    message,
+                    created_at,
+                )
+
+    def versions(self) -> Iterator[tuple]:
+        for config_id, created_at in self.configs:
+            count = max(1, self.args.versions_per_config(self.rng))
+            count = min(count, self.args.max_versions)
+            for number in range(1, count + 1):
+                changelog = "Initial version" if number == 1 else f"Change #{number}"
+                yield (
+                    config_id,
+                    number,
+                    changelog,
+                    "generator",
+                    created_at + timedelta(minutes=number),
+                )
+
+
+TABLES = {
+    "feature_flag": ("id", "name", "description", "created_at", "updated_at"),
+    "feature_config": (
+        "id",
+        "name",
+        "environment",
+        "description",
+        "is_active",
+        "created_at",
+        "updated_at",
+    ),
+    "feature_config_flag": (
+        "config_id",
+        "feature_id",
+        "is_enabled",
+        "is_free",
+        "disabled_message",
+        "created_at",
+    ),
+    "feature_config_version": (
+        "config_id",
+        "version_number",
+        "changelog",
+        "created_by",
+        "created_at",
+    ),
+}
+
+
+async def copy_table(connection, table: str, records: Iterator[tuple]) -> int:
+    started = time.perf_counter()
+    total = 0
+    for chunk in chunks(records):
+        await connection.copy_records_to_table(table, records=chunk, columns=TABLES[table])
+        total += len(chunk)
+    print(f"{table:<24} {total:>10} rows in {time.perf_counter() - started:.1f} s")
+    return total
+
+
+async def main(args):
+    connection = await asyncpg.connect(settings.db.sync_url)
+    try:
+        if args.truncate:
+            await connection.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+        if args.skip_fk_checks:
+            # Нужны права суперпользователя: триггеры внешних ключей не срабатывают
+            await connection.execute("SET session_replication_role = replica")
+
+        started = time.perf_counter()
+        generator = Generator(args)
+        async with connection.transaction():
+            # Порядок важен: привязки и версии ссылаются на уже созданные строки
+            await copy_table(connection, "feature_flag", generator.features())
+            await copy_table(connection, "feature_config", generator.feature_configs())
+            await copy_table(connection, "feature_config_flag", generator.bindings())
+            await copy_table(connection, "feature_config_version", generator.versions())
+
+        await connection.execute(f"ANALYZE {', '.join(TABLES)}")
+        print(f"Done in {time.perf_counter() - started:.1f} s (seed {args.seed})")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic data generator")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--features", type=int, default=100_000)
+    parser.add_argument("--configs", type=int, default=1_000)
+    parser.add_argument(
+        "--features-per-config", type=parse_distribution, default="uniform:4000:6000"
+    )
+    parser.add_argument("--versions-per-config", type=parse_distribution, default="pareto:1.2:20")
+    parser.add_argument("--max-versions", type=int, default=10_000)
+    parser.add_argument("--name-length", type=parse_distribution, default="uniform:12:40")
+    parser.add_argument("--active-ratio", type=float, default=0.8)
+    parser.add_argument("--enabled-ratio", type=float, default=0.5)
+    parser.add_argument("--truncate", action="store_true", help="Delete existing data first")
+    parser.add_argument(
+        "--skip-fk-checks",
+        action="store_true",
+        help="Skip foreign key triggers during COPY (superuser only)",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,346 @@
+"""Нагрузочный тест HTTP API на смеси запросов ботов и админки.
+
+Поднимает приложение через src/serve.py (или использует уже запущенное по --base-url),
+при необходимости наполняет БД через API и прогоняет смесь запросов на нескольких
+уровнях конкурентности. Результат - JSON с RPS и p50/p95/p99 по каждому сценарию.
+С --baseline результат сравнивается с сохранённым, и регрессия выше порога
+завершает прогон с кодом 1.
+
+    python benchmarks/load_test.py --concurrency 1,16,64 --duration 20 \\
+        --baseline benchmarks/results/baseline.json
+    python benchmarks/load_test.py --update-baseline --baseline benchmarks/results/baseline.json
+
+Нужен локальный Postgres из настроек с применёнными миграциями.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+API = "/api/v1"
+
+DEFAULT_MIX = "poll_config=70,flag_by_name=15,list_versions=10,toggle=5"
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Dataset:
+    """Идентификаторы, по которым ходят сценарии"""
+
+    def __init__(self, configs: list[str], flag_names: list[str], bindings: list[tuple]):
+        self.configs = configs
+        self.flag_names = flag_names
+        self.bindings = bindings
+
+    @classmethod
+    async def discover(cls, client: httpx.AsyncClient, bindings_from: int = 50) -> "Dataset":
+        configs = (await client.get(f"{API}/feature-configs/", params={"limit": 1000})).json()
+        flags = (await client.get(f"{API}/feature-flags/", params={"limit": 1000})).json()
+        bindings = []
+        for config in configs[:bindings_from]:
+            response = await client.get(f"{API}/feature-configs/{config['id']}/features")
+            bindings.extend(
+                (config["id"], feature["feature_id"], feature["is_enabled"])
+                for feature in response.json()
+            )
+        if not configs or not flags:
+            raise SystemExit("No data to benchmark: seed the database or run with --seed")
+        return cls([config["id"] for config in configs], [f["name"] for f in flags], bindings)
+
+
+async def seed(client: httpx.AsyncClient, features: int, configs: int, per_config: int):
+    """Небольшой набор данных через API; для объёмов используйте generate_data.py"""
+    run_id = f"{int(time.time()):x}"
+    semaphore = asyncio.Semaphore(16)
+
+    async def post(path: str, payload: dict) -> dict:
+        async with semaphore:
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+            return response.json()
+
+    flags = await asyncio.gather(
+        *(
+            post(f"{API}/feature-flags/", {"name": f"bench-{run_id}-feature-{i}"})
+            for i in range(features)
+        )
+    )
+    environments = ("development", "testing", "production")
+    created = await asyncio.gather(
+        *(
+            post(
+                f"{API}/feature-configs/",
+                {
+                    "name": f"bench-{run_id}-config-{i}",
+                    "environment": environments[i % len(environments)],
+                    "is_active": True,
+                },
+            )
+            for i in range(configs)
+        )
+    )
+    rng = random.Random(run_id)
+    for config in created:
+        for flag in rng.sample(flags, min(per_config, len(flags))):
+            await post(
+                f"{API}/feature-configs/{config['id']}/features",
+                {"feature_id": flag["id"], "is_enabled": rng.random() < 0.5},
+            )
+    print(f"Seeded {features} features, {configs} configs, {per_config} features per config")
+
+
+class Scenarios:
+    def __init__(self, dataset: Dataset, rng: random.Random):
+        self.dataset = dataset
+        self.rng = rng
+
+    async def poll_config(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"{API}/feature-configs/{self.rng.choice(self.dataset.configs)}")
+
+    async def flag_by_name(self, client: httpx.AsyncClient) -> httpx.Response:
+        name = self.rng.choice(self.dataset.flag_names)
+        return await client.get(f"{API}/feature-flags/name/{name}")
+
+    async def list_versions(self, client: httpx.AsyncClient) -> httpx.Response:
+        config_id = self.rng.choice(self.dataset.configs)
+        return await client.get(f"{API}/feature-configs/{config_id}/versions")
+
+    async def toggle(self, client: httpx.AsyncClient) -> httpx.Response:
+        if not self.dataset.bindings:
+            return await self.poll_config(client)
+        index = self.rng.randrange(len(self.dataset.bindings))
+        config_id, feature_id, enabled = self.dataset.bindings[index]
+        self.dataset.bindings[index] = (config_id, feature_id, not enabled)
+        return await client.put(
+            f"{API}/feature-configs/{config_id}/features/{feature_id}",
+            json={"is_enabled": not enabled},
+        )
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    scenarios: Scenarios,
+    mix: dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict:
+    names, weights = list(mix), list(mix.values())
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+    recording = False
+
+    async def worker(deadline: float):
+        while time.perf_counter() < deadline:
+            name = scenarios.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await getattr(scenarios, name)(client)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - started
+            if recording:
+                latencies[name].append(elapsed * 1000)
+                errors[name] += failed
+
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+
+    recording = True
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in names:
+        values = sorted(latencies[name])
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "p99_ms": round(percentile(values, 0.99), 3),
+        }
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {"rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Регрессии: рост p95 или падение RPS больше чем на threshold"""
+    regressions = []
+    for level, result in results["levels"].items():
+        base_level = baseline.get("levels", {}).get(level)
+        if base_level is None:
+            continue
+        if result["rps"] < base_level["rps"] * (1 - threshold):
+            regressions.append(
+                f"c={level}: throughput {result['rps']} rps < baseline {base_level['rps']} rps"
+            )
+        for name, endpoint in result["endpoints"].items():
+            base = base_level["endpoints"].get(name)
+            if base is None or not base["requests"] or not endpoint["requests"]:
+                continue
+            if endpoint["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"c={level} {name}: p95 {endpoint['p95_ms']} ms > "
+                    f"baseline {base['p95_ms']} ms"
+                )
+            if endpoint["errors"] > base["errors"]:
+                regressions.append(
+                    f"c={level} {name}: {endpoint['errors']} errors, baseline {base['errors']}"
+                )
+    return regressions
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "ACCESS_LOG_SAMPLE_RATIO": "0", "LOG_LEVEL": "WARNING"}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(PROJECT_ROOT, "src", "serve.py"),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=os.path.join(PROJECT_ROOT, "src"),
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"Server was not ready within {timeout} s")
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Scenarios, name.strip()):
+            raise SystemExit(f"Unknown scenario '{name}'")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def main(args):
+    server: Optional[subprocess.Popen] = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_server(args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            await wait_ready(client, args.startup_timeout)
+            if args.seed:
+                await seed(client, args.features, args.configs, args.features_per_config)
+            dataset = await Dataset.discover(client)
+            scenarios = Scenarios(dataset, random.Random(args.random_seed))
+            mix = parse_mix(args.mix)
+
+            results = {
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "host": platform.node(),
+                    "python": platform.python_version(),
+                    "workers": args.workers if server else None,
+                    "duration_s": args.duration,
+                    "mix": mix,
+                    "configs": len(dataset.configs),
+                    "flags": len(dataset.flag_names),
+                },
+                "levels": {},
+            }
+            for concurrency in args.concurrency:
+                level = await run_level(
+                    client, scenarios, mix, concurrency, args.duration, args.warmup
+                )
+                results["levels"][str(concurrency)] = level
+                print(f"c={concurrency}: {level['rps']} rps", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    print(output)
+
+    if args.baseline and args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            file.write(output)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP load test")
+    parser.add_argument("--base-url", help="Use a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 16, 64],
+    )
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=3, help="Unrecorded seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--seed", action="store_true", help="Create a small dataset via the API")
+    parser.add_argument("--features", type=int, default=200)
+    parser.add_argument("--configs", type=int, default=30)
+    parser.add_argument("--features-per-config", type=int, default=50)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Allowed relative regression (0.10 = 10%%)"
+    )
+    asyncio.run(main(parser.parse_args()))
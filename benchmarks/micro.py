@@ -0,0 +1,400 @@
+"""Микробенчмарки фиксированных накладных расходов запроса без БД.
+
+Слои замеряются по отдельности на in-memory фейках репозиториев и сессии:
+    di.*           сборка REQUEST-скоупа dishka: репозитории, UnitOfWork, сервисы
+    service.*      вызов FeatureConfigServiceImpl.get_config с фейковым репозиторием
+    pydantic.*     from_attributes-конвертация FeatureConfigDetailResponse и JSON
+    fastapi.*      ASGI-вызов эндпоинта с response_model (валидация + сериализация)
+    targeting.*    компиляция и вычисление правил таргетинга на 10-1000 условий
+
+Результаты дописываются в benchmarks/results/micro_history.jsonl вместе с коммитом
+и сравниваются с предыдущей записью.
+
+    python benchmarks/micro.py --sizes 10,100,1000
+    python benchmarks/micro.py --filter pydantic --fail-on-regression
+    python benchmarks/micro.py --filter targeting --rule-sizes 10,100,1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+HISTORY_PATH = os.path.join(BASE_DIR, "results", "micro_history.jsonl")
+
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from dishka import Provider, Scope, make_async_container, provide
+from dishka.integrations.fastapi import FastapiProvider
+from fastapi import FastAPI, Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.audit.log import AuditLog
+from api.v1.feature.feature_config.cache import ConfigCache, serialize_config
+from api.v1.feature.feature_config.service import (
+    FeatureConfigService,
+    FeatureConfigServiceImpl,
+)
+from api.v1.feature.feauture_flags.service import FeatureFlagService
+from api.v1.feature.schemas import FeatureConfigDetailResponse, TargetingRules
+from api.v1.feature.targeting import compile_rules
+from database.UnitOfWork import ReadOnlyUnitOfWork
+from database.models import (
+    Environment,
+    FeatureConfig,
+    FeatureConfigFlag,
+    FeatureConfigVersion,
+    FeatureFlag,
+)
+from DI.providers import CacheProvider, RepositoryProvider, ServiceProvider, UnitOfWorkProvider
+from src.config import settings
+
+Benchmark = Callable[[], Awaitable[object]]
+
+
+class FakeSession:
+    """Сессия без БД: UnitOfWork вызывает только commit/rollback/close"""
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeDatabaseProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        return None
+
+    @provide(scope=Scope.REQUEST)
+    def get_session(self) -> AsyncSession:
+        return FakeSession()
+
+
+class FakeConfigRepository:
+    def __init__(self, config: FeatureConfig):
+        self._config = config
+
+    async def get_by_id(self, entity_id) -> FeatureConfig:
+        return self._config
+
+
+def build_config(features: int, versions: int) -> FeatureConfig:
+    """Граф ORM-объектов размера реального ответа, без сессии"""
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    config = FeatureConfig(
+        id=uuid.uuid4(),
+        name="bench-config",
+        environment=Environment.PRODUCTION,
+        description="Benchmark configuration",
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    for index in range(features):
+        feature = FeatureFlag(
+            id=uuid.uuid4(),
+            name=f"feature_{index}",
+            description="Synthetic feature",
+            created_at=now,
+            updated_at=now,
+        )
+        config.features.append(
+            FeatureConfigFlag(
+                config_id=config.id,
+                feature_id=feature.id,
+                is_enabled=index % 2 == 0,
+                is_free=False,
+                disabled_message=None,
+                rollout_percentage=100.0,
+                rollout_salt=None,
+                created_at=now,
+                feature=feature,
+            )
+        )
+    for number in range(1, versions + 1):
+        config.versions.append(
+            FeatureConfigVersion(
+                id=number,
+                config_id=config.id,
+                version_number=number,
+                changelog=f"Change #{number}",
+                created_by="bench",
+                is_tagged=False,
+                created_at=now + timedelta(minutes=number),
+            )
+        )
+    return config
+
+
+def make_request(method: str = "GET") -> Request:
+    return Request(
+        {"type": "http", "method": method, "path": "/", "headers": [], "query_string": b""}
+    )
+
+
+def di_benchmarks() -> dict[str, Benchmark]:
+    container = make_async_container(
+        FastapiProvider(),
+        FakeDatabaseProvider(),
+        RepositoryProvider(),
+        UnitOfWorkProvider(),
+        CacheProvider(),
+        ServiceProvider(),
+    )
+    get_request, put_request = make_request("GET"), make_request("PUT")
+
+    async def request_scope_both_services():
+        async with container({Request: get_request}) as request_container:
+            await request_container.get(FeatureConfigService)
+            await request_container.get(FeatureFlagService)
+
+    async def request_scope_config_service():
+        async with container({Request: put_request}) as request_container:
+            await request_container.get(FeatureConfigService)
+
+    return {
+        "di.request_scope.both_services": request_scope_both_services,
+        "di.request_scope.config_service": request_scope_config_service,
+    }
+
+
+def service_benchmarks(size: int) -> dict[str, Benchmark]:
+    config = build_config(size, size)
+    cache = ConfigCache(settings.cache, None)
+    service = FeatureConfigServiceImpl(
+        FakeConfigRepository(config),
+        None,
+        None,
+        ReadOnlyUnitOfWork(FakeSession()),
+        cache,
+        AuditLog(None, None, None),
+    )
+
+    async def get_config():
+        await service.get_config(config.id)
+
+    return {f"service.get_config[{size}]": get_config}
+
+
+def pydantic_benchmarks(size: int) -> dict[str, Benchmark]:
+    config = build_config(size, size)
+    response = FeatureConfigDetailResponse.model_validate(config)
+
+    async def model_validate():
+        FeatureConfigDetailResponse.model_validate(config)
+
+    async def model_dump_json():
+        response.model_dump_json()
+
+    async def serialize():
+        serialize_config(config)
+
+    return {
+        f"pydantic.from_attributes[{size}]": model_validate,
+        f"pydantic.dump_json[{size}]": model_dump_json,
+        f"pydantic.serialize_config[{size}]": serialize,
+    }
+
+
+def fastapi_benchmarks(size: int) -> dict[str, Benchmark]:
+    config = build_config(size, size)
+    app = FastAPI()
+
+    @app.get("/config", response_model=FeatureConfigDetailResponse)
+    async def get_config():
+        return config
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/config",
+        "raw_path": b"/config",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def call_endpoint():
+        await app(dict(scope), receive, send)
+
+    return {f"fastapi.response_model[{size}]": call_endpoint}
+
+
+def build_rules(size: int) -> tuple[TargetingRules, dict]:
+    """Набор условий match=all и контекст, на котором проходят все: худший случай"""
+    conditions, context = [], {}
+    for index in range(size):
+        attribute = f"attr_{index}"
+        kind = index % 3
+        if kind == 0:
+            conditions.append(
+                {"attribute": attribute, "operator": "in", "value": [f"v{n}" for n in range(50)]}
+            )
+            context[attribute] = "v25"
+        elif kind == 1:
+            conditions.append({"attribute": attribute, "operator": "eq", "value": "ru"})
+            context[attribute] = "ru"
+        else:
+            conditions.append({"attribute": attribute, "operator": "gte", "value": 18})
+            context[attribute] = 30
+    return TargetingRules.model_validate({"conditions": conditions}), context
+
+
+def targeting_benchmarks(size: int) -> dict[str, Benchmark]:
+    rules, context = build_rules(size)
+    predicate = compile_rules(rules)
+
+    async def compile_rule_set():
+        compile_rules(rules)
+
+    async def evaluate():
+        predicate(context)
+
+    return {
+        f"targeting.compile[{size}]": compile_rule_set,
+        f"targeting.evaluate[{size}]": evaluate,
+    }
+
+
+async def measure(benchmark: Benchmark, min_time: float, repeat: int) -> dict:
+    """Как timeit: подбираем число вызовов на замер, берём медиану по повторам"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            await benchmark()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await benchmark()
+        timings.append((time.perf_counter() - started) / number)
+
+    median = statistics.median(timings)
+    return {
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "ops_per_s": round(1 / median, 1),
+        "calls": number * repeat,
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_previous(history_path: str) -> dict:
+    if not os.path.exists(history_path):
+        return {}
+    with open(history_path, encoding="utf-8") as file:
+        lines = [line for line in file if line.strip()]
+    return json.loads(lines[-1]) if lines else {}
+
+
+async def main(args):
+    benchmarks: dict[str, Benchmark] = dict(di_benchmarks())
+    for size in args.sizes:
+        benchmarks.update(service_benchmarks(size))
+        benchmarks.update(pydantic_benchmarks(size))
+        benchmarks.update(fastapi_benchmarks(size))
+    for size in args.rule_sizes:
+        benchmarks.update(targeting_benchmarks(size))
+    if args.filter:
+        benchmarks = {name: fn for name, fn in benchmarks.items() if args.filter in name}
+
+    previous = load_previous(args.history).get("results", {})
+    results, regressions = {}, []
+    print(f"{'benchmark':<40} {'median':>12} {'min':>12} {'ops/s':>12} {'vs prev':>9}")
+    for name, benchmark in benchmarks.items():
+        result = await measure(benchmark, args.min_time, args.repeat)
+        results[name] = result
+        change = ""
+        if name in previous:
+            ratio = result["median_us"] / previous[name]["median_us"] - 1
+            change = f"{ratio:+.1%}"
+            if ratio > args.threshold:
+                regressions.append(f"{name}: {change}")
+        print(
+            f"{name:<40} {result['median_us']:>10.2f}us {result['min_us']:>10.2f}us "
+            f"{result['ops_per_s']:>12.0f} {change:>9}"
+        )
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": current_commit(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+
+    if regressions:
+        print("Slower than the previous run:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-layer micro-benchmarks")
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[10, 100, 1000],
+        help="Features and versions per config",
+    )
+    parser.add_argument(
+        "--rule-sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[10, 100, 1000],
+        help="Targeting conditions per rule set",
+    )
+    parser.add_argument("--filter", help="Run only benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--no-save", action="store_true", help="Do not append to the history")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+"""Сравнение UnitOfWork и ReadOnlyUnitOfWork на читающем запросе.
+
+Запускает один и тот же запрос (FeatureConfigRepositoryImpl.get_by_id) в обычной
+транзакции и в режиме autocommit и печатает число обращений к серверу на запрос
+и задержку. Нужна доступная БД из настроек и применённые миграции.
+
+    python benchmarks/readonly_uow.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.feature.feature_config.repository import FeatureConfigRepositoryImpl
+from database.UnitOfWork import UnitOfWork, ReadOnlyUnitOfWork
+from database.models import FeatureConfig, Environment
+from database.replica import read_only_sessionmaker
+from DI.providers import build_async_engine
+from src.config import settings
+
+
+class RoundTripCounter:
+    """Считает запросы, которые asyncpg отправил на сервер (включая BEGIN/COMMIT)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, record):
+        self.count += 1
+
+
+async def run_variant(sessionmaker, uow_class, config_id, iterations, counter):
+    latencies = []
+    counter.count = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with sessionmaker() as session:
+            async with uow_class(session):
+                await FeatureConfigRepositoryImpl(session).get_by_id(config_id)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        "round_trips_per_request": counter.count / iterations,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def main(iterations: int):
+    engine = build_async_engine(settings.db.async_url, settings.db)
+    counter = RoundTripCounter()
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def attach_query_logger(dbapi_connection, connection_record):
+        dbapi_connection.driver_connection.add_query_logger(counter)
+
+    sessionmaker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    config = FeatureConfig(name=f"bench-readonly-{os.getpid()}", environment=Environment.TESTING)
+    async with sessionmaker() as session:
+        async with UnitOfWork(session):
+            session.add(config)
+
+    try:
+        variants = {
+            "UnitOfWork": (sessionmaker, UnitOfWork),
+            "ReadOnlyUnitOfWork": (read_only_sessionmaker(engine), ReadOnlyUnitOfWork),
+        }
+        results = {}
+        for name, (maker, uow_class) in variants.items():
+            # Прогрев пула и кэша скомпилированных запросов
+            await run_variant(maker, uow_class, config.id, 50, counter)
+            results[name] = await run_variant(maker, uow_class, config.id, iterations, counter)
+
+        for name, result in results.items():
+            print(
+                f"{name:<20} round trips/request: {result['round_trips_per_request']:.2f}  "
+                f"mean: {result['mean_ms']:.3f} ms  p50: {result['p50_ms']:.3f} ms  "
+                f"p95: {result['p95_ms']:.3f} ms"
+            )
+        saved = (
+            results["UnitOfWork"]["round_trips_per_request"]
+            - results["ReadOnlyUnitOfWork"]["round_trips_per_request"]
+        )
+        gain = results["UnitOfWork"]["mean_ms"] - results["ReadOnlyUnitOfWork"]["mean_ms"]
+        print(f"Saved per request: {saved:.2f} round trips, {gain:.3f} ms")
+    finally:
+        async with sessionmaker() as session:
+            async with UnitOfWork(session):
+                await FeatureConfigRepositoryImpl(session).delete(config.id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,36 @@
+"""rollout percentage
+
+Revision ID: 5b1e7c2d9a40
+Revises: c4fc227bd68f
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9a40'
+down_revision: Union[str, Sequence[str], None] = 'c4fc227bd68f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('feature_config_flag', sa.Column('rollout_percentage', sa.Float(), server_default=sa.text('100'), nullable=False))
+    op.add_column('feature_config_flag', sa.Column('rollout_salt', sa.String(length=64), nullable=True))
+    op.create_check_constraint(
+        'ck_rollout_percentage',
+        'feature_config_flag',
+        'rollout_percentage >= 0 AND rollout_percentage <= 100',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_rollout_percentage', 'feature_config_flag', type_='check')
+    op.drop_column('feature_config_flag', 'rollout_salt')
+    op.drop_column('feature_config_flag', 'rollout_percentage')
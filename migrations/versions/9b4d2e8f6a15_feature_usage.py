@@ -0,0 +1,37 @@
+"""feature usage
+
+Revision ID: 9b4d2e8f6a15
+Revises: f3a7c9e2b1d4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d2e8f6a15'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c9e2b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feature_usage',
+    sa.Column('config_id', sa.UUID(), nullable=False),
+    sa.Column('feature_id', sa.UUID(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('enabled', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('config_id', 'feature_id', 'bucket_start', 'enabled')
+    )
+    op.create_index('ix_feature_usage_feature', 'feature_usage', ['feature_id', 'bucket_start'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feature_usage_feature', table_name='feature_usage')
+    op.drop_table('feature_usage')
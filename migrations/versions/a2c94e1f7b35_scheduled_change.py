@@ -0,0 +1,50 @@
+"""scheduled change
+
+Revision ID: a2c94e1f7b35
+Revises: 8d3f0a6b2c71
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c94e1f7b35'
+down_revision: Union[str, Sequence[str], None] = '8d3f0a6b2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduled_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('config_id', sa.UUID(), nullable=False),
+    sa.Column('feature_id', sa.UUID(), nullable=True),
+    sa.Column('action', sa.Enum('TOGGLE_FEATURE', 'UPDATE_MESSAGE', 'ACTIVATE', 'DEACTIVATE', name='scheduledaction'), nullable=False),
+    sa.Column('is_enabled', sa.Boolean(), nullable=True),
+    sa.Column('disabled_message', sa.String(length=256), nullable=True),
+    sa.Column('run_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'APPLIED', 'FAILED', 'CANCELLED', name='scheduledchangestatus'), nullable=False),
+    sa.Column('applied_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text("TIMEZONE('utc', now())"), nullable=False),
+    sa.ForeignKeyConstraint(['config_id'], ['feature_config.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['feature_id'], ['feature_flag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scheduled_change_config_id'), 'scheduled_change', ['config_id'], unique=False)
+    op.create_index('ix_scheduled_change_pending_run_at', 'scheduled_change', ['run_at'], unique=False, postgresql_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scheduled_change_pending_run_at', table_name='scheduled_change', postgresql_where=sa.text("status = 'PENDING'"))
+    op.drop_index(op.f('ix_scheduled_change_config_id'), table_name='scheduled_change')
+    op.drop_table('scheduled_change')
+    sa.Enum(name='scheduledchangestatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='scheduledaction').drop(op.get_bind(), checkfirst=True)
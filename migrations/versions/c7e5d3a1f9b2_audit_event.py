@@ -0,0 +1,63 @@
+"""audit event
+
+Revision ID: c7e5d3a1f9b2
+Revises: a2c94e1f7b35
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e5d3a1f9b2'
+down_revision: Union[str, Sequence[str], None] = 'a2c94e1f7b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_event',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('actor', sa.String(length=64), nullable=True),
+    sa.Column('action', sa.String(length=32), nullable=False),
+    sa.Column('entity_type', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.String(length=80), nullable=False),
+    sa.Column('config_id', sa.UUID(), nullable=True),
+    sa.Column('before', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('after', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('request_id', sa.String(length=64), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index('ix_audit_event_entity', 'audit_event', ['entity_type', 'entity_id', 'occurred_at'], unique=False)
+    op.create_index('ix_audit_event_config', 'audit_event', ['config_id', 'occurred_at'], unique=False)
+    op.create_index('ix_audit_event_occurred_at', 'audit_event', ['occurred_at'], unique=False)
+    # Страховочная секция на случай, если месячные не успели создать заранее
+    op.execute("CREATE TABLE audit_event_default PARTITION OF audit_event DEFAULT")
+    # Текущий и три следующих месяца; дальше секции создаёт воркер-лидер
+    op.execute("""
+    DO $$
+    DECLARE
+        month_start timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    BEGIN
+        FOR i IN 0..3 LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_event FOR VALUES FROM (%L) TO (%L)',
+                'audit_event_' || to_char((month_start + make_interval(months => i)) AT TIME ZONE 'UTC', 'YYYY_MM'),
+                month_start + make_interval(months => i),
+                month_start + make_interval(months => i + 1)
+            );
+        END LOOP;
+    END $$;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('audit_event')
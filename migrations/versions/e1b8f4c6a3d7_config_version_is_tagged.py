@@ -0,0 +1,28 @@
+"""config version is_tagged
+
+Revision ID: e1b8f4c6a3d7
+Revises: c7e5d3a1f9b2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b8f4c6a3d7'
+down_revision: Union[str, Sequence[str], None] = 'c7e5d3a1f9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('feature_config_version', sa.Column('is_tagged', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('feature_config_version', 'is_tagged')
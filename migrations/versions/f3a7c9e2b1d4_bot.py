@@ -0,0 +1,43 @@
+"""bot
+
+Revision ID: f3a7c9e2b1d4
+Revises: e1b8f4c6a3d7
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c9e2b1d4'
+down_revision: Union[str, Sequence[str], None] = 'e1b8f4c6a3d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bot',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('config_id', sa.UUID(), nullable=True),
+    sa.Column('applied_version', sa.Integer(), nullable=True),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('heartbeat_count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('first_seen_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['config_id'], ['feature_config.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bot_config_id'), 'bot', ['config_id'], unique=False)
+    op.create_index(op.f('ix_bot_last_seen_at'), 'bot', ['last_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_bot_last_seen_at'), table_name='bot')
+    op.drop_index(op.f('ix_bot_config_id'), table_name='bot')
+    op.drop_table('bot')
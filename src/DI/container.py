@@ -1,12 +1,17 @@
 from dishka import make_async_container
+from dishka.integrations.fastapi import FastapiProvider
 
 from DI.providers import *
 
 
 def create_container():
     return make_async_container(
+        FastapiProvider(),
         DatabaseProvider(),
         RepositoryProvider(),
         UnitOfWorkProvider(),
+        CacheProvider(),
         ServiceProvider(),
+        SchedulerProvider(),
+        IngestionProvider(),
     )
@@ -1,4 +1,5 @@
 from dishka import Provider, Scope, provide
+from fastapi import Request
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -24,12 +25,65 @@ from api.v1.feature.feauture_flags.repository import (
     FeatureFlagRepository,
 )
 from api.v1.feature.feauture_flags.service import FeatureFlagServiceImpl, FeatureFlagService
+from api.v1.feature.feature_config.cache import ConfigCache
+from api.v1.feature.targeting import CompiledRulesCache
+from api.v1.audit.log import ACTOR_HEADER, AuditLog
+from api.v1.audit.repository import AuditEventRepository, AuditEventRepositoryImpl
+from api.v1.audit.service import AuditService, AuditServiceImpl
+from api.v1.bot.heartbeats import HeartbeatBuffer
+from api.v1.bot.repository import BotRepository, BotRepositoryImpl
+from api.v1.bot.service import BotService, BotServiceImpl
+from api.v1.usage.counters import UsageCounters
+from api.v1.usage.repository import UsageRepository, UsageRepositoryImpl
+from api.v1.usage.service import UsageService, UsageServiceImpl
+from api.v1.feature.feature_config.scheduled_change.repository import (
+    ScheduledChangeRepository,
+    ScheduledChangeRepositoryImpl,
+)
+from api.v1.feature.feature_config.scheduled_change.service import (
+    ScheduledChangeService,
+    ScheduledChangeServiceImpl,
+)
+from cache.shared_snapshot import SharedSnapshot
+from idempotency.store import IdempotencyStore
 from src.config import DatabaseConfig, settings
 from api.v1.feature.repository import (
     FeatureConfigFlagRepository,
     FeatureConfigFlagRepositoryImpl,
 )
-from database.UnitOfWork import UnitOfWork
+from database.UnitOfWork import UnitOfWork, ReadOnlyUnitOfWork
+from database.replica import (
+    ReplicaRouter,
+    ReadOnlySessionmaker,
+    is_read_only_request,
+    read_only_sessionmaker,
+)
+from database.query_stats import instrument_query_stats
+from tracing.instrumentation import instrument_tracing, start_span
+from database.slow_queries import SlowQueryLog
+from database.statement_cache import StatementCacheStats
+from metrics.cache import instrument_cache
+from metrics.database import InstrumentedQueuePool, instrument_pool
+from logger import get_request_id
+from scheduler.audit_partitions import AuditPartitionManager
+from scheduler.idempotency_keys import IdempotencyKeyPurger
+from scheduler.leader import LEADER_LOCK_KEY, LeaderElection
+from scheduler.scheduled_changes import ChangeScheduler
+from scheduler.version_retention import VersionCompactor
+
+
+def build_async_engine(url: str, db_config: DatabaseConfig) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=db_config.pool_size,
+        max_overflow=db_config.max_overflow,
+        query_cache_size=db_config.query_cache_size,
+        connect_args=db_config.connect_args,
+    )
+    return instrument_tracing(instrument_query_stats(engine))
 
 
 class DatabaseProvider(Provider):
@@ -40,26 +94,89 @@ class DatabaseProvider(Provider):
         return settings.db
 
     @provide(scope=Scope.APP)
-    def get_async_engine(self, db_config: DatabaseConfig) -> AsyncEngine:
-        return create_async_engine(
-            db_config.async_url, echo=False, pool_pre_ping=True, pool_size=10, max_overflow=20
-        )
+    def get_statement_cache_stats(self) -> StatementCacheStats:
+        return instrument_cache("sqlalchemy_statements", StatementCacheStats())
+
+    @provide(scope=Scope.APP)
+    def get_slow_query_log(self) -> SlowQueryLog:
+        return SlowQueryLog(settings.slow_queries)
+
+    @provide(scope=Scope.APP)
+    def get_async_engine(
+        self,
+        db_config: DatabaseConfig,
+        cache_stats: StatementCacheStats,
+        slow_queries: SlowQueryLog,
+    ) -> AsyncEngine:
+        engine = build_async_engine(db_config.async_url, db_config)
+        engine = slow_queries.instrument(cache_stats.instrument(engine))
+        return instrument_pool(engine, "primary")
+
+    @provide(scope=Scope.APP)
+    def get_replica_router(
+        self,
+        db_config: DatabaseConfig,
+        cache_stats: StatementCacheStats,
+        slow_queries: SlowQueryLog,
+    ) -> ReplicaRouter:
+        engines = []
+        for number, url in enumerate(db_config.replica_async_urls):
+            engine = build_async_engine(url, db_config)
+            engine = slow_queries.instrument(cache_stats.instrument(engine))
+            engines.append(instrument_pool(engine, f"replica-{number}"))
+        return ReplicaRouter(engines)
 
     @provide(scope=Scope.APP)
     def get_sessionmaker(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
         return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+    @provide(scope=Scope.APP)
+    def get_read_only_sessionmaker(self, engine: AsyncEngine) -> ReadOnlySessionmaker:
+        return ReadOnlySessionmaker(read_only_sessionmaker(engine))
+
     @provide(scope=Scope.REQUEST)
     async def get_session(
-        self, sessionmaker: async_sessionmaker[AsyncSession]
+        self,
+        request: Request,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        read_only_sessionmaker: ReadOnlySessionmaker,
+        replica_router: ReplicaRouter,
     ) -> AsyncGenerator[AsyncSession, None]:
-        async with sessionmaker() as session:
+        with start_span("db.session.open"):
+            session = await self._open_session(
+                request, sessionmaker, read_only_sessionmaker, replica_router
+            )
+        async with session:
             try:
                 yield session
             except Exception:
                 await session.rollback()
                 raise
 
+    @staticmethod
+    async def _open_session(
+        request: Request,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        read_only_sessionmaker: ReadOnlySessionmaker,
+        replica_router: ReplicaRouter,
+    ) -> AsyncSession:
+        """Читающие запросы идут в реплику, если она не отстаёт от клиента"""
+        if not is_read_only_request(request):
+            return sessionmaker()
+        if not replica_router.enabled:
+            return read_only_sessionmaker()
+
+        session = replica_router.next_sessionmaker()()
+        try:
+            stale = await replica_router.is_stale(session, request)
+        except Exception:
+            await session.close()
+            raise
+        if stale:
+            await session.close()
+            return read_only_sessionmaker()
+        return session
+
 
 class RepositoryProvider(Provider):
     """Провайдер репозиториев"""
@@ -84,23 +201,80 @@ class RepositoryProvider(Provider):
     ) -> FeatureConfigVersionRepository:
         return FeatureConfigVersionRepositoryImpl(session)
 
+    @provide(scope=Scope.REQUEST)
+    def get_scheduled_change_repository(self, session: AsyncSession) -> ScheduledChangeRepository:
+        return ScheduledChangeRepositoryImpl(session)
+
+    @provide(scope=Scope.REQUEST)
+    def get_audit_event_repository(self, session: AsyncSession) -> AuditEventRepository:
+        return AuditEventRepositoryImpl(session)
+
+    @provide(scope=Scope.REQUEST)
+    def get_bot_repository(self, session: AsyncSession) -> BotRepository:
+        return BotRepositoryImpl(session)
+
+    @provide(scope=Scope.REQUEST)
+    def get_usage_repository(self, session: AsyncSession) -> UsageRepository:
+        return UsageRepositoryImpl(session)
+
 
 class UnitOfWorkProvider(Provider):
     """Провайдер Unit of Work"""
 
     @provide(scope=Scope.REQUEST)
-    def get_unit_of_work(self, session: AsyncSession) -> UnitOfWork:
+    def get_unit_of_work(self, request: Request, session: AsyncSession) -> UnitOfWork:
+        if is_read_only_request(request):
+            return ReadOnlyUnitOfWork(session)
         return UnitOfWork(session)
 
 
+class CacheProvider(Provider):
+    """Провайдер in-process кэшей"""
+
+    @provide(scope=Scope.APP)
+    def get_config_cache(self, sessionmaker: async_sessionmaker[AsyncSession]) -> ConfigCache:
+        snapshot = None
+        if settings.cache.snapshot_dir:
+            snapshot = SharedSnapshot(settings.cache.snapshot_dir, settings.cache.snapshot_name)
+        cache = ConfigCache(settings.cache, sessionmaker, snapshot)
+        return instrument_cache("feature_config", cache)
+
+    @provide(scope=Scope.APP)
+    def get_compiled_rules_cache(self) -> CompiledRulesCache:
+        return instrument_cache(
+            "targeting_rules",
+            CompiledRulesCache(settings.cache.rules_max_entries, settings.cache.ttl),
+        )
+
+    @provide(scope=Scope.APP)
+    def get_idempotency_store(
+        self, sessionmaker: async_sessionmaker[AsyncSession]
+    ) -> IdempotencyStore:
+        return IdempotencyStore(sessionmaker, settings.idempotency)
+
+
 class ServiceProvider(Provider):
     """Провайдер сервисов"""
 
+    @provide(scope=Scope.REQUEST)
+    def get_audit_log(self, request: Request, repository: AuditEventRepository) -> AuditLog:
+        actor = request.headers.get(ACTOR_HEADER)
+        return AuditLog(repository, actor[:64] if actor else None, get_request_id(request.scope))
+
+    @provide(scope=Scope.REQUEST)
+    def get_audit_service(self, repository: AuditEventRepository, uow: UnitOfWork) -> AuditService:
+        return AuditServiceImpl(repository, uow)
+
     @provide(scope=Scope.REQUEST)
     def get_feature_flag_service(
-        self, repository: FeatureFlagRepository, uow: UnitOfWork
+        self,
+        repository: FeatureFlagRepository,
+        uow: UnitOfWork,
+        cache: ConfigCache,
+        rules_cache: CompiledRulesCache,
+        audit: AuditLog,
     ) -> FeatureFlagService:
-        return FeatureFlagServiceImpl(repository, uow)
+        return FeatureFlagServiceImpl(repository, uow, cache, rules_cache, audit)
 
     @provide(scope=Scope.REQUEST)
     def get_feature_config_service(
@@ -109,7 +283,78 @@ class ServiceProvider(Provider):
         config_flag_repository: FeatureConfigFlagRepository,
         version_repository: FeatureConfigVersionRepository,
         uow: UnitOfWork,
+        cache: ConfigCache,
+        audit: AuditLog,
     ) -> FeatureConfigService:
         return FeatureConfigServiceImpl(
-            config_repository, config_flag_repository, version_repository, uow
+            config_repository, config_flag_repository, version_repository, uow, cache, audit
         )
+
+    @provide(scope=Scope.REQUEST)
+    def get_scheduled_change_service(
+        self,
+        repository: ScheduledChangeRepository,
+        config_repository: FeatureConfigRepository,
+        uow: UnitOfWork,
+        audit: AuditLog,
+    ) -> ScheduledChangeService:
+        return ScheduledChangeServiceImpl(repository, config_repository, uow, audit)
+
+    @provide(scope=Scope.REQUEST)
+    def get_bot_service(
+        self, repository: BotRepository, uow: UnitOfWork, audit: AuditLog
+    ) -> BotService:
+        return BotServiceImpl(repository, uow, audit)
+
+    @provide(scope=Scope.REQUEST)
+    def get_usage_service(self, repository: UsageRepository, uow: UnitOfWork) -> UsageService:
+        return UsageServiceImpl(repository, uow)
+
+
+class IngestionProvider(Provider):
+    """Провайдер буферов данных от ботов, которые пишутся в БД пачками"""
+
+    @provide(scope=Scope.APP)
+    def get_heartbeat_buffer(
+        self, sessionmaker: async_sessionmaker[AsyncSession]
+    ) -> HeartbeatBuffer:
+        return HeartbeatBuffer(sessionmaker, settings.bots)
+
+    @provide(scope=Scope.APP)
+    def get_usage_counters(self, sessionmaker: async_sessionmaker[AsyncSession]) -> UsageCounters:
+        return UsageCounters(sessionmaker, settings.usage)
+
+
+class SchedulerProvider(Provider):
+    """Провайдер фоновых задач воркера-лидера"""
+
+    @provide(scope=Scope.APP)
+    def get_leader_election(self, db_config: DatabaseConfig) -> LeaderElection:
+        return LeaderElection(
+            db_config.sync_url, LEADER_LOCK_KEY, settings.scheduler.leader_retry_interval
+        )
+
+    @provide(scope=Scope.APP)
+    def get_change_scheduler(
+        self, sessionmaker: async_sessionmaker[AsyncSession], cache: ConfigCache
+    ) -> ChangeScheduler:
+        return ChangeScheduler(sessionmaker, cache, settings.scheduler)
+
+    @provide(scope=Scope.APP)
+    def get_audit_partition_manager(self, engine: AsyncEngine) -> AuditPartitionManager:
+        return AuditPartitionManager(engine, settings.audit)
+
+    @provide(scope=Scope.APP)
+    def get_version_compactor(
+        self,
+        engine: AsyncEngine,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        cache: ConfigCache,
+    ) -> VersionCompactor:
+        return VersionCompactor(engine, sessionmaker, cache, settings.retention)
+
+    @provide(scope=Scope.APP)
+    def get_idempotency_key_purger(
+        self, sessionmaker: async_sessionmaker[AsyncSession]
+    ) -> IdempotencyKeyPurger:
+        return IdempotencyKeyPurger(sessionmaker, settings.idempotency)
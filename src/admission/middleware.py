@@ -0,0 +1,206 @@
+# admission/middleware.py
+import hashlib
+import hmac
+import json
+import math
+import re
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from admission.rate_limit import RateLimiter
+from metrics.registry import registry
+from src.config import AdmissionSettings
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requests rejected before reaching the handler", ("reason",)
+)
+ADMISSION_IN_FLIGHT = registry.callback(
+    "admission_db_requests_in_flight", "Admitted database-bound requests being served", "gauge"
+)
+
+# Ключ scope["state"] с отложенным допуском кэшированного чтения
+DEFERRED_ADMISSION = "db_admission"
+
+# Не ходят в БД: GET конфигурации отдаётся из ConfigCache, heartbeat-ы и счётчики
+# вычислений копятся в буферах воркера. Все они ограничиваются по частоте; место
+# к БД кэшированное чтение занимает только при промахе кэша (db_admission).
+CACHED_READS = (("GET", re.compile(r"/api/v1/feature-configs/[0-9a-fA-F-]{36}/?")),)
+BUFFERED_WRITES = (
+    ("POST", re.compile(r"/api/v1/bots/[^/]+/heartbeat")),
+    ("POST", re.compile(r"/api/v1/usage/?")),
+)
+
+
+def _matches(rules, method: str, path: str) -> bool:
+    return any(method == rule_method and pattern.fullmatch(path) for rule_method, pattern in rules)
+
+
+def client_key(scope, api_token: Optional[str]) -> str:
+    """Клиент запроса: API-токен, если он совпал с настроенным, иначе адрес.
+
+    Непроверенным заголовкам (Authorization с чужим токеном, id бота) не верим:
+    новое значение на каждый запрос обходило бы ограничение и плодило корзины.
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.partition(b" ")
+            if (
+                api_token
+                and scheme.lower() == b"bearer"
+                and hmac.compare_digest(token.strip(), api_token.encode())
+            ):
+                # В ключе, логах и Redis - только отпечаток токена
+                return "token:" + hashlib.sha256(token.strip()).hexdigest()[:16]
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class ConcurrencyLimiter:
+    """Число одновременно обслуживаемых запросов к БД на воркере.
+
+    Запрос сверх лимита отклоняется сразу, а не ждёт соединения в очереди пула:
+    ожидание там занимает таймаут клиента у всех, кто стоит за ним. На последней
+    четверти лимита новые места получают только клиенты, у которых сейчас нет
+    запросов в работе, поэтому занять воркер целиком один клиент не может.
+    """
+
+    def __init__(self, max_concurrent: int, max_per_client: int):
+        self._max_concurrent = max_concurrent
+        self._max_per_client = max_per_client
+        self._high_watermark = max_concurrent - max(1, max_concurrent // 4)
+        self._in_flight = 0
+        self._per_client: dict[str, int] = {}
+        ADMISSION_IN_FLIGHT.add_callback("admission", lambda: [({}, self._in_flight)])
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self, client: str) -> Optional[str]:
+        """Занять место; None - запрос допущен, иначе причина отказа"""
+        held = self._per_client.get(client, 0)
+        if held >= self._max_per_client:
+            return "client_concurrency"
+        if self._in_flight >= self._max_concurrent or (
+            held and self._in_flight >= self._high_watermark
+        ):
+            return "worker_busy"
+        self._in_flight += 1
+        self._per_client[client] = held + 1
+        return None
+
+    def release(self, client: str):
+        self._in_flight -= 1
+        held = self._per_client[client] - 1
+        if held:
+            self._per_client[client] = held
+        else:
+            del self._per_client[client]
+
+
+class DeferredAdmission:
+    """Место в ConcurrencyLimiter, которое занимает обработчик, когда идёт в БД"""
+
+    def __init__(self, concurrency: ConcurrencyLimiter, client: str, retry_after: int):
+        self._concurrency = concurrency
+        self._client = client
+        self._retry_after = retry_after
+
+    @contextmanager
+    def slot(self):
+        reason = self._concurrency.try_acquire(self._client)
+        if reason is not None:
+            ADMISSION_REJECTED.inc(reason)
+            raise HTTPException(
+                status_code=429 if reason == "client_concurrency" else 503,
+                detail=f"Request rejected: {reason}",
+                headers={"Retry-After": str(self._retry_after)},
+            )
+        try:
+            yield
+        finally:
+            self._concurrency.release(self._client)
+
+
+def db_admission(request: Request):
+    """Допуск к БД для кэшированного чтения, не нашедшего данных в кэше.
+
+    Если middleware допуска нет или запрос уже занял в нём место, ничего не делает.
+    """
+    admission = request.scope.get("state", {}).get(DEFERRED_ADMISSION)
+    return admission.slot() if admission is not None else nullcontext()
+
+
+class AdmissionMiddleware:
+    """Ограничение частоты по клиенту и допуск запросов к БД.
+
+    Каждый запрос к /api берёт токен из корзины клиента (429 с Retry-After,
+    если токенов нет). Запросы, которые идут в БД, дополнительно занимают место
+    в ConcurrencyLimiter: 429, если у клиента уже max_concurrent_per_client
+    запросов в работе, 503 - если занят весь воркер. Кэшированное чтение при
+    cached_reads_exempt занимает место только при промахе кэша (db_admission);
+    без кэша оно допускается как обычный запрос к БД.
+    """
+
+    def __init__(
+        self,
+        app,
+        admission_settings: AdmissionSettings,
+        rate_limiter: RateLimiter,
+        concurrency: ConcurrencyLimiter,
+        api_token: Optional[str] = None,
+        cached_reads_exempt: bool = True,
+    ):
+        self.app = app
+        self.settings = admission_settings
+        self.api_token = api_token
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.cached_reads_exempt = cached_reads_exempt
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            return await self.app(scope, receive, send)
+        method, path = scope["method"], scope["path"]
+
+        client = client_key(scope, self.api_token)
+        wait = await self.rate_limiter.acquire(client)
+        if wait > 0:
+            return await self._reject(send, 429, "rate_limited", math.ceil(wait))
+        if _matches(BUFFERED_WRITES, method, path):
+            return await self.app(scope, receive, send)
+        if self.cached_reads_exempt and _matches(CACHED_READS, method, path):
+            scope.setdefault("state", {})[DEFERRED_ADMISSION] = DeferredAdmission(
+                self.concurrency, client, self.settings.retry_after
+            )
+            return await self.app(scope, receive, send)
+
+        reason = self.concurrency.try_acquire(client)
+        if reason == "client_concurrency":
+            return await self._reject(send, 429, reason, self.settings.retry_after)
+        if reason is not None:
+            return await self._reject(send, 503, reason, self.settings.retry_after)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release(client)
+
+    @staticmethod
+    async def _reject(send, status_code: int, reason: str, retry_after: int):
+        ADMISSION_REJECTED.inc(reason)
+        body = json.dumps({"detail": f"Request rejected: {reason}"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
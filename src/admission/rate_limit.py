@@ -0,0 +1,162 @@
+# admission/rate_limit.py
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from loguru import logger
+
+from metrics.registry import registry
+from src.config import AdmissionSettings, RedisConfig
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+RATE_LIMIT_BACKEND_ERRORS = registry.counter(
+    "rate_limit_backend_errors_total", "Rate limit checks answered locally because Redis failed"
+)
+
+# Корзина в Redis: hash {tokens, ts}. Время берётся из Redis, а не воркера, чтобы
+# расхождение часов воркеров не пополняло корзину. Ожидание возвращается строкой:
+# числа Lua приводятся к целым в ответе Redis.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+def redis_available() -> bool:
+    return aioredis is not None
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    tokens: float
+    updated_at: float
+
+
+class RateLimiter(Protocol):
+    """Интерфейс ограничения частоты запросов клиента"""
+
+    async def acquire(self, client: str) -> float:
+        """Взять токен; 0 - запрос разрешён, иначе сколько секунд ждать токена"""
+        ...
+
+    async def close(self) -> None: ...
+
+
+class LocalRateLimiter(RateLimiter):
+    """Корзины токенов в памяти воркера.
+
+    Лимит действует на воркер: при N воркерах клиент получает до N * rate
+    запросов в секунду. Полная корзина ничем не отличается от новой, поэтому
+    вытеснение давно не обращавшихся клиентов сверх max_clients лимит не ослабляет.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self._rate = rate
+        self._burst = burst
+        self._max_clients = max_clients
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def acquire(self, client: str) -> float:
+        return self.take(client)
+
+    def take(self, client: str) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self._burst, now)
+            if len(self._buckets) > self._max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket.tokens = min(
+                self._burst, bucket.tokens + (now - bucket.updated_at) * self._rate
+            )
+            bucket.updated_at = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / self._rate
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+class RedisRateLimiter(RateLimiter):
+    """Корзины токенов в Redis, общие для всех воркеров.
+
+    Проверка - один вызов Lua-скрипта. Если Redis не ответил за redis_timeout,
+    запрос проверяется по локальной корзине воркера: недоступный Redis не должен
+    ни отклонять все запросы, ни снимать ограничение совсем.
+    """
+
+    KEY_PREFIX = "rate_limit:"
+
+    def __init__(self, redis_config: RedisConfig, admission_settings: AdmissionSettings):
+        self._client = aioredis.Redis(
+            host=redis_config.host,
+            port=redis_config.port,
+            db=redis_config.db,
+            password=redis_config.password,
+            socket_timeout=admission_settings.redis_timeout,
+            socket_connect_timeout=admission_settings.redis_timeout,
+        )
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._args = (admission_settings.rate, admission_settings.burst)
+        self._fallback = LocalRateLimiter(
+            admission_settings.rate, admission_settings.burst, admission_settings.max_clients
+        )
+        self._last_error_logged = 0.0
+
+    async def acquire(self, client: str) -> float:
+        try:
+            wait = await self._script(keys=[self.KEY_PREFIX + client], args=self._args)
+        except Exception as e:
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            now = time.monotonic()
+            # Не больше одной записи в лог в минуту: ошибка повторяется на каждом запросе
+            if now - self._last_error_logged > 60:
+                self._last_error_logged = now
+                logger.warning(f"Redis rate limit check failed, using worker buckets: {e}")
+            return self._fallback.take(client)
+        return float(wait)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def build_rate_limiter(
+    admission_settings: AdmissionSettings, redis_config: RedisConfig
+) -> RateLimiter:
+    if admission_settings.backend == "redis":
+        if not redis_config.enabled:
+            logger.warning("RATE_LIMIT_BACKEND=redis requires REDIS_ENABLED, using worker buckets")
+        elif not redis_available():
+            logger.warning("redis is not installed, using worker buckets for rate limiting")
+        else:
+            return RedisRateLimiter(redis_config, admission_settings)
+    return LocalRateLimiter(
+        admission_settings.rate, admission_settings.burst, admission_settings.max_clients
+    )
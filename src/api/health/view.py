@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from dishka.integrations.fastapi import FromDishka, inject
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.v1.feature.feature_config.cache import ConfigCache
+from src.config import RedisConfig, settings
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+
+
+async def probe_postgres(engine: AsyncEngine) -> dict:
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.health.probe_timeout):
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": repr(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+async def probe_redis(redis_config: RedisConfig) -> dict:
+    """PING по протоколу RESP без клиентской библиотеки"""
+    if not redis_config.enabled:
+        return {"ok": True, "configured": False}
+
+    commands = []
+    if redis_config.password:
+        commands.append(("AUTH", redis_config.password))
+    commands.append(("PING",))
+    payload = b"".join(
+        f"*{len(command)}\r\n".encode()
+        + b"".join(f"${len(part.encode())}\r\n{part}\r\n".encode() for part in command)
+        for command in commands
+    )
+
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.health.probe_timeout):
+            reader, writer = await asyncio.open_connection(redis_config.host, redis_config.port)
+            try:
+                writer.write(payload)
+                await writer.drain()
+                replies = [await reader.readline() for _ in commands]
+            finally:
+                writer.close()
+                await writer.wait_closed()
+    except Exception as e:
+        return {"ok": False, "configured": True, "error": repr(e)}
+
+    if replies[-1].strip() != b"+PONG":
+        return {"ok": False, "configured": True, "error": replies[-1].decode().strip()}
+    return {
+        "ok": True,
+        "configured": True,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def pool_state(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+@health_router.get("/live", response_model=dict)
+async def live():
+    """Процесс жив и обслуживает event loop"""
+    return {"status": "ok"}
+
+
+@health_router.get("/ready", response_model=dict)
+@inject
+async def ready(
+    request: Request, engine: FromDishka[AsyncEngine], cache: FromDishka[ConfigCache]
+):
+    """Воркер прогрет и все зависимости отвечают"""
+    startup = request.app.state.startup
+    postgres, redis = await asyncio.gather(probe_postgres(engine), probe_redis(settings.redis))
+    checks = {
+        "startup": {"ok": startup.ready},
+        "postgres": postgres,
+        "redis": redis,
+        "pool": pool_state(engine),
+        "cache": {"ok": cache.warmed, "entries": len(cache)},
+    }
+    is_ready = all(check.get("ok", True) for check in checks.values())
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if is_ready else "not_ready", "checks": checks},
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from metrics.registry import registry
+
+metrics_router = APIRouter(tags=["monitoring"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    """Метрики в формате Prometheus: всех воркеров или, без общего каталога, этого процесса"""
+    workers = getattr(request.app.state, "worker_metrics", None)
+    body = workers.render() if workers is not None else registry.render()
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
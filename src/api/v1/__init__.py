@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 from .feature import feature_router
+from .audit import audit_router
+from .bot import bot_router
+from .usage import usage_router
+from .monitoring.view import monitoring_router
 
 router = APIRouter(prefix="/v1")
 
 router.include_router(feature_router)
+router.include_router(audit_router)
+router.include_router(bot_router)
+router.include_router(usage_router)
+router.include_router(monitoring_router)
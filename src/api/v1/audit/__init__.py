@@ -0,0 +1 @@
+from .view import audit_router
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import inspect
+
+from api.v1.audit.repository import AuditEventRepository
+
+ACTOR_HEADER = "x-actor"
+
+
+def snapshot(entity) -> dict[str, Any]:
+    """Колонки сущности в JSON-совместимом виде, без ленивой загрузки"""
+    state = inspect(entity)
+    unloaded = state.unloaded
+    return {
+        attribute.key: to_jsonable_python(getattr(entity, attribute.key))
+        for attribute in state.mapper.column_attrs
+        if attribute.key not in unloaded
+    }
+
+
+class AuditLog:
+    """Запись событий аудита в сессии текущего запроса.
+
+    Событие вставляется сразу, поэтому попадает в ту же транзакцию, что и само
+    изменение, и откатывается вместе с ним.
+    """
+
+    def __init__(
+        self, repository: AuditEventRepository, actor: Optional[str], request_id: Optional[str]
+    ):
+        self._repository = repository
+        self.actor = actor
+        self.request_id = request_id
+
+    async def record(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id: Any,
+        config_id: Optional[UUID] = None,
+        before: Optional[dict] = None,
+        after: Optional[dict] = None,
+    ):
+        await self._repository.add(
+            occurred_at=datetime.now(timezone.utc),
+            actor=self.actor,
+            action=action,
+            entity_type=entity_type,
+            entity_id=str(entity_id),
+            config_id=config_id,
+            before=to_jsonable_python(before) if before is not None else None,
+            after=to_jsonable_python(after) if after is not None else None,
+            request_id=self.request_id,
+        )
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional, List, Protocol
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, tuple_
+
+from database.models import AuditEvent
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
+
+
+class AuditEventRepository(Protocol):
+    """Интерфейс репозитория журнала аудита"""
+
+    async def add(self, **fields) -> None: ...
+
+    async def find(
+        self,
+        since: datetime,
+        until: datetime,
+        limit: int,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        config_id: Optional[UUID] = None,
+        actor: Optional[str] = None,
+        cursor: Optional[tuple[datetime, int]] = None,
+    ) -> List[AuditEvent]: ...
+
+
+@traced
+@timed_repository
+class AuditEventRepositoryImpl(AuditEventRepository):
+    """Репозиторий журнала аудита. Только вставка и чтение"""
+
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def add(self, **fields) -> None:
+        # Core INSERT мимо identity map: событие не читается обратно в сессию
+        await self._session.execute(insert(AuditEvent).values(**fields))
+
+    async def find(
+        self,
+        since: datetime,
+        until: datetime,
+        limit: int,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        config_id: Optional[UUID] = None,
+        actor: Optional[str] = None,
+        cursor: Optional[tuple[datetime, int]] = None,
+    ) -> List[AuditEvent]:
+        """События от новых к старым. Диапазон времени обязателен: он отсекает секции"""
+        query = (
+            select(AuditEvent)
+            .where(AuditEvent.occurred_at >= since, AuditEvent.occurred_at < until)
+            .order_by(AuditEvent.occurred_at.desc(), AuditEvent.id.desc())
+            .limit(limit)
+        )
+        if entity_type is not None:
+            query = query.where(AuditEvent.entity_type == entity_type)
+        if entity_id is not None:
+            query = query.where(AuditEvent.entity_id == entity_id)
+        if config_id is not None:
+            query = query.where(AuditEvent.config_id == config_id)
+        if actor is not None:
+            query = query.where(AuditEvent.actor == actor)
+        if cursor is not None:
+            query = query.where(tuple_(AuditEvent.occurred_at, AuditEvent.id) < cursor)
+        result = await self._session.execute(query)
+        return list(result.scalars().all())
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+
+
+class AuditEventResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor: Optional[str]
+    action: str
+    entity_type: str
+    entity_id: str
+    config_id: Optional[UUID]
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
+    request_id: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class AuditEventPage(BaseModel):
+    events: List[AuditEventResponse]
+    # Передать в ?cursor= для следующей страницы; None - событий больше нет
+    next_cursor: Optional[str]
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Protocol, List, Optional
+from uuid import UUID
+
+from api.v1.audit.repository import AuditEventRepository
+from database.UnitOfWork import UnitOfWork
+from database.models import AuditEvent
+from tracing.instrumentation import traced
+
+
+class AuditService(Protocol):
+    """Протокол сервиса чтения журнала аудита"""
+
+    async def find_events(
+        self,
+        since: datetime,
+        until: datetime,
+        limit: int,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        config_id: Optional[UUID] = None,
+        actor: Optional[str] = None,
+        cursor: Optional[tuple[datetime, int]] = None,
+    ) -> List[AuditEvent]: ...
+
+
+@traced
+class AuditServiceImpl:
+    """Сервис чтения журнала аудита"""
+
+    def __init__(self, repository: AuditEventRepository, uow: UnitOfWork):
+        self._repository = repository
+        self._uow = uow
+
+    async def find_events(
+        self,
+        since: datetime,
+        until: datetime,
+        limit: int,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        config_id: Optional[UUID] = None,
+        actor: Optional[str] = None,
+        cursor: Optional[tuple[datetime, int]] = None,
+    ) -> List[AuditEvent]:
+        async with self._uow:
+            return await self._repository.find(
+                since, until, limit, entity_type, entity_id, config_id, actor, cursor
+            )
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status
+from dishka.integrations.fastapi import FromDishka, inject
+
+from api.v1.audit.schema import AuditEventPage, AuditEventResponse
+from api.v1.audit.service import AuditService
+from src.config import settings
+
+audit_router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+def _parse_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        occurred_at, event_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(occurred_at), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@audit_router.get("/events", response_model=AuditEventPage)
+@inject
+async def get_audit_events(
+    service: FromDishka[AuditService],
+    entity_type: Optional[str] = Query(None, max_length=32),
+    entity_id: Optional[str] = Query(None, max_length=80),
+    config_id: Optional[UUID] = Query(None),
+    actor: Optional[str] = Query(None, max_length=64),
+    since: Optional[datetime] = Query(None, description="По умолчанию - 30 дней назад"),
+    until: Optional[datetime] = Query(None, description="По умолчанию - сейчас"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    """Журнал аудита от новых событий к старым"""
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=30)
+    if since.tzinfo is None or until.tzinfo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since and until must include a timezone",
+        )
+    if until - since > timedelta(days=settings.audit.max_query_days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time range is limited to {settings.audit.max_query_days} days",
+        )
+
+    events = await service.find_events(
+        since,
+        until,
+        limit,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        config_id=config_id,
+        actor=actor,
+        cursor=_parse_cursor(cursor) if cursor else None,
+    )
+    next_cursor = None
+    if len(events) == limit:
+        last = events[-1]
+        next_cursor = f"{last.occurred_at.isoformat()}|{last.id}"
+    return AuditEventPage(
+        events=[AuditEventResponse.model_validate(event) for event in events],
+        next_cursor=next_cursor,
+    )
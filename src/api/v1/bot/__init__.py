@@ -0,0 +1 @@
+from .view import bot_router
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.bot.repository import BotRepositoryImpl, HeartbeatRow
+from api.v1.bot.schema import BotHeartbeat, BotStats
+from metrics.registry import registry
+from src.config import BotSettings
+
+HEARTBEATS = registry.counter(
+    "bot_heartbeats_total", "Bot heartbeats received by the worker", ("result",)
+)
+HEARTBEAT_FLUSH = registry.histogram(
+    "bot_heartbeat_flush_seconds", "Duration of writing buffered heartbeats", ("status",)
+)
+HEARTBEAT_BUFFER = registry.callback(
+    "bot_heartbeat_buffer_size", "Bots with heartbeats waiting to be written", "gauge"
+)
+
+
+@dataclass(slots=True)
+class PendingHeartbeat:
+    """Последнее состояние бота, ещё не записанное в БД"""
+
+    config_id: Optional[UUID]
+    applied_version: Optional[int]
+    stats: Optional[BotStats]
+    seen_at: datetime
+    count: int
+
+    def merge_older(self, older: "PendingHeartbeat"):
+        """Дополнить пустые поля и счётчик из более старого heartbeat-а"""
+        self.config_id = self.config_id or older.config_id
+        self.applied_version = self.applied_version or older.applied_version
+        self.stats = self.stats or older.stats
+        self.count += older.count
+
+    def row(self, bot_id: str) -> HeartbeatRow:
+        stats = self.stats.model_dump_json(exclude_none=True) if self.stats is not None else None
+        return bot_id, self.config_id, self.applied_version, stats, self.seen_at, self.count
+
+
+class HeartbeatBuffer:
+    """Буфер heartbeat-ов воркера с записью пачками.
+
+    Буфер - словарь по bot_id: повторный heartbeat бота до записи заменяет
+    предыдущий и увеличивает счётчик, поэтому размер буфера ограничен числом
+    ботов, а не частотой heartbeat-ов. Раз в интервал (или раньше, когда буфер
+    заполнен наполовину) словарь подменяется пустым и пишется upsert-ами по
+    heartbeat_flush_batch строк. Когда в буфере нет места, heartbeat нового бота
+    отклоняется (503 с Retry-After), а не копится в памяти.
+    """
+
+    def __init__(
+        self, sessionmaker: async_sessionmaker[AsyncSession], bot_settings: BotSettings
+    ):
+        self._sessionmaker = sessionmaker
+        self._interval = bot_settings.heartbeat_flush_interval
+        self._max_entries = bot_settings.heartbeat_buffer_size
+        self._batch_size = bot_settings.heartbeat_flush_batch
+        self._pending: dict[str, PendingHeartbeat] = {}
+        self._flush_requested = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        HEARTBEAT_BUFFER.add_callback("heartbeats", lambda: [({}, len(self._pending))])
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def offer(self, bot_id: str, heartbeat: BotHeartbeat) -> bool:
+        """Положить heartbeat в буфер; False - буфер заполнен"""
+        entry = PendingHeartbeat(
+            heartbeat.config_id,
+            heartbeat.applied_version,
+            heartbeat.stats,
+            datetime.now(timezone.utc),
+            1,
+        )
+        older = self._pending.get(bot_id)
+        if older is not None:
+            entry.merge_older(older)
+        elif len(self._pending) >= self._max_entries:
+            HEARTBEATS.inc("rejected")
+            self._flush_requested.set()
+            return False
+        elif (len(self._pending) + 1) * 2 >= self._max_entries:
+            self._flush_requested.set()
+        self._pending[bot_id] = entry
+        HEARTBEATS.inc("accepted")
+        return True
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Остановить фоновую запись и записать остаток буфера"""
+        if self._task is not None:
+            # Без cancel: начатая запись пачки должна закончиться
+            self._closing = True
+            self._flush_requested.set()
+            await self._task
+        await self.flush()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self._interval)
+            except TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Записать накопленные heartbeat-ы; возвращает число записанных ботов"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        # Одинаковый порядок строк у всех воркеров: пачки не блокируют друг друга крест-накрест
+        bot_ids = sorted(pending)
+
+        started = time.perf_counter()
+        written = 0
+        try:
+            for start in range(0, len(bot_ids), self._batch_size):
+                batch = bot_ids[start : start + self._batch_size]
+                rows = [pending[bot_id].row(bot_id) for bot_id in batch]
+                async with self._sessionmaker() as session:
+                    await BotRepositoryImpl(session).upsert_heartbeats(rows)
+                    await session.commit()
+                written += len(rows)
+        except Exception as e:
+            HEARTBEAT_FLUSH.observe(time.perf_counter() - started, "failed")
+            logger.error(f"Failed to write {len(bot_ids) - written} bot heartbeats: {e}")
+            self._requeue(pending, bot_ids[written:])
+            return written
+
+        HEARTBEAT_FLUSH.observe(time.perf_counter() - started, "ok")
+        return written
+
+    def _requeue(self, pending: dict[str, PendingHeartbeat], bot_ids: list[str]):
+        """Вернуть незаписанные heartbeat-ы в буфер, не вытесняя более новые"""
+        dropped = 0
+        for bot_id in bot_ids:
+            entry = pending[bot_id]
+            newer = self._pending.get(bot_id)
+            if newer is not None:
+                newer.merge_older(entry)
+            elif len(self._pending) < self._max_entries:
+                self._pending[bot_id] = entry
+            else:
+                dropped += 1
+        if dropped:
+            HEARTBEATS.inc("dropped", amount=dropped)
+            logger.warning(f"Dropped {dropped} bot heartbeats: buffer is full")
@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Optional, List, Protocol
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID, insert
+
+from database.models import Bot, FeatureConfig
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
+
+# (bot_id, config_id, applied_version, stats JSON, last_seen_at, число heartbeat-ов)
+HeartbeatRow = tuple[str, Optional[UUID], Optional[int], Optional[str], datetime, int]
+
+
+class BotRepository(Protocol):
+    """Интерфейс репозитория ботов"""
+
+    async def upsert_heartbeats(self, rows: List[HeartbeatRow]) -> None: ...
+
+    async def get_by_id(self, bot_id: str) -> Optional[Bot]: ...
+
+    async def find(
+        self,
+        config_id: Optional[UUID] = None,
+        seen_since: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Bot]: ...
+
+    async def count_by_version(
+        self, config_id: UUID, seen_since: Optional[datetime] = None
+    ) -> List[tuple[Optional[int], int]]: ...
+
+    async def delete(self, bot_id: str) -> bool: ...
+
+
+@traced
+@timed_repository
+class BotRepositoryImpl(BotRepository):
+    """Репозиторий ботов"""
+
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def upsert_heartbeats(self, rows: List[HeartbeatRow]) -> None:
+        """Записать пачку heartbeat-ов одним INSERT ... SELECT FROM unnest(...).
+
+        Шесть массивов-параметров вместо строки VALUES на бот: размер запроса
+        и число параметров не зависят от размера пачки. Несуществующий config_id
+        отбрасывается LEFT JOIN-ом, а не ошибкой внешнего ключа на всю пачку.
+        Более старый heartbeat (пачка другого воркера) не затирает новые поля.
+        """
+        bot_ids, config_ids, versions, stats, seen_at, counts = (
+            list(values) for values in zip(*rows)
+        )
+        heartbeat = (
+            func.unnest(
+                bindparam("bot_ids", bot_ids, type_=ARRAY(String)),
+                bindparam("config_ids", config_ids, type_=ARRAY(PG_UUID(as_uuid=True))),
+                bindparam("versions", versions, type_=ARRAY(Integer)),
+                bindparam("stats", stats, type_=ARRAY(Text)),
+                bindparam("seen_at", seen_at, type_=ARRAY(DateTime(timezone=True))),
+                bindparam("counts", counts, type_=ARRAY(BigInteger)),
+            )
+            .table_valued(
+                column("bot_id", String),
+                column("config_id", PG_UUID(as_uuid=True)),
+                column("applied_version", Integer),
+                column("stats", Text),
+                column("seen_at", DateTime(timezone=True)),
+                column("heartbeats", BigInteger),
+            )
+            .render_derived(name="heartbeat")
+        )
+        query = insert(Bot).from_select(
+            ["id", "config_id", "applied_version", "stats", "last_seen_at", "heartbeat_count"],
+            select(
+                heartbeat.c.bot_id,
+                FeatureConfig.id,
+                heartbeat.c.applied_version,
+                cast(heartbeat.c.stats, JSONB),
+                heartbeat.c.seen_at,
+                heartbeat.c.heartbeats,
+            ).select_from(
+                heartbeat.outerjoin(FeatureConfig, FeatureConfig.id == heartbeat.c.config_id)
+            ),
+        )
+        excluded = query.excluded
+        newer = excluded.last_seen_at >= Bot.last_seen_at
+        query = query.on_conflict_do_update(
+            index_elements=[Bot.id],
+            set_={
+                **{
+                    name: case(
+                        (newer, func.coalesce(excluded[name], Bot.__table__.c[name])),
+                        else_=Bot.__table__.c[name],
+                    )
+                    for name in ("config_id", "applied_version", "stats")
+                },
+                "last_seen_at": func.greatest(Bot.last_seen_at, excluded.last_seen_at),
+                "heartbeat_count": Bot.heartbeat_count + excluded.heartbeat_count,
+            },
+        )
+        await self._session.execute(query)
+
+    async def get_by_id(self, bot_id: str) -> Optional[Bot]:
+        return await self._session.get(Bot, bot_id)
+
+    async def find(
+        self,
+        config_id: Optional[UUID] = None,
+        seen_since: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Bot]:
+        query = select(Bot).order_by(Bot.last_seen_at.desc(), Bot.id).offset(skip).limit(limit)
+        if config_id is not None:
+            query = query.where(Bot.config_id == config_id)
+        if seen_since is not None:
+            query = query.where(Bot.last_seen_at >= seen_since)
+        result = await self._session.execute(query)
+        return list(result.scalars().all())
+
+    async def count_by_version(
+        self, config_id: UUID, seen_since: Optional[datetime] = None
+    ) -> List[tuple[Optional[int], int]]:
+        query = (
+            select(Bot.applied_version, func.count())
+            .where(Bot.config_id == config_id)
+            .group_by(Bot.applied_version)
+            .order_by(Bot.applied_version.desc().nulls_last())
+        )
+        if seen_since is not None:
+            query = query.where(Bot.last_seen_at >= seen_since)
+        result = await self._session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def delete(self, bot_id: str) -> bool:
+        result = await self._session.execute(delete(Bot).where(Bot.id == bot_id))
+        return result.rowcount > 0
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime
+
+BOT_ID_PATTERN = r"^[A-Za-z0-9._:-]+$"
+# Колонка bot.applied_version - integer (int4)
+MAX_APPLIED_VERSION = 2**31 - 1
+
+
+class BotStats(BaseModel):
+    """Базовая статистика бота с момента запуска"""
+
+    uptime_seconds: Optional[float] = Field(None, ge=0)
+    requests: Optional[int] = Field(None, ge=0)
+    errors: Optional[int] = Field(None, ge=0)
+    cpu_percent: Optional[float] = Field(None, ge=0)
+    memory_mb: Optional[float] = Field(None, ge=0)
+
+
+class BotHeartbeat(BaseModel):
+    # Неизвестная конфигурация не ломает пачку: config_id бота остаётся прежним
+    config_id: Optional[UUID] = None
+    applied_version: Optional[int] = Field(None, ge=1, le=MAX_APPLIED_VERSION)
+    stats: Optional[BotStats] = None
+
+
+class BotResponse(BaseModel):
+    id: str
+    config_id: Optional[UUID]
+    applied_version: Optional[int]
+    stats: Optional[Dict[str, Any]]
+    heartbeat_count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BotVersionCount(BaseModel):
+    applied_version: Optional[int]
+    bots: int
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Protocol, List, Optional
+from uuid import UUID
+
+from api.v1.audit.log import AuditLog, snapshot
+from api.v1.bot.repository import BotRepository
+from database.UnitOfWork import UnitOfWork
+from database.models import Bot
+from tracing.instrumentation import traced
+
+
+class BotService(Protocol):
+    """Протокол сервиса ботов"""
+
+    async def list_bots(
+        self,
+        config_id: Optional[UUID] = None,
+        seen_since: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Bot]: ...
+
+    async def get_bot(self, bot_id: str) -> Optional[Bot]: ...
+
+    async def delete_bot(self, bot_id: str) -> bool: ...
+
+    async def get_version_summary(
+        self, config_id: UUID, seen_since: Optional[datetime] = None
+    ) -> List[tuple[Optional[int], int]]: ...
+
+
+@traced
+class BotServiceImpl:
+    """Сервис ботов. Heartbeat-ы пишет HeartbeatBuffer, минуя сервис"""
+
+    def __init__(self, repository: BotRepository, uow: UnitOfWork, audit: AuditLog):
+        self._repository = repository
+        self._uow = uow
+        self._audit = audit
+
+    async def list_bots(
+        self,
+        config_id: Optional[UUID] = None,
+        seen_since: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Bot]:
+        async with self._uow:
+            return await self._repository.find(config_id, seen_since, skip, limit)
+
+    async def get_bot(self, bot_id: str) -> Optional[Bot]:
+        async with self._uow:
+            return await self._repository.get_by_id(bot_id)
+
+    async def delete_bot(self, bot_id: str) -> bool:
+        async with self._uow:
+            bot = await self._repository.get_by_id(bot_id)
+            if bot is None:
+                return False
+            await self._repository.delete(bot_id)
+            await self._audit.record(
+                "delete", "bot", bot_id, config_id=bot.config_id, before=snapshot(bot)
+            )
+            return True
+
+    async def get_version_summary(
+        self, config_id: UUID, seen_since: Optional[datetime] = None
+    ) -> List[tuple[Optional[int], int]]:
+        """Сколько ботов конфигурации на какой версии"""
+        async with self._uow:
+            return await self._repository.count_by_version(config_id, seen_since)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Path, Query, Response, status
+from dishka.integrations.fastapi import FromDishka, inject
+
+from api.v1.bot.heartbeats import HeartbeatBuffer
+from api.v1.bot.schema import BOT_ID_PATTERN, BotHeartbeat, BotResponse, BotVersionCount
+from api.v1.bot.service import BotService
+from src.config import settings
+
+bot_router = APIRouter(prefix="/bots", tags=["bots"])
+
+BotId = Path(max_length=64, pattern=BOT_ID_PATTERN)
+
+
+def _seen_since(seen_within: Optional[int]) -> Optional[datetime]:
+    if seen_within is None:
+        return None
+    return datetime.now(timezone.utc) - timedelta(seconds=seen_within)
+
+
+@bot_router.post("/{bot_id}/heartbeat", status_code=status.HTTP_202_ACCEPTED)
+@inject
+async def post_heartbeat(
+    heartbeats: FromDishka[HeartbeatBuffer], heartbeat: BotHeartbeat, bot_id: str = BotId
+):
+    """Heartbeat бота: применённая версия конфигурации и статистика.
+
+    Пишется в БД пачкой в течение BOT_HEARTBEAT_FLUSH_INTERVAL; 503 - буфер
+    воркера заполнен, повторить после Retry-After.
+    """
+    if not heartbeats.offer(bot_id, heartbeat):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Heartbeat buffer is full",
+            headers={"Retry-After": str(settings.bots.heartbeat_retry_after)},
+        )
+    return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
+@bot_router.get("", response_model=List[BotResponse])
+@inject
+async def list_bots(
+    service: FromDishka[BotService],
+    config_id: Optional[UUID] = Query(None),
+    seen_within: Optional[int] = Query(
+        None, ge=1, description="Только боты, приславшие heartbeat за столько секунд"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Боты от недавно активных к давно молчащим"""
+    return await service.list_bots(config_id, _seen_since(seen_within), skip, limit)
+
+
+@bot_router.get("/versions", response_model=List[BotVersionCount])
+@inject
+async def get_version_summary(
+    service: FromDishka[BotService],
+    config_id: UUID = Query(...),
+    seen_within: Optional[int] = Query(None, ge=1),
+):
+    """Распределение ботов конфигурации по применённым версиям"""
+    summary = await service.get_version_summary(config_id, _seen_since(seen_within))
+    return [BotVersionCount(applied_version=version, bots=bots) for version, bots in summary]
+
+
+@bot_router.get("/{bot_id}", response_model=BotResponse)
+@inject
+async def get_bot(service: FromDishka[BotService], bot_id: str = BotId):
+    """Получить бота"""
+    bot = await service.get_bot(bot_id)
+    if not bot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bot not found")
+    return bot
+
+
+@bot_router.delete("/{bot_id}", status_code=status.HTTP_204_NO_CONTENT)
+@inject
+async def delete_bot(service: FromDishka[BotService], bot_id: str = BotId) -> None:
+    """Удалить бота; следующий heartbeat создаст его заново"""
+    if not await service.delete_bot(bot_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bot not found")
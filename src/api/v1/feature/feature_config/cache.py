@@ -0,0 +1,210 @@
+import asyncio
+import time
+from typing import Optional, Union
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.feature.feature_config.repository import FeatureConfigRepositoryImpl
+from api.v1.feature.schemas import FeatureConfigDetailResponse
+from cache.shared_snapshot import SharedSnapshot
+from database.models import FeatureConfig
+from src.config import CacheSettings
+
+# Advisory lock, упорядочивающий сборку снапшота между воркерами
+SNAPSHOT_LOCK_KEY = 7_260_315_001
+
+
+def serialize_config(config: FeatureConfig) -> bytes:
+    """Сериализовать конфигурацию в JSON ответа GET /feature-configs/{config_id}"""
+    return FeatureConfigDetailResponse.model_validate(config).model_dump_json().encode()
+
+
+class ConfigCache:
+    """In-process кэш сериализованных конфигураций для чтения ботами.
+
+    Записи инвалидируются после коммита изменений. Каждая инвалидация увеличивает
+    поколение кэша: результат чтения, начатого до инвалидации, в кэш не попадёт.
+    TTL ограничивает устаревание, если изменение сделал другой воркер.
+
+    С общим снапшотом (CONFIG_SNAPSHOT_DIR) активные конфигурации читаются из
+    общей памяти: воркер, закоммитивший изменение, один раз пересобирает снапшот,
+    остальные видят новое поколение и сбрасывают локальные записи. До публикации
+    своего изменения воркер читает изменённые конфигурации мимо снапшота, поэтому
+    клиент сразу видит свою запись; другие воркеры видят её после публикации.
+    Снапшот старше snapshot_max_age не отдаётся и пересобирается из БД: так видны
+    изменения с других хостов и прямые правки БД. При старте снапшот всегда
+    пересобирается, поколение, оставшееся от прошлого запуска, не используется.
+    """
+
+    def __init__(
+        self,
+        cache_settings: CacheSettings,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        snapshot: Optional[SharedSnapshot] = None,
+    ):
+        self._enabled = cache_settings.enabled
+        self._ttl = cache_settings.ttl
+        self._max_entries = cache_settings.max_entries
+        self._sessionmaker = sessionmaker
+        self._snapshot = snapshot if cache_settings.enabled else None
+        self._snapshot_max_age = cache_settings.snapshot_max_age
+        self._entries: dict[UUID, tuple[bytes, float]] = {}
+        self._generation = 0
+        # config_id -> поколение инвалидации, которое ещё не попало в снапшот
+        self._stale: dict[UUID, int] = {}
+        self._stale_all: Optional[int] = None
+        self._publish_pending = False
+        self._publish_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def __len__(self) -> int:
+        shared = len(self._snapshot) if self._snapshot is not None else 0
+        return len(self._entries) + shared
+
+    def get(self, config_id: UUID) -> Optional[Union[bytes, memoryview]]:
+        if self._snapshot is not None:
+            self._refresh_snapshot()
+            if self._snapshot_fresh() and not self._is_stale(config_id):
+                payload = self._snapshot.get(config_id)
+                if payload is not None:
+                    self.hits += 1
+                    return payload
+
+        entry = self._entries.get(config_id)
+        if entry is None or entry[1] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, config_id: UUID, payload: bytes, generation: int) -> None:
+        """Сохранить результат чтения, начатого при поколении generation"""
+        if not self._enabled or generation != self._generation:
+            return
+        if config_id not in self._entries and len(self._entries) >= self._max_entries:
+            return
+        self._entries[config_id] = (payload, time.monotonic() + self._ttl)
+
+    def invalidate(self, config_id: UUID) -> None:
+        self._generation += 1
+        self._entries.pop(config_id, None)
+        if self._snapshot is not None:
+            self._stale[config_id] = self._generation
+        self._schedule_publish()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        if self._snapshot is not None:
+            self._stale.clear()
+            self._stale_all = self._generation
+        self._schedule_publish()
+
+    def _refresh_snapshot(self):
+        if self._snapshot.refresh():
+            # Новое поколение снапшота - где-то закоммитили изменение
+            self._generation += 1
+            self._entries.clear()
+
+    def _snapshot_fresh(self) -> bool:
+        published_at = self._snapshot.published_at
+        if time.time() - published_at <= self._snapshot_max_age:
+            return True
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.get_running_loop().create_task(
+                self._rebuild(published_at)
+            )
+        return False
+
+    async def _rebuild(self, stale_before: float):
+        try:
+            await self.publish(stale_before=stale_before)
+        except Exception as e:
+            logger.error(f"Failed to rebuild expired config snapshot: {e}")
+
+    def _is_stale(self, config_id: UUID) -> bool:
+        return self._stale_all is not None or config_id in self._stale
+
+    def _mark_published(self, generation: int):
+        """Снапшот собран после инвалидаций до поколения generation включительно"""
+        if self._stale_all is not None and self._stale_all <= generation:
+            self._stale_all = None
+        self._stale = {
+            config_id: stale for config_id, stale in self._stale.items() if stale > generation
+        }
+
+    async def warm(self) -> int:
+        """Загрузить активные конфигурации"""
+        if not self._enabled:
+            self.warmed = True
+            return 0
+
+        if self._snapshot is not None:
+            # Поколение из /dev/shm могло пережить рестарт: берётся только собранное
+            # после начала прогрева (соседним воркером), иначе снапшот пересобирается
+            loaded = await self.publish(stale_before=time.time())
+        else:
+            generation = self._generation
+            async with self._sessionmaker() as session:
+                repository = FeatureConfigRepositoryImpl(session)
+                configs = await repository.get_active_configs_with_details()
+            for config in configs:
+                self.put(config.id, serialize_config(config), generation)
+            loaded = len(configs)
+
+        self.warmed = True
+        logger.info(f"Config cache warmed with {loaded} active configs")
+        return loaded
+
+    async def publish(self, stale_before: Optional[float] = None) -> int:
+        """Пересобрать общий снапшот активных конфигураций.
+
+        Сборка идёт под advisory lock: следующий воркер читает БД только после того,
+        как предыдущий опубликовал своё поколение, поэтому поколения не откатываются.
+        С stale_before снапшот, опубликованный позже этого времени (пока ждали lock,
+        его пересобрал другой воркер), не пересобирается.
+        """
+        async with self._sessionmaker() as session:
+            await session.execute(select(func.pg_advisory_xact_lock(SNAPSHOT_LOCK_KEY)))
+            if stale_before is not None:
+                self._refresh_snapshot()
+                if self._snapshot.published_at > stale_before:
+                    await session.rollback()
+                    return len(self._snapshot)
+            repository = FeatureConfigRepositoryImpl(session)
+            configs = await repository.get_active_configs_with_details()
+            entries = {config.id: serialize_config(config) for config in configs}
+            await asyncio.to_thread(self._snapshot.publish, entries)
+            await session.rollback()
+        return len(entries)
+
+    def _schedule_publish(self):
+        if self._snapshot is None:
+            return
+        self._publish_pending = True
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.get_running_loop().create_task(self._publish_loop())
+
+    async def _publish_loop(self):
+        # Изменения, пришедшие во время сборки, объединяются в одну следующую сборку
+        while self._publish_pending:
+            self._publish_pending = False
+            # Сборка читает БД после всех коммитов, инвалидированных до этого поколения
+            generation = self._generation
+            try:
+                await self.publish()
+            except Exception as e:
+                # Изменённые конфигурации читаются мимо снапшота до следующей публикации
+                logger.error(f"Failed to publish config snapshot: {e}")
+                continue
+            self._mark_published(generation)
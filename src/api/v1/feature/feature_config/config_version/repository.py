@@ -1,26 +1,47 @@
+from datetime import datetime
 from typing import Optional, List, Protocol
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, delete, update, lambda_stmt
 
 from database.models import (
     FeatureConfigVersion,
 )
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
 
 
 class FeatureConfigVersionRepository(Protocol):
     """Интерфейс репозитория для версий конфигураций"""
 
     async def create_version(
-        self, config_id: UUID, changelog: str = None, created_by: str = None
+        self,
+        config_id: UUID,
+        changelog: str = None,
+        created_by: str = None,
+        is_tagged: bool = False,
     ) -> FeatureConfigVersion: ...
 
     async def get_config_versions(self, config_id: UUID) -> List[FeatureConfigVersion]: ...
 
     async def get_latest_version(self, config_id: UUID) -> Optional[FeatureConfigVersion]: ...
 
+    async def get_latest_version_number(self, config_id: UUID) -> Optional[int]: ...
 
+    async def set_tagged(
+        self, config_id: UUID, version_number: int, is_tagged: bool
+    ) -> Optional[FeatureConfigVersion]: ...
+
+    async def get_retention_boundary(self, config_id: UUID, keep_last: int) -> Optional[int]: ...
+
+    async def delete_expired(
+        self, config_id: UUID, boundary: int, created_before: datetime, limit: int
+    ) -> int: ...
+
+
+@traced
+@timed_repository
 class FeatureConfigVersionRepositoryImpl(FeatureConfigVersionRepository):
     """Репозиторий для версий конфигураций"""
 
@@ -28,7 +49,11 @@ class FeatureConfigVersionRepositoryImpl(FeatureConfigVersionRepository):
         self._session = db_session
 
     async def create_version(
-        self, config_id: UUID, changelog: str = None, created_by: str = None
+        self,
+        config_id: UUID,
+        changelog: str = None,
+        created_by: str = None,
+        is_tagged: bool = False,
     ) -> FeatureConfigVersion:
         latest_version = await self.get_latest_version(config_id)
         version_number = (latest_version.version_number + 1) if latest_version else 1
@@ -38,6 +63,7 @@ class FeatureConfigVersionRepositoryImpl(FeatureConfigVersionRepository):
             version_number=version_number,
             changelog=changelog,
             created_by=created_by,
+            is_tagged=is_tagged,
         )
         self._session.add(version)
         await self._session.flush()
@@ -45,8 +71,8 @@ class FeatureConfigVersionRepositoryImpl(FeatureConfigVersionRepository):
         return version
 
     async def get_config_versions(self, config_id: UUID) -> List[FeatureConfigVersion]:
-        query = (
-            select(FeatureConfigVersion)
+        query = lambda_stmt(
+            lambda: select(FeatureConfigVersion)
             .where(FeatureConfigVersion.config_id == config_id)
             .order_by(desc(FeatureConfigVersion.version_number))
         )
@@ -54,11 +80,73 @@ class FeatureConfigVersionRepositoryImpl(FeatureConfigVersionRepository):
         return list(result.scalars().all())
 
     async def get_latest_version(self, config_id: UUID) -> Optional[FeatureConfigVersion]:
+        query = lambda_stmt(
+            lambda: select(FeatureConfigVersion)
+            .where(FeatureConfigVersion.config_id == config_id)
+            .order_by(desc(FeatureConfigVersion.version_number))
+            .limit(1)
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_latest_version_number(self, config_id: UUID) -> Optional[int]:
+        """Номер последней версии без загрузки строки; None - версий нет"""
+        query = lambda_stmt(
+            lambda: select(FeatureConfigVersion.version_number)
+            .where(FeatureConfigVersion.config_id == config_id)
+            .order_by(desc(FeatureConfigVersion.version_number))
+            .limit(1)
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def set_tagged(
+        self, config_id: UUID, version_number: int, is_tagged: bool
+    ) -> Optional[FeatureConfigVersion]:
         query = (
-            select(FeatureConfigVersion)
+            update(FeatureConfigVersion)
+            .where(
+                FeatureConfigVersion.config_id == config_id,
+                FeatureConfigVersion.version_number == version_number,
+            )
+            .values(is_tagged=is_tagged)
+            .returning(FeatureConfigVersion)
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_retention_boundary(self, config_id: UUID, keep_last: int) -> Optional[int]:
+        """Номер самой новой версии за пределами последних keep_last; None - удалять нечего"""
+        query = lambda_stmt(
+            lambda: select(FeatureConfigVersion.version_number)
             .where(FeatureConfigVersion.config_id == config_id)
             .order_by(desc(FeatureConfigVersion.version_number))
+            .offset(keep_last)
             .limit(1)
         )
         result = await self._session.execute(query)
         return result.scalar_one_or_none()
+
+    async def delete_expired(
+        self, config_id: UUID, boundary: int, created_before: datetime, limit: int
+    ) -> int:
+        """Удалить до limit непомеченных версий с номером <= boundary старше created_before"""
+        expired = (
+            select(FeatureConfigVersion.id)
+            .where(
+                FeatureConfigVersion.config_id == config_id,
+                FeatureConfigVersion.version_number <= boundary,
+                FeatureConfigVersion.created_at < created_before,
+                FeatureConfigVersion.is_tagged == False,
+            )
+            .order_by(FeatureConfigVersion.version_number)
+            .limit(limit)
+        )
+        query = (
+            delete(FeatureConfigVersion)
+            .where(FeatureConfigVersion.id.in_(expired))
+            # Без синхронизации identity map: иначе ORM добавляет RETURNING всех id
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(query)
+        return result.rowcount
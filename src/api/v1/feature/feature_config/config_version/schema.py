@@ -7,6 +7,7 @@ from datetime import datetime
 class FeatureConfigVersionCreate(BaseModel):
     changelog: Optional[str] = None
     created_by: Optional[str] = Field(None, max_length=64)
+    is_tagged: bool = False
 
 
 class FeatureConfigVersionResponse(BaseModel):
@@ -15,6 +16,7 @@ class FeatureConfigVersionResponse(BaseModel):
     version_number: int
     changelog: Optional[str]
     created_by: Optional[str]
+    is_tagged: bool
     created_at: datetime
 
     class Config:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
 from dishka.integrations.fastapi import FromDishka, inject
 from uuid import UUID
 from typing import List
@@ -33,3 +33,36 @@ async def create_config_version(
 ):
     """Создать новую версию конфигурации"""
     return await service.create_config_version(config_id, version_data)
+
+
+async def _set_version_tag(
+    service: FeatureConfigService, config_id: UUID, version_number: int, is_tagged: bool
+):
+    version = await service.set_version_tag(config_id, version_number, is_tagged)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Config version not found"
+        )
+    return version
+
+
+@version_router.put(
+    "/{config_id}/versions/{version_number}/tag", response_model=FeatureConfigVersionResponse
+)
+@inject
+async def tag_config_version(
+    service: FromDishka[FeatureConfigService], config_id: UUID, version_number: int
+):
+    """Пометить версию: политика хранения её не удаляет"""
+    return await _set_version_tag(service, config_id, version_number, True)
+
+
+@version_router.delete(
+    "/{config_id}/versions/{version_number}/tag", response_model=FeatureConfigVersionResponse
+)
+@inject
+async def untag_config_version(
+    service: FromDishka[FeatureConfigService], config_id: UUID, version_number: int
+):
+    """Снять пометку с версии"""
+    return await _set_version_tag(service, config_id, version_number, False)
@@ -2,7 +2,7 @@ from typing import Optional, List, Protocol
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, exists, and_
+from sqlalchemy import select, update, delete, exists, and_, lambda_stmt
 from sqlalchemy.orm import selectinload
 
 from database.models import (
@@ -11,6 +11,8 @@ from database.models import (
     Environment,
 )
 from database.AbstractRepository import AbstractRepository
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
 from exceptions.exceptions import FeatureFlagAlreadyExistsError, FeatureFlagNotFoundError
 
 
@@ -25,11 +27,15 @@ class FeatureConfigRepository(AbstractRepository[FeatureConfig], Protocol):
 
     async def get_active_configs(self) -> List[FeatureConfig]: ...
 
+    async def get_active_configs_with_details(self) -> List[FeatureConfig]: ...
+
     async def activate_config(self, config_id: UUID) -> bool: ...
 
     async def deactivate_config(self, config_id: UUID) -> bool: ...
 
 
+@traced
+@timed_repository
 class FeatureConfigRepositoryImpl(FeatureConfigRepository):
     """Репозиторий для работы с конфигурациями"""
 
@@ -49,8 +55,8 @@ class FeatureConfigRepositoryImpl(FeatureConfigRepository):
         return entity
 
     async def get_by_id(self, entity_id: UUID) -> Optional[FeatureConfig]:
-        query = (
-            select(FeatureConfig)
+        query = lambda_stmt(
+            lambda: select(FeatureConfig)
             .options(
                 selectinload(FeatureConfig.features).selectinload(FeatureConfigFlag.feature),
                 selectinload(FeatureConfig.versions),
@@ -61,8 +67,8 @@ class FeatureConfigRepositoryImpl(FeatureConfigRepository):
         return result.scalar_one_or_none()
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[FeatureConfig]:
-        query = (
-            select(FeatureConfig)
+        query = lambda_stmt(
+            lambda: select(FeatureConfig)
             .options(selectinload(FeatureConfig.versions))
             .offset(skip)
             .limit(limit)
@@ -72,13 +78,14 @@ class FeatureConfigRepositoryImpl(FeatureConfigRepository):
         return list(result.scalars().all())
 
     async def update(self, entity: FeatureConfig) -> FeatureConfig:
-        existing = await self.get_by_id(entity.id)
-        if not existing:
-            raise FeatureFlagNotFoundError(f"Feature config with id '{entity.id}' not found")
+        # Сущность, загруженная в этой же сессии, уже отслеживается: повторно не читаем
+        if entity not in self._session:
+            if not await self.exists(entity.id):
+                raise FeatureFlagNotFoundError(f"Feature config with id '{entity.id}' not found")
+            entity = await self._session.merge(entity)
 
-        await self._session.merge(entity)
+        # onupdate для updated_at вычисляется на стороне Python, refresh не нужен
         await self._session.flush()
-        await self._session.refresh(entity)
         return entity
 
     async def delete(self, entity_id: UUID) -> bool:
@@ -87,15 +94,17 @@ class FeatureConfigRepositoryImpl(FeatureConfigRepository):
         return result.rowcount > 0
 
     async def exists(self, entity_id: UUID) -> bool:
-        query = select(exists().where(FeatureConfig.id == entity_id))
+        query = lambda_stmt(lambda: select(exists().where(FeatureConfig.id == entity_id)))
         result = await self._session.execute(query)
         return result.scalar()
 
     async def get_by_name_and_env(
         self, name: str, environment: Environment
     ) -> Optional[FeatureConfig]:
-        query = select(FeatureConfig).where(
-            and_(FeatureConfig.name == name, FeatureConfig.environment == environment)
+        query = lambda_stmt(
+            lambda: select(FeatureConfig).where(
+                and_(FeatureConfig.name == name, FeatureConfig.environment == environment)
+            )
         )
         result = await self._session.execute(query)
         return result.scalar_one_or_none()
@@ -118,6 +127,18 @@ class FeatureConfigRepositoryImpl(FeatureConfigRepository):
         result = await self._session.execute(query)
         return list(result.scalars().all())
 
+    async def get_active_configs_with_details(self) -> List[FeatureConfig]:
+        query = (
+            select(FeatureConfig)
+            .options(
+                selectinload(FeatureConfig.features).selectinload(FeatureConfigFlag.feature),
+                selectinload(FeatureConfig.versions),
+            )
+            .where(FeatureConfig.is_active == True)
+        )
+        result = await self._session.execute(query)
+        return list(result.scalars().all())
+
     async def activate_config(self, config_id: UUID) -> bool:
         query = update(FeatureConfig).where(FeatureConfig.id == config_id).values(is_active=True)
         result = await self._session.execute(query)
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional, List, Protocol
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update
+
+from database.models import ScheduledChange, ScheduledChangeStatus
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
+
+# Канал LISTEN/NOTIFY, через который лидер узнаёт о новых изменениях
+SCHEDULED_CHANGE_CHANNEL = "scheduled_change"
+
+
+class ScheduledChangeRepository(Protocol):
+    """Интерфейс репозитория отложенных изменений"""
+
+    async def add(self, change: ScheduledChange) -> ScheduledChange: ...
+
+    async def get_by_id(self, change_id: int) -> Optional[ScheduledChange]: ...
+
+    async def get_config_changes(
+        self, config_id: UUID, status: Optional[ScheduledChangeStatus] = None
+    ) -> List[ScheduledChange]: ...
+
+    async def get_pending(self) -> List[tuple[int, datetime]]: ...
+
+    async def lock_pending(self, change_id: int) -> Optional[ScheduledChange]: ...
+
+    async def notify(self, change: ScheduledChange) -> None: ...
+
+    async def mark_failed(self, change_id: int, error: str) -> None: ...
+
+
+@traced
+@timed_repository
+class ScheduledChangeRepositoryImpl(ScheduledChangeRepository):
+    """Репозиторий отложенных изменений"""
+
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def add(self, change: ScheduledChange) -> ScheduledChange:
+        self._session.add(change)
+        await self._session.flush()
+        await self._session.refresh(change)
+        return change
+
+    async def get_by_id(self, change_id: int) -> Optional[ScheduledChange]:
+        return await self._session.get(ScheduledChange, change_id)
+
+    async def get_config_changes(
+        self, config_id: UUID, status: Optional[ScheduledChangeStatus] = None
+    ) -> List[ScheduledChange]:
+        query = (
+            select(ScheduledChange)
+            .where(ScheduledChange.config_id == config_id)
+            .order_by(ScheduledChange.run_at)
+        )
+        if status is not None:
+            query = query.where(ScheduledChange.status == status)
+        result = await self._session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_pending(self) -> List[tuple[int, datetime]]:
+        query = select(ScheduledChange.id, ScheduledChange.run_at).where(
+            ScheduledChange.status == ScheduledChangeStatus.PENDING
+        )
+        result = await self._session.execute(query)
+        return [(row.id, row.run_at) for row in result]
+
+    async def lock_pending(self, change_id: int) -> Optional[ScheduledChange]:
+        """Заблокировать ожидающее изменение; None - его уже применили или отменили"""
+        query = (
+            select(ScheduledChange)
+            .where(
+                ScheduledChange.id == change_id,
+                ScheduledChange.status == ScheduledChangeStatus.PENDING,
+            )
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def notify(self, change: ScheduledChange) -> None:
+        """NOTIFY уходит при коммите транзакции, в которой создано изменение"""
+        payload = f"{change.id}:{change.run_at.timestamp()}"
+        await self._session.execute(select(func.pg_notify(SCHEDULED_CHANGE_CHANNEL, payload)))
+
+    async def mark_failed(self, change_id: int, error: str) -> None:
+        query = (
+            update(ScheduledChange)
+            .where(ScheduledChange.id == change_id)
+            .values(status=ScheduledChangeStatus.FAILED, error=error, applied_at=None)
+        )
+        await self._session.execute(query)
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+
+from database.models import ScheduledAction, ScheduledChangeStatus
+
+FEATURE_ACTIONS = (ScheduledAction.TOGGLE_FEATURE, ScheduledAction.UPDATE_MESSAGE)
+
+
+class ScheduledChangeCreate(BaseModel):
+    action: ScheduledAction
+    run_at: datetime
+    feature_id: Optional[UUID] = None
+    is_enabled: Optional[bool] = None
+    disabled_message: Optional[str] = Field(None, max_length=256)
+    created_by: Optional[str] = Field(None, max_length=64)
+
+    @model_validator(mode="after")
+    def check_action(self):
+        if self.run_at.tzinfo is None:
+            raise ValueError("run_at must include a timezone")
+        if self.action in FEATURE_ACTIONS and self.feature_id is None:
+            raise ValueError(f"'{self.action.value}' requires feature_id")
+        if self.action == ScheduledAction.TOGGLE_FEATURE and self.is_enabled is None:
+            raise ValueError("'toggle_feature' requires is_enabled")
+        return self
+
+
+class ScheduledChangeResponse(BaseModel):
+    id: int
+    config_id: UUID
+    feature_id: Optional[UUID]
+    action: ScheduledAction
+    is_enabled: Optional[bool]
+    disabled_message: Optional[str]
+    run_at: datetime
+    status: ScheduledChangeStatus
+    applied_at: Optional[datetime]
+    error: Optional[str]
+    created_by: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,83 @@
+from typing import Protocol, List, Optional
+from uuid import UUID
+
+from api.v1.audit.log import AuditLog, snapshot
+from api.v1.feature.feature_config.repository import FeatureConfigRepository
+from api.v1.feature.feature_config.scheduled_change.repository import ScheduledChangeRepository
+from api.v1.feature.feature_config.scheduled_change.schema import ScheduledChangeCreate
+from database.UnitOfWork import UnitOfWork
+from database.models import ScheduledChange, ScheduledChangeStatus
+from tracing.instrumentation import traced
+
+
+class ScheduledChangeService(Protocol):
+    """Протокол сервиса отложенных изменений"""
+
+    async def schedule_change(
+        self, config_id: UUID, change_data: ScheduledChangeCreate
+    ) -> Optional[ScheduledChange]: ...
+
+    async def get_config_changes(
+        self, config_id: UUID, status: Optional[ScheduledChangeStatus] = None
+    ) -> List[ScheduledChange]: ...
+
+    async def cancel_change(self, config_id: UUID, change_id: int) -> Optional[ScheduledChange]: ...
+
+
+@traced
+class ScheduledChangeServiceImpl:
+    """Сервис отложенных изменений. Применяет их ChangeScheduler на воркере-лидере"""
+
+    def __init__(
+        self,
+        repository: ScheduledChangeRepository,
+        config_repository: FeatureConfigRepository,
+        uow: UnitOfWork,
+        audit: AuditLog,
+    ):
+        self._repository = repository
+        self._config_repository = config_repository
+        self._uow = uow
+        self._audit = audit
+
+    async def schedule_change(
+        self, config_id: UUID, change_data: ScheduledChangeCreate
+    ) -> Optional[ScheduledChange]:
+        async with self._uow:
+            if not await self._config_repository.exists(config_id):
+                return None
+            change_fields = change_data.model_dump()
+            change_fields["created_by"] = change_fields["created_by"] or self._audit.actor
+            change = await self._repository.add(
+                ScheduledChange(config_id=config_id, **change_fields)
+            )
+            await self._repository.notify(change)
+            await self._audit.record(
+                "create", "scheduled_change", change.id, config_id=config_id, after=snapshot(change)
+            )
+            return change
+
+    async def get_config_changes(
+        self, config_id: UUID, status: Optional[ScheduledChangeStatus] = None
+    ) -> List[ScheduledChange]:
+        async with self._uow:
+            return await self._repository.get_config_changes(config_id, status)
+
+    async def cancel_change(self, config_id: UUID, change_id: int) -> Optional[ScheduledChange]:
+        """Отменить ожидающее изменение; изменение в другом статусе возвращается как есть"""
+        async with self._uow:
+            change = await self._repository.lock_pending(change_id)
+            if change is None or change.config_id != config_id:
+                existing = await self._repository.get_by_id(change_id)
+                return existing if existing and existing.config_id == config_id else None
+            before = snapshot(change)
+            change.status = ScheduledChangeStatus.CANCELLED
+            await self._audit.record(
+                "cancel",
+                "scheduled_change",
+                change_id,
+                config_id=config_id,
+                before=before,
+                after={"status": change.status},
+            )
+            return change
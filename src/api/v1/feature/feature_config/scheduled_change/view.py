@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from dishka.integrations.fastapi import FromDishka, inject
+from uuid import UUID
+from typing import List, Optional
+
+from api.v1.feature.feature_config.scheduled_change.schema import (
+    ScheduledChangeCreate,
+    ScheduledChangeResponse,
+)
+from api.v1.feature.feature_config.scheduled_change.service import ScheduledChangeService
+from database.models import ScheduledChangeStatus
+
+scheduled_change_router = APIRouter(tags=["feature-config-scheduled-changes"])
+
+
+@scheduled_change_router.get(
+    "/{config_id}/scheduled-changes", response_model=List[ScheduledChangeResponse]
+)
+@inject
+async def get_scheduled_changes(
+    service: FromDishka[ScheduledChangeService],
+    config_id: UUID,
+    change_status: Optional[ScheduledChangeStatus] = Query(None, alias="status"),
+):
+    """Получить отложенные изменения конфигурации"""
+    return await service.get_config_changes(config_id, change_status)
+
+
+@scheduled_change_router.post(
+    "/{config_id}/scheduled-changes",
+    response_model=ScheduledChangeResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+@inject
+async def schedule_change(
+    service: FromDishka[ScheduledChangeService],
+    config_id: UUID,
+    change_data: ScheduledChangeCreate,
+):
+    """Запланировать изменение конфигурации на момент run_at"""
+    change = await service.schedule_change(config_id, change_data)
+    if not change:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Feature config not found"
+        )
+    return change
+
+
+@scheduled_change_router.delete(
+    "/{config_id}/scheduled-changes/{change_id}", response_model=ScheduledChangeResponse
+)
+@inject
+async def cancel_scheduled_change(
+    service: FromDishka[ScheduledChangeService], config_id: UUID, change_id: int
+):
+    """Отменить ожидающее изменение"""
+    change = await service.cancel_change(config_id, change_id)
+    if not change:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Scheduled change not found"
+        )
+    if change.status != ScheduledChangeStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Scheduled change is already {change.status.value}",
+        )
+    return change
@@ -1,6 +1,7 @@
 from typing import Protocol, List, Optional
 from uuid import UUID
 
+from api.v1.audit.log import AuditLog, snapshot
 from api.v1.feature.feature_config.config_version.repository import (
     FeatureConfigVersionRepository,
 )
@@ -13,8 +14,10 @@ from api.v1.feature.schemas import (
     FeatureConfigFlagUpdate,
     Environment,
 )
+from api.v1.feature.feature_config.cache import ConfigCache
 from database.UnitOfWork import UnitOfWork
 from database.models import FeatureConfig, FeatureConfigFlag, FeatureConfigVersion
+from tracing.instrumentation import traced
 
 
 class FeatureConfigService(Protocol):
@@ -52,13 +55,24 @@ class FeatureConfigService(Protocol):
 
     async def get_config_features(self, config_id: UUID) -> List[FeatureConfigFlag]: ...
 
+    async def get_config_feature(
+        self, config_id: UUID, feature_id: UUID
+    ) -> Optional[FeatureConfigFlag]: ...
+
     async def create_config_version(
         self, config_id: UUID, version_data: FeatureConfigVersionCreate
     ) -> FeatureConfigVersion: ...
 
     async def get_config_versions(self, config_id: UUID) -> List[FeatureConfigVersion]: ...
 
+    async def get_latest_version_number(self, config_id: UUID) -> Optional[int]: ...
+
+    async def set_version_tag(
+        self, config_id: UUID, version_number: int, is_tagged: bool
+    ) -> Optional[FeatureConfigVersion]: ...
+
 
+@traced
 class FeatureConfigServiceImpl:
     """Сервис для работы с конфигурациями"""
 
@@ -68,19 +82,36 @@ class FeatureConfigServiceImpl:
         config_flag_repository: FeatureConfigFlagRepository,
         version_repository: FeatureConfigVersionRepository,
         uow: UnitOfWork,
+        cache: ConfigCache,
+        audit: AuditLog,
     ):
         self._config_repository = config_repository
         self._config_flag_repository = config_flag_repository
         self._version_repository = version_repository
         self._uow = uow
+        self._cache = cache
+        self._audit = audit
+
+    def _invalidate_on_commit(self, config_id: UUID):
+        self._uow.on_commit(lambda: self._cache.invalidate(config_id))
+
+    async def _create_version(self, config_id: UUID, changelog: str) -> FeatureConfigVersion:
+        return await self._version_repository.create_version(
+            config_id=config_id, changelog=changelog, created_by=self._audit.actor
+        )
 
     async def create_config(self, config_data: FeatureConfigCreate) -> FeatureConfig:
         async with self._uow:
             config = FeatureConfig(**config_data.model_dump())
             created_config = await self._config_repository.add(config)
 
-            await self._version_repository.create_version(
-                config_id=created_config.id, changelog="Initial version"
+            await self._create_version(created_config.id, "Initial version")
+            await self._audit.record(
+                "create",
+                "config",
+                created_config.id,
+                config_id=created_config.id,
+                after=snapshot(created_config),
             )
 
             return created_config
@@ -97,25 +128,43 @@ class FeatureConfigServiceImpl:
         self, config_id: UUID, update_data: FeatureConfigUpdate
     ) -> Optional[FeatureConfig]:
         async with self._uow:
+            self._invalidate_on_commit(config_id)
             config = await self._config_repository.get_by_id(config_id)
             if not config:
                 return None
 
+            before = snapshot(config)
             update_fields = update_data.model_dump(exclude_unset=True)
             for field, value in update_fields.items():
                 setattr(config, field, value)
 
             updated_config = await self._config_repository.update(config)
 
-            await self._version_repository.create_version(
-                config_id=config_id, changelog="Configuration updated"
+            await self._create_version(config_id, "Configuration updated")
+            await self._audit.record(
+                "update",
+                "config",
+                config_id,
+                config_id=config_id,
+                before=before,
+                after=snapshot(updated_config),
             )
 
             return updated_config
 
     async def delete_config(self, config_id: UUID) -> bool:
         async with self._uow:
-            return await self._config_repository.delete(config_id)
+            self._invalidate_on_commit(config_id)
+            config = await self._config_repository.get_by_id(config_id)
+            if not config:
+                return False
+            before = snapshot(config)
+            deleted = await self._config_repository.delete(config_id)
+            if deleted:
+                await self._audit.record(
+                    "delete", "config", config_id, config_id=config_id, before=before
+                )
+            return deleted
 
     async def get_configs_by_environment(self, environment: Environment) -> List[FeatureConfig]:
         async with self._uow:
@@ -127,19 +176,27 @@ class FeatureConfigServiceImpl:
 
     async def activate_config(self, config_id: UUID) -> bool:
         async with self._uow:
+            self._invalidate_on_commit(config_id)
             success = await self._config_repository.activate_config(config_id)
             if success:
-                await self._version_repository.create_version(
-                    config_id=config_id, changelog="Configuration activated"
+                await self._create_version(config_id, "Configuration activated")
+                await self._audit.record(
+                    "activate", "config", config_id, config_id=config_id, after={"is_active": True}
                 )
             return success
 
     async def deactivate_config(self, config_id: UUID) -> bool:
         async with self._uow:
+            self._invalidate_on_commit(config_id)
             success = await self._config_repository.deactivate_config(config_id)
             if success:
-                await self._version_repository.create_version(
-                    config_id=config_id, changelog="Configuration deactivated"
+                await self._create_version(config_id, "Configuration deactivated")
+                await self._audit.record(
+                    "deactivate",
+                    "config",
+                    config_id,
+                    config_id=config_id,
+                    after={"is_active": False},
                 )
             return success
 
@@ -148,26 +205,44 @@ class FeatureConfigServiceImpl:
     ) -> FeatureConfig:
         """Добавить функцию в конфигурацию и вернуть полную конфигурацию"""
         async with self._uow:
+            self._invalidate_on_commit(config_id)
             config_feature = await self._config_flag_repository.add_feature_to_config(
                 config_id=config_id, **feature_data.model_dump()
             )
 
-            await self._version_repository.create_version(
+            await self._create_version(
+                config_id, f"Feature {feature_data.feature_id} added to configuration"
+            )
+            await self._audit.record(
+                "add",
+                "config_feature",
+                f"{config_id}:{feature_data.feature_id}",
                 config_id=config_id,
-                changelog=f"Feature {feature_data.feature_id} added to configuration",
+                after=snapshot(config_feature),
             )
 
             return await self._config_repository.get_by_id(config_id)
 
     async def remove_feature_from_config(self, config_id: UUID, feature_id: UUID) -> bool:
         async with self._uow:
+            self._invalidate_on_commit(config_id)
+            binding = await self._config_flag_repository.get_config_feature(config_id, feature_id)
+            if not binding:
+                return False
+            before = snapshot(binding)
             success = await self._config_flag_repository.remove_feature_from_config(
                 config_id, feature_id
             )
             if success:
-                await self._version_repository.create_version(
+                await self._create_version(
+                    config_id, f"Feature {feature_id} removed from configuration"
+                )
+                await self._audit.record(
+                    "remove",
+                    "config_feature",
+                    f"{config_id}:{feature_id}",
                     config_id=config_id,
-                    changelog=f"Feature {feature_id} removed from configuration",
+                    before=before,
                 )
             return success
 
@@ -175,14 +250,27 @@ class FeatureConfigServiceImpl:
         self, config_id: UUID, feature_id: UUID, update_data: FeatureConfigFlagUpdate
     ) -> Optional[FeatureConfigFlag]:
         async with self._uow:
+            self._invalidate_on_commit(config_id)
+            binding = await self._config_flag_repository.get_config_feature(config_id, feature_id)
+            if not binding:
+                return None
+            before = snapshot(binding)
             update_fields = update_data.model_dump(exclude_unset=True)
             updated_feature = await self._config_flag_repository.update_config_feature(
                 config_id=config_id, feature_id=feature_id, **update_fields
             )
 
             if updated_feature:
-                await self._version_repository.create_version(
-                    config_id=config_id, changelog=f"Feature {feature_id} updated in configuration"
+                await self._create_version(
+                    config_id, f"Feature {feature_id} updated in configuration"
+                )
+                await self._audit.record(
+                    "update",
+                    "config_feature",
+                    f"{config_id}:{feature_id}",
+                    config_id=config_id,
+                    before=before,
+                    after=snapshot(updated_feature),
                 )
 
             return updated_feature
@@ -191,14 +279,50 @@ class FeatureConfigServiceImpl:
         async with self._uow:
             return await self._config_flag_repository.get_config_features(config_id)
 
+    async def get_config_feature(
+        self, config_id: UUID, feature_id: UUID
+    ) -> Optional[FeatureConfigFlag]:
+        async with self._uow:
+            return await self._config_flag_repository.get_config_feature(config_id, feature_id)
+
     async def create_config_version(
         self, config_id: UUID, version_data: FeatureConfigVersionCreate
     ) -> FeatureConfigVersion:
         async with self._uow:
-            return await self._version_repository.create_version(
-                config_id=config_id, **version_data.model_dump()
+            self._invalidate_on_commit(config_id)
+            version_fields = version_data.model_dump()
+            version_fields["created_by"] = version_fields["created_by"] or self._audit.actor
+            version = await self._version_repository.create_version(
+                config_id=config_id, **version_fields
+            )
+            await self._audit.record(
+                "create", "config_version", version.id, config_id=config_id, after=snapshot(version)
             )
+            return version
 
     async def get_config_versions(self, config_id: UUID) -> List[FeatureConfigVersion]:
         async with self._uow:
             return await self._version_repository.get_config_versions(config_id)
+
+    async def get_latest_version_number(self, config_id: UUID) -> Optional[int]:
+        async with self._uow:
+            return await self._version_repository.get_latest_version_number(config_id)
+
+    async def set_version_tag(
+        self, config_id: UUID, version_number: int, is_tagged: bool
+    ) -> Optional[FeatureConfigVersion]:
+        """Пометить версию (или снять пометку); помеченные версии не удаляются при компактизации"""
+        async with self._uow:
+            self._invalidate_on_commit(config_id)
+            version = await self._version_repository.set_tagged(
+                config_id, version_number, is_tagged
+            )
+            if version is not None:
+                await self._audit.record(
+                    "tag" if is_tagged else "untag",
+                    "config_version",
+                    version.id,
+                    config_id=config_id,
+                    after={"is_tagged": is_tagged},
+                )
+            return version
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
 from dishka.integrations.fastapi import FromDishka, inject
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List, Optional
 
@@ -13,6 +14,9 @@ from api.v1.feature.schemas import (
     FeatureConfigDetailResponse,
     Environment,
 )
+from admission.middleware import db_admission
+from api.v1.feature.feature_config.cache import ConfigCache, serialize_config
+from database.replica import ReplicaRouter, is_replica_session
 from exceptions.exceptions import FeatureFlagAlreadyExistsError
 
 
@@ -53,14 +57,35 @@ async def create_config(
 
 @_feature_config_router.get("/{config_id}", response_model=FeatureConfigDetailResponse)
 @inject
-async def get_config(service: FromDishka[FeatureConfigService], config_id: UUID):
+async def get_config(
+    service: FromDishka[FeatureConfigService],
+    cache: FromDishka[ConfigCache],
+    session: FromDishka[AsyncSession],
+    request: Request,
+    config_id: UUID,
+):
     """Получить конфигурацию со всеми функциями"""
-    config = await service.get_config(config_id)
+    # Клиент, видевший версию X-Config-Version, не должен получить из кэша более старую:
+    # такой запрос читается из БД, свежесть реплики проверяет ReplicaRouter
+    presented_version = request.headers.get(ReplicaRouter.VERSION_HEADER)
+    if presented_version is None:
+        payload = cache.get(config_id)
+        if payload is not None:
+            return Response(content=payload, media_type="application/json")
+
+    generation = cache.generation
+    # Место к БД middleware допуска оставил на промах кэша
+    with db_admission(request):
+        config = await service.get_config(config_id)
     if not config:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Feature config not found"
         )
-    return config
+    payload = serialize_config(config)
+    # Кэш общий для всех клиентов: отстающая реплика не должна попасть в него на TTL
+    if not is_replica_session(session):
+        cache.put(config_id, payload, generation)
+    return Response(content=payload, media_type="application/json")
 
 
 @_feature_config_router.put("/{config_id}", response_model=FeatureConfigResponse)
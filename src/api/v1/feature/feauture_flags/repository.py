@@ -2,12 +2,14 @@ from typing import Optional, List, Protocol
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, exists
+from sqlalchemy import select, delete, exists, lambda_stmt
 
 from database.models import (
     FeatureFlag,
 )
 from database.AbstractRepository import AbstractRepository
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
 from exceptions.exceptions import FeatureFlagAlreadyExistsError, FeatureFlagNotFoundError
 
 
@@ -17,6 +19,8 @@ class FeatureFlagRepository(AbstractRepository[FeatureFlag], Protocol):
     async def get_by_name(self, name: str) -> Optional[FeatureFlag]: ...
 
 
+@traced
+@timed_repository
 class FeatureFlagRepositoryImpl(FeatureFlagRepository):
     """Репозиторий для работы с функциями"""
 
@@ -36,25 +40,29 @@ class FeatureFlagRepositoryImpl(FeatureFlagRepository):
         return entity
 
     async def get_by_id(self, entity_id: UUID) -> Optional[FeatureFlag]:
-        query = select(FeatureFlag).where(FeatureFlag.id == entity_id)
+        query = lambda_stmt(lambda: select(FeatureFlag).where(FeatureFlag.id == entity_id))
         result = await self._session.execute(query)
         return result.scalar_one_or_none()
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[FeatureFlag]:
-        query = (
-            select(FeatureFlag).offset(skip).limit(limit).order_by(FeatureFlag.updated_at.desc())
+        query = lambda_stmt(
+            lambda: select(FeatureFlag)
+            .offset(skip)
+            .limit(limit)
+            .order_by(FeatureFlag.updated_at.desc())
         )
         result = await self._session.execute(query)
         return list(result.scalars().all())
 
     async def update(self, entity: FeatureFlag) -> FeatureFlag:
-        existing = await self.get_by_id(entity.id)
-        if not existing:
-            raise FeatureFlagNotFoundError(f"Feature flag with id '{entity.id}' not found")
+        # Сущность, загруженная в этой же сессии, уже отслеживается: повторно не читаем
+        if entity not in self._session:
+            if not await self.exists(entity.id):
+                raise FeatureFlagNotFoundError(f"Feature flag with id '{entity.id}' not found")
+            entity = await self._session.merge(entity)
 
-        await self._session.merge(entity)
+        # onupdate для updated_at вычисляется на стороне Python, refresh не нужен
         await self._session.flush()
-        await self._session.refresh(entity)
         return entity
 
     async def delete(self, entity_id: UUID) -> bool:
@@ -63,11 +71,11 @@ class FeatureFlagRepositoryImpl(FeatureFlagRepository):
         return result.rowcount > 0
 
     async def exists(self, entity_id: UUID) -> bool:
-        query = select(exists().where(FeatureFlag.id == entity_id))
+        query = lambda_stmt(lambda: select(exists().where(FeatureFlag.id == entity_id)))
         result = await self._session.execute(query)
         return result.scalar()
 
     async def get_by_name(self, name: str) -> Optional[FeatureFlag]:
-        query = select(FeatureFlag).where(FeatureFlag.name == name)
+        query = lambda_stmt(lambda: select(FeatureFlag).where(FeatureFlag.name == name))
         result = await self._session.execute(query)
         return result.scalar_one_or_none()
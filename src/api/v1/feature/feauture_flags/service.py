@@ -1,10 +1,14 @@
 from typing import Protocol, List, Optional
 from uuid import UUID
 
+from api.v1.audit.log import AuditLog, snapshot
 from api.v1.feature.feauture_flags.repository import FeatureFlagRepository
 from api.v1.feature.feauture_flags.schema import FeatureFlagCreate, FeatureFlagUpdate
+from api.v1.feature.feature_config.cache import ConfigCache
+from api.v1.feature.targeting import CompiledRulesCache
 from database.UnitOfWork import UnitOfWork
 from database.models import FeatureFlag
+from tracing.instrumentation import traced
 from exceptions.exceptions import FeatureFlagNotFoundError, FeatureFlagAlreadyExistsError
 
 
@@ -36,12 +40,23 @@ class FeatureFlagService(Protocol):
         ...
 
 
+@traced
 class FeatureFlagServiceImpl(FeatureFlagService):
     """Сервис для работы с функциями"""
 
-    def __init__(self, repository: FeatureFlagRepository, uow: UnitOfWork):
+    def __init__(
+        self,
+        repository: FeatureFlagRepository,
+        uow: UnitOfWork,
+        cache: ConfigCache,
+        rules_cache: CompiledRulesCache,
+        audit: AuditLog,
+    ):
         self._repository = repository
         self._uow = uow
+        self._cache = cache
+        self._rules_cache = rules_cache
+        self._audit = audit
 
     async def create_feature(self, feature_data: FeatureFlagCreate) -> FeatureFlag:
         async with self._uow:
@@ -50,8 +65,9 @@ class FeatureFlagServiceImpl(FeatureFlagService):
             if existing_feature:
                 raise FeatureFlagAlreadyExistsError(feature_data.name)
 
-            feature = FeatureFlag(**feature_data.model_dump())
-            return await self._repository.add(feature)
+            feature = await self._repository.add(FeatureFlag(**feature_data.model_dump()))
+            await self._audit.record("create", "feature_flag", feature.id, after=snapshot(feature))
+            return feature
 
     async def list_features(self, skip: int = 0, limit: int = 100) -> List[FeatureFlag]:
         async with self._uow:
@@ -78,6 +94,7 @@ class FeatureFlagServiceImpl(FeatureFlagService):
             if not feature:
                 raise FeatureFlagNotFoundError(str(feature_id))
 
+            before = snapshot(feature)
             update_fields = update_data.model_dump(exclude_unset=True)
 
             # Если обновляем имя, проверяем на дубликат
@@ -90,7 +107,13 @@ class FeatureFlagServiceImpl(FeatureFlagService):
             for field, value in update_fields.items():
                 setattr(feature, field, value)
 
-            return await self._repository.update(feature)
+            # Функция входит в ответы и правила конфигураций, в которых она подключена
+            self._clear_on_commit()
+            updated_feature = await self._repository.update(feature)
+            await self._audit.record(
+                "update", "feature_flag", feature_id, before=before, after=snapshot(updated_feature)
+            )
+            return updated_feature
 
     async def delete_feature(self, feature_id: UUID) -> None:
         async with self._uow:
@@ -100,6 +123,13 @@ class FeatureFlagServiceImpl(FeatureFlagService):
                 raise FeatureFlagNotFoundError(str(feature_id))
 
             # Удаляем
+            self._clear_on_commit()
             deleted = await self._repository.delete(feature_id)
             if not deleted:  # На случай если repository.delete вернет False
                 raise FeatureFlagNotFoundError(str(feature_id))
+            await self._audit.record("delete", "feature_flag", feature_id, before=snapshot(feature))
+
+    def _clear_on_commit(self):
+        # Изменение функции не создаёт новых версий конфигураций
+        self._uow.on_commit(self._cache.clear)
+        self._uow.on_commit(self._rules_cache.clear)
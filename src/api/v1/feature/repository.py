@@ -2,12 +2,14 @@ from typing import Optional, List, Protocol
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, update, delete, and_, lambda_stmt
+from sqlalchemy.orm import selectinload
 
 from database.models import (
     FeatureConfigFlag,
 )
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
 from exceptions.exceptions import FeatureFlagAlreadyExistsError
 
 
@@ -31,6 +33,8 @@ class FeatureConfigFlagRepository(Protocol):
     ) -> Optional[FeatureConfigFlag]: ...
 
 
+@traced
+@timed_repository
 class FeatureConfigFlagRepositoryImpl(FeatureConfigFlagRepository):
     """Репозиторий для связей конфигурации и функций"""
 
@@ -50,6 +54,9 @@ class FeatureConfigFlagRepositoryImpl(FeatureConfigFlagRepository):
             is_enabled=kwargs.get("is_enabled", False),
             is_free=kwargs.get("is_free", False),
             disabled_message=kwargs.get("disabled_message", None),
+            rollout_percentage=kwargs.get("rollout_percentage", 100.0),
+            rollout_salt=kwargs.get("rollout_salt", None),
+            rules=kwargs.get("rules", None),
         )
 
         self._session.add(config_feature)
@@ -57,15 +64,6 @@ class FeatureConfigFlagRepositoryImpl(FeatureConfigFlagRepository):
         await self._session.refresh(config_feature, ["feature"])
         return config_feature
 
-    async def get_config_features(self, config_id: UUID) -> List[FeatureConfigFlag]:
-        query = (
-            select(FeatureConfigFlag)
-            .options(joinedload(FeatureConfigFlag.feature))
-            .where(FeatureConfigFlag.config_id == config_id)
-        )
-        result = await self._session.execute(query)
-        return list(result.scalars().all())
-
     async def remove_feature_from_config(self, config_id: UUID, feature_id: UUID) -> bool:
         query = delete(FeatureConfigFlag).where(
             and_(
@@ -96,8 +94,8 @@ class FeatureConfigFlagRepositoryImpl(FeatureConfigFlagRepository):
         return updated
 
     async def get_config_features(self, config_id: UUID) -> List[FeatureConfigFlag]:
-        query = (
-            select(FeatureConfigFlag)
+        query = lambda_stmt(
+            lambda: select(FeatureConfigFlag)
             .options(selectinload(FeatureConfigFlag.feature))
             .where(FeatureConfigFlag.config_id == config_id)
         )
@@ -107,8 +105,8 @@ class FeatureConfigFlagRepositoryImpl(FeatureConfigFlagRepository):
     async def get_config_feature(
         self, config_id: UUID, feature_id: UUID
     ) -> Optional[FeatureConfigFlag]:
-        query = (
-            select(FeatureConfigFlag)
+        query = lambda_stmt(
+            lambda: select(FeatureConfigFlag)
             .options(selectinload(FeatureConfigFlag.feature))
             .where(
                 and_(
@@ -0,0 +1,87 @@
+"""Процентная раскатка функций по стабильному хешу пользователя.
+
+Алгоритм должен совпадать в сервере и клиентском SDK:
+    salt_key = первые 8 байт sha256(salt в UTF-8) как little-endian uint64
+    x        = user_id как int64, переинтерпретированный в uint64
+    bucket   = splitmix64(x XOR salt_key) mod 10000
+    limit    = rollout_percentage в базисных пунктах (сотых долях процента):
+               кратчайшая десятичная запись числа, умноженная на 100 точно и
+               округлённая до целого половиной вверх (0.005 -> 1, 0.015 -> 2),
+               затем ограниченная [0, 10000]
+    enabled  = is_enabled and bucket < limit
+
+Соль по умолчанию - строковый UUID функции, поэтому у разных функций
+разные наборы пользователей при одинаковом проценте.
+"""
+
+import hashlib
+from decimal import ROUND_HALF_UP, Decimal
+from uuid import UUID
+
+import numpy as np
+
+BUCKETS = 10_000
+MASK64 = (1 << 64) - 1
+
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+
+
+def salt_key(salt: str) -> int:
+    return int.from_bytes(hashlib.sha256(salt.encode()).digest()[:8], "little")
+
+
+def effective_salt(feature_id: UUID, salt: str | None) -> str:
+    return salt or str(feature_id)
+
+
+def threshold(rollout_percentage: float) -> int:
+    """Число включённых бакетов из 10000.
+
+    Считается в десятичной арифметике: round() над двоичным float округляет 0.005
+    и 0.015 по-разному и к чётному, что SDK на других языках не воспроизводят.
+    """
+    basis_points = (Decimal(str(rollout_percentage)) * 100).to_integral_value(ROUND_HALF_UP)
+    return min(BUCKETS, max(0, int(basis_points)))
+
+
+def splitmix64(value: int) -> int:
+    z = (value + GOLDEN_GAMMA) & MASK64
+    z = ((z ^ (z >> 30)) * MIX_1) & MASK64
+    z = ((z ^ (z >> 27)) * MIX_2) & MASK64
+    return z ^ (z >> 31)
+
+
+def bucket(user_id: int, salt: str) -> int:
+    return splitmix64((user_id & MASK64) ^ salt_key(salt)) % BUCKETS
+
+
+def buckets(user_ids: np.ndarray, salt: str) -> np.ndarray:
+    """Векторный splitmix64: uint64 в NumPy переполняется по модулю 2^64, как в SDK"""
+    z = np.asarray(user_ids, dtype=np.int64).view(np.uint64) ^ np.uint64(salt_key(salt))
+    z += np.uint64(GOLDEN_GAMMA)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(MIX_1)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(MIX_2)
+    z ^= z >> np.uint64(31)
+    return z % np.uint64(BUCKETS)
+
+
+def is_enabled_for(is_enabled: bool, rollout_percentage: float, user_id: int, salt: str) -> bool:
+    return is_enabled and bucket(user_id, salt) < threshold(rollout_percentage)
+
+
+def evaluate_batch(
+    is_enabled: bool, rollout_percentage: float, user_ids: np.ndarray, salt: str
+) -> tuple[bytes, int]:
+    """Битовая карта по user_ids (бит i = пользователь i, порядок little) и число включённых"""
+    limit = threshold(rollout_percentage)
+    if not is_enabled or limit == 0:
+        enabled = np.zeros(len(user_ids), dtype=bool)
+    elif limit == BUCKETS:
+        enabled = np.ones(len(user_ids), dtype=bool)
+    else:
+        enabled = buckets(user_ids, salt) < np.uint64(limit)
+    return np.packbits(enabled, bitorder="little").tobytes(), int(np.count_nonzero(enabled))
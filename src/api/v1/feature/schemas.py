@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, Literal, Optional, List
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
@@ -16,17 +16,71 @@ class Environment(str, Enum):
     PRODUCTION = "production"
 
 
+# ========================
+# Targeting rules schemas
+# ========================
+
+
+MAX_TARGETING_CONDITIONS = 1000
+
+
+class RuleOperator(str, Enum):
+    """Операторы условий таргетинга"""
+
+    EQ = "eq"
+    NE = "ne"
+    IN = "in"
+    NOT_IN = "not_in"
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
+    EXISTS = "exists"
+
+
+class TargetingCondition(BaseModel):
+    """Условие на атрибут контекста, например chat_type in [group, supergroup]"""
+
+    attribute: str = Field(..., min_length=1, max_length=64)
+    operator: RuleOperator
+    value: Any = None
+
+    @model_validator(mode="after")
+    def check_value(self):
+        if self.operator in (RuleOperator.IN, RuleOperator.NOT_IN):
+            if not isinstance(self.value, list):
+                raise ValueError(f"'{self.operator.value}' requires a list value")
+            if any(isinstance(item, (list, dict)) for item in self.value):
+                raise ValueError(f"'{self.operator.value}' values must be scalars")
+        return self
+
+
+class TargetingRules(BaseModel):
+    """Набор условий привязки: все (all) или хотя бы одно (any)"""
+
+    match: Literal["all", "any"] = "all"
+    conditions: List[TargetingCondition] = Field(
+        default_factory=list, max_length=MAX_TARGETING_CONDITIONS
+    )
+
+
 class FeatureConfigFlagCreate(BaseModel):
     feature_id: UUID
     is_enabled: bool = Field(default=False)
     is_free: bool = Field(default=False)
     disabled_message: Optional[str] = Field(None, max_length=256)
+    rollout_percentage: float = Field(default=100.0, ge=0, le=100)
+    rollout_salt: Optional[str] = Field(None, max_length=64)
+    rules: Optional[TargetingRules] = None
 
 
 class FeatureConfigFlagUpdate(BaseModel):
     is_enabled: Optional[bool] = None
     is_free: Optional[bool] = None
     disabled_message: Optional[str] = Field(None, max_length=256)
+    rollout_percentage: Optional[float] = Field(None, ge=0, le=100)
+    rollout_salt: Optional[str] = Field(None, max_length=64)
+    rules: Optional[TargetingRules] = None
 
 
 class FeatureConfigFlagResponse(BaseModel):
@@ -35,6 +89,9 @@ class FeatureConfigFlagResponse(BaseModel):
     is_enabled: bool
     is_free: bool
     disabled_message: Optional[str]
+    rollout_percentage: float
+    rollout_salt: Optional[str]
+    rules: Optional[TargetingRules] = None
     created_at: datetime
 
     feature: FeatureFlagResponse
@@ -83,6 +140,40 @@ class BulkFeatureUpdate(BaseModel):
     updates: List[dict]  # [{"feature_id": UUID, "is_enabled": bool, "is_free": bool}]
 
 
+# ========================
+# Rollout schemas
+# ========================
+
+
+MAX_ROLLOUT_BATCH = 1_000_000
+
+
+class RolloutEvaluation(BaseModel):
+    """Результат вычисления функции для одного пользователя"""
+
+    user_id: int
+    enabled: bool
+    bucket: int
+
+
+class EvaluationRequest(BaseModel):
+    """Контекст пользователя: user_id для раскатки и атрибуты для правил"""
+
+    context: Dict[str, Any] = Field(default_factory=dict)
+
+
+class EvaluationResponse(BaseModel):
+    config_id: UUID
+    version_number: int
+    features: Dict[str, bool]
+
+
+class RolloutBatchRequest(BaseModel):
+    """Пакет пользователей для вычисления одной функции"""
+
+    user_ids: List[int] = Field(..., max_length=MAX_ROLLOUT_BATCH)
+
+
 # ========================
 # Filter schemas
 # ========================
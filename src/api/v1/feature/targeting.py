@@ -0,0 +1,191 @@
+"""Правила таргетинга функций, скомпилированные в предикаты.
+
+Правила хранятся в FeatureConfigFlag.rules как TargetingRules и компилируются
+один раз на версию конфигурации: значения "in"/"not_in" превращаются в frozenset,
+операторы - в замыкания. Вычисление для контекста - один проход по условиям
+без разбора JSON.
+"""
+
+import operator
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from api.v1.feature import rollout
+from api.v1.feature.schemas import RuleOperator, TargetingRules
+from api.v1.usage.counters import usage_keys
+from database.models import FeatureConfig, FeatureConfigFlag
+
+Predicate = Callable[[dict], bool]
+
+_MISSING = object()
+
+_COMPARISONS = {
+    RuleOperator.EQ: operator.eq,
+    RuleOperator.NE: operator.ne,
+    RuleOperator.GT: operator.gt,
+    RuleOperator.GTE: operator.ge,
+    RuleOperator.LT: operator.lt,
+    RuleOperator.LTE: operator.le,
+}
+
+
+def _compile_condition(attribute: str, rule_operator: RuleOperator, value: Any) -> Predicate:
+    if rule_operator == RuleOperator.EXISTS:
+        expected = bool(value)
+        return lambda context: (attribute in context) is expected
+
+    if rule_operator in (RuleOperator.IN, RuleOperator.NOT_IN):
+        members = frozenset(value)
+        negate = rule_operator == RuleOperator.NOT_IN
+
+        def membership(context: dict) -> bool:
+            actual = context.get(attribute, _MISSING)
+            if actual is _MISSING:
+                return False
+            try:
+                return (actual in members) is not negate
+            except TypeError:
+                # Нехешируемое значение в контексте (список, словарь)
+                return False
+
+        return membership
+
+    compare = _COMPARISONS[rule_operator]
+
+    def comparison(context: dict) -> bool:
+        actual = context.get(attribute, _MISSING)
+        if actual is _MISSING:
+            return False
+        try:
+            return bool(compare(actual, value))
+        except TypeError:
+            return False
+
+    return comparison
+
+
+def compile_rules(rules: Optional[TargetingRules]) -> Optional[Predicate]:
+    """Скомпилировать набор условий; None - правил нет, функция не ограничена"""
+    if rules is None or not rules.conditions:
+        return None
+    predicates = tuple(
+        _compile_condition(condition.attribute, condition.operator, condition.value)
+        for condition in rules.conditions
+    )
+
+    if rules.match == "any":
+
+        def match_any(context: dict) -> bool:
+            for predicate in predicates:
+                if predicate(context):
+                    return True
+            return False
+
+        return match_any
+
+    def match_all(context: dict) -> bool:
+        for predicate in predicates:
+            if not predicate(context):
+                return False
+        return True
+
+    return match_all
+
+
+def compile_binding(binding: FeatureConfigFlag) -> Predicate:
+    """Предикат привязки: is_enabled, затем правила, затем процент раскатки по user_id"""
+    if not binding.is_enabled:
+        return lambda context: False
+
+    rules = compile_rules(
+        TargetingRules.model_validate(binding.rules) if binding.rules is not None else None
+    )
+    limit = rollout.threshold(binding.rollout_percentage)
+    if limit == rollout.BUCKETS:
+        return rules or (lambda context: True)
+
+    key = rollout.salt_key(rollout.effective_salt(binding.feature_id, binding.rollout_salt))
+
+    def evaluate(context: dict) -> bool:
+        if rules is not None and not rules(context):
+            return False
+        user_id = context.get("user_id")
+        if not isinstance(user_id, int):
+            return False
+        return rollout.splitmix64((user_id & rollout.MASK64) ^ key) % rollout.BUCKETS < limit
+
+    return evaluate
+
+
+class CompiledRuleSet:
+    """Предикаты всех функций одной версии конфигурации"""
+
+    def __init__(self, config: FeatureConfig, version_number: int):
+        self.config_id = config.id
+        self.version_number = version_number
+        self.compiled_at = time.monotonic()
+        self.predicates: dict[str, Predicate] = {
+            binding.feature.name: compile_binding(binding) for binding in config.features
+        }
+        self.usage_keys = usage_keys(
+            config.id, {binding.feature.name: binding.feature_id for binding in config.features}
+        )
+
+    def evaluate(self, context: dict) -> dict[str, bool]:
+        return {name: predicate(context) for name, predicate in self.predicates.items()}
+
+
+def latest_version_number(config: FeatureConfig) -> int:
+    return max((version.version_number for version in config.versions), default=0)
+
+
+class CompiledRulesCache:
+    """LRU скомпилированных наборов правил по (config_id, version_number).
+
+    Изменение привязок создаёт новую версию конфигурации, и запись со старым номером
+    версии перекомпилируется. Изменение или удаление самой функции версию не создаёт:
+    сервис функций очищает кэш после коммита, а в остальных воркерах запись
+    перекомпилируется не позже чем через ttl.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[UUID, CompiledRuleSet] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, config_id: UUID, version_number: int) -> Optional[CompiledRuleSet]:
+        """Скомпилированный набор правил версии version_number без загрузки конфигурации"""
+        compiled = self._entries.get(config_id)
+        if (
+            compiled is None
+            or compiled.version_number != version_number
+            or compiled.compiled_at + self._ttl < time.monotonic()
+        ):
+            return None
+        self.hits += 1
+        self._entries.move_to_end(config_id)
+        return compiled
+
+    def get(self, config: FeatureConfig) -> CompiledRuleSet:
+        version_number = latest_version_number(config)
+        compiled = self.lookup(config.id, version_number)
+        if compiled is not None:
+            return compiled
+
+        self.misses += 1
+        compiled = CompiledRuleSet(config, version_number)
+        self._entries[config.id] = compiled
+        self._entries.move_to_end(config.id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,20 +1,35 @@
-from fastapi import APIRouter, HTTPException, status, Query
+import asyncio
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
 from dishka.integrations.fastapi import FromDishka, inject
+from pydantic import ValidationError
 from uuid import UUID
 from typing import List, Optional
 
+from api.v1.feature import rollout
 from api.v1.feature.feature_config.service import FeatureConfigService
 from api.v1.feature.schemas import (
+    MAX_ROLLOUT_BATCH,
+    EvaluationRequest,
+    EvaluationResponse,
     FeatureConfigDetailResponse,
     FeatureConfigFlagResponse,
     FeatureConfigFlagCreate,
     FeatureConfigFlagUpdate,
+    RolloutBatchRequest,
+    RolloutEvaluation,
 )
+from api.v1.feature.targeting import CompiledRulesCache
+from api.v1.usage.counters import UsageCounters
 from exceptions.exceptions import FeatureFlagAlreadyExistsError
 
 # Feature Config routes
 router = APIRouter(prefix="/feature-configs", tags=["feature-configs"])
 
+# Пакеты больше этого считаются в потоке, чтобы не держать event loop
+THREAD_BATCH_SIZE = 50_000
+
 
 # Feature Config Features management
 @router.post(
@@ -30,9 +45,7 @@ async def add_feature_to_config(
 ):
     """Добавить функцию в конфигурацию"""
     try:
-        await service.add_feature_to_config(config_id, feature_data)
-
-        full_config = await service.get_config(config_id)
+        full_config = await service.add_feature_to_config(config_id, feature_data)
         if not full_config:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Config not found")
 
@@ -77,3 +90,121 @@ async def remove_feature_from_config(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Feature not found in this config"
         )
+
+
+@router.post("/{config_id}/evaluate", response_model=EvaluationResponse)
+@inject
+async def evaluate_config(
+    service: FromDishka[FeatureConfigService],
+    rules_cache: FromDishka[CompiledRulesCache],
+    usage: FromDishka[UsageCounters],
+    config_id: UUID,
+    request_data: EvaluationRequest,
+):
+    """Вычислить все функции конфигурации для контекста пользователя"""
+    # Номер версии - один лёгкий запрос; конфигурация с привязками и версиями
+    # загружается, только если эта версия ещё не скомпилирована
+    version_number = await service.get_latest_version_number(config_id)
+    compiled = None
+    if version_number is not None:
+        compiled = rules_cache.lookup(config_id, version_number)
+    if compiled is None:
+        config = await service.get_config(config_id)
+        if not config:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Feature config not found"
+            )
+        compiled = rules_cache.get(config)
+    features = compiled.evaluate(request_data.context)
+    usage.record_evaluation(compiled.usage_keys, features)
+    return EvaluationResponse(
+        config_id=config_id, version_number=compiled.version_number, features=features
+    )
+
+
+async def _get_binding_or_404(service: FeatureConfigService, config_id: UUID, feature_id: UUID):
+    binding = await service.get_config_feature(config_id, feature_id)
+    if not binding:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Feature not found in this config"
+        )
+    return binding
+
+
+async def _read_user_ids(request: Request) -> np.ndarray:
+    """Тело - JSON {"user_ids": [...]} или сырые little-endian int64"""
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/octet-stream"):
+        if len(body) % 8:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Body length must be a multiple of 8 bytes",
+            )
+        user_ids = np.frombuffer(body, dtype="<i8")
+    else:
+        try:
+            user_ids = np.array(
+                RolloutBatchRequest.model_validate_json(body).user_ids, dtype=np.int64
+            )
+        except (ValidationError, OverflowError) as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
+    if len(user_ids) > MAX_ROLLOUT_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_ROLLOUT_BATCH} user ids per batch",
+        )
+    return user_ids
+
+
+@router.get("/{config_id}/features/{feature_id}/evaluate", response_model=RolloutEvaluation)
+@inject
+async def evaluate_feature(
+    service: FromDishka[FeatureConfigService],
+    usage: FromDishka[UsageCounters],
+    config_id: UUID,
+    feature_id: UUID,
+    user_id: int = Query(..., ge=-(2**63), lt=2**63),
+):
+    """Включена ли функция для пользователя"""
+    binding = await _get_binding_or_404(service, config_id, feature_id)
+    salt = rollout.effective_salt(feature_id, binding.rollout_salt)
+    bucket = rollout.bucket(user_id, salt)
+    enabled = binding.is_enabled and bucket < rollout.threshold(binding.rollout_percentage)
+    usage.record(config_id, feature_id, enabled)
+    return RolloutEvaluation(user_id=user_id, enabled=enabled, bucket=bucket)
+
+
+@router.post("/{config_id}/features/{feature_id}/evaluate")
+@inject
+async def evaluate_feature_batch(
+    service: FromDishka[FeatureConfigService],
+    usage: FromDishka[UsageCounters],
+    config_id: UUID,
+    feature_id: UUID,
+    request: Request,
+):
+    """Вычислить функцию для пакета пользователей.
+
+    Ответ - битовая карта: бит i (little-endian внутри байта) соответствует user_ids[i].
+    """
+    user_ids = await _read_user_ids(request)
+    binding = await _get_binding_or_404(service, config_id, feature_id)
+    args = (
+        binding.is_enabled,
+        binding.rollout_percentage,
+        user_ids,
+        rollout.effective_salt(feature_id, binding.rollout_salt),
+    )
+    if len(user_ids) > THREAD_BATCH_SIZE:
+        bitmap, enabled = await asyncio.to_thread(rollout.evaluate_batch, *args)
+    else:
+        bitmap, enabled = rollout.evaluate_batch(*args)
+    if enabled:
+        usage.record(config_id, feature_id, True, enabled)
+    if enabled < len(user_ids):
+        usage.record(config_id, feature_id, False, len(user_ids) - enabled)
+    return Response(
+        content=bitmap,
+        media_type="application/octet-stream",
+        headers={"x-rollout-count": str(len(user_ids)), "x-rollout-enabled": str(enabled)},
+    )
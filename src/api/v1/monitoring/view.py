@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import Response
+from dishka.integrations.fastapi import FromDishka, inject
+
+from database.slow_queries import SlowQueryLog
+from database.statement_cache import StatementCacheStats
+from profiling.middleware import check_profiling_token, render_speedscope
+from src.config import settings
+
+monitoring_router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+
+
+def _get_profiles(request: Request, token: Optional[str]):
+    profiles = getattr(request.app.state, "profiles", None)
+    if profiles is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if not check_profiling_token(settings.profiling, token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+    return profiles
+
+
+@monitoring_router.get("/statement-cache", response_model=dict)
+@inject
+async def get_statement_cache_stats(stats: FromDishka[StatementCacheStats]):
+    """Статистика кэша скомпилированных запросов"""
+    return stats.snapshot()
+
+
+@monitoring_router.get("/slow-queries", response_model=list[dict])
+@inject
+async def get_slow_queries(slow_queries: FromDishka[SlowQueryLog]):
+    """Последние медленные запросы, новые первыми, с планами для сэмплированных"""
+    return slow_queries.entries()
+
+
+@monitoring_router.get("/profiles", response_model=list[dict])
+async def list_profiles(request: Request, x_profile_token: Optional[str] = Header(None)):
+    """Профили самых медленных запросов по маршрутам"""
+    return _get_profiles(request, x_profile_token).summaries()
+
+
+@monitoring_router.get("/profiles/{profile_id}")
+async def get_profile(
+    request: Request, profile_id: str, x_profile_token: Optional[str] = Header(None)
+):
+    """Профиль в формате speedscope (https://www.speedscope.app)"""
+    record = _get_profiles(request, x_profile_token).get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return Response(
+        content=render_speedscope(record),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
@@ -0,0 +1 @@
+from .view import usage_router
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+from uuid import UUID
+from weakref import WeakValueDictionary
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.usage.repository import UsageRepositoryImpl
+from metrics.registry import registry
+from src.config import UsageSettings
+
+USAGE_DROPPED = registry.counter(
+    "feature_usage_dropped_total",
+    "Feature evaluations not counted because the buffer is full or writes kept failing",
+)
+USAGE_FLUSH = registry.histogram(
+    "feature_usage_flush_seconds", "Duration of writing feature usage counters", ("status",)
+)
+USAGE_KEYS = registry.callback(
+    "feature_usage_pending_keys", "Feature usage counters waiting to be written", "gauge"
+)
+
+
+class UsageKey:
+    """Ключ счётчика вычислений с хешем по identity.
+
+    Хеш UUID считается в Python, поэтому кортеж из UUID дорог как ключ Counter.
+    Ключи создаются один раз на скомпилированный набор правил (usage_keys)
+    и на горячем пути не хешируют UUID. Объекты создаются только через usage_key:
+    на один логический ключ приходится один объект и одна запись в Counter.
+    """
+
+    __slots__ = ("config_id", "feature_id", "enabled", "__weakref__")
+
+    def __init__(self, config_id: UUID, feature_id: UUID, enabled: bool):
+        self.config_id = config_id
+        self.feature_id = feature_id
+        self.enabled = enabled
+
+
+# Живые ключи: пока ключ есть в счётчиках или в наборе правил, он переиспользуется
+_keys: WeakValueDictionary[tuple[UUID, UUID, bool], UsageKey] = WeakValueDictionary()
+
+
+def usage_key(config_id: UUID, feature_id: UUID, enabled: bool) -> UsageKey:
+    logical = (config_id, feature_id, enabled)
+    key = _keys.get(logical)
+    if key is None:
+        key = _keys[logical] = UsageKey(config_id, feature_id, enabled)
+    return key
+
+
+def usage_keys(
+    config_id: UUID, feature_ids: Mapping[str, UUID]
+) -> dict[str, tuple[UsageKey, UsageKey]]:
+    """Ключи (выключена, включена) по имени функции: индекс - результат вычисления"""
+    return {
+        name: (usage_key(config_id, feature_id, False), usage_key(config_id, feature_id, True))
+        for name, feature_id in feature_ids.items()
+    }
+
+
+class UsageCounters:
+    """Счётчики вычислений функций воркера.
+
+    Вычисление - одно увеличение Counter по ключу (config_id, feature_id, enabled)
+    в event loop, без блокировок и обращений к БД. Запись подменяет Counter
+    пустым и прибавляет накопленное к интервалу feature_usage, в котором
+    начался сбор; на границе интервала запись происходит досрочно, поэтому
+    счётчики не перетекают в соседний интервал.
+    """
+
+    def __init__(
+        self, sessionmaker: async_sessionmaker[AsyncSession], usage_settings: UsageSettings
+    ):
+        self._sessionmaker = sessionmaker
+        self._interval = usage_settings.flush_interval
+        self._bucket_seconds = usage_settings.bucket_seconds
+        self._max_keys = usage_settings.max_keys
+        self._batch_size = usage_settings.flush_batch
+        self._max_attempts = usage_settings.flush_max_attempts
+        self._counts: Counter = Counter()
+        # Неудачные записи по ключу: строку, которую БД не примет никогда, отбрасываем
+        self._failures: Counter = Counter()
+        self._window_started = time.time()
+        self._flush_requested = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        USAGE_KEYS.add_callback("usage", lambda: [({}, len(self._counts))])
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _has_room(self, count: int, new_keys: int = 1) -> bool:
+        if len(self._counts) + new_keys <= self._max_keys:
+            return True
+        USAGE_DROPPED.inc(amount=count)
+        self._flush_requested.set()
+        return False
+
+    def record(self, config_id: UUID, feature_id: UUID, enabled: bool, count: int = 1):
+        key = usage_key(config_id, feature_id, enabled)
+        if key in self._counts or self._has_room(count):
+            self._counts[key] += count
+
+    def record_evaluation(
+        self, keys: Mapping[str, tuple[UsageKey, UsageKey]], results: Mapping[str, bool]
+    ):
+        """Учесть результат вычисления всех функций конфигурации; keys - из usage_keys"""
+        evaluated = [keys[name][enabled] for name, enabled in results.items()]
+        if len(self._counts) + len(evaluated) > self._max_keys:
+            # Рядом с пределом место нужно только под ключи, которых ещё нет
+            new_keys = sum(1 for key in evaluated if key not in self._counts)
+            if not self._has_room(len(evaluated), new_keys):
+                return
+        # Counter.update по списку считает ключи в C
+        self._counts.update(evaluated)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Остановить фоновую запись и записать остаток счётчиков"""
+        if self._task is not None:
+            self._closing = True
+            self._flush_requested.set()
+            await self._task
+        await self.flush()
+
+    def _bucket_start(self, moment: float) -> float:
+        return moment - moment % self._bucket_seconds
+
+    async def _run(self):
+        while not self._closing:
+            next_bucket = self._bucket_start(self._window_started) + self._bucket_seconds
+            timeout = max(0.0, min(self._interval, next_bucket - time.time()))
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout)
+            except TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Записать накопленные счётчики; возвращает число записанных ключей"""
+        counts, self._counts = self._counts, Counter()
+        bucket_start = datetime.fromtimestamp(
+            self._bucket_start(self._window_started), timezone.utc
+        )
+        self._window_started = time.time()
+        if not counts:
+            return 0
+
+        # Одинаковый порядок строк у всех воркеров: upsert-ы не блокируют друг друга крест-накрест
+        rows = sorted(
+            (key.config_id, key.feature_id, key.enabled, count) for key, count in counts.items()
+        )
+        started = time.perf_counter()
+        written = 0
+        failed = []
+        for start in range(0, len(rows), self._batch_size):
+            batch = rows[start : start + self._batch_size]
+            try:
+                async with self._sessionmaker() as session:
+                    await UsageRepositoryImpl(session).add_counts(bucket_start, batch)
+                    await session.commit()
+            except Exception as e:
+                # Остальные пачки пишутся: неудачная не должна задерживать их
+                logger.error(f"Failed to write {len(batch)} feature usage counters: {e}")
+                failed.extend(batch)
+                continue
+            written += len(batch)
+            if self._failures:
+                for row in batch:
+                    self._failures.pop(row[:3], None)
+
+        USAGE_FLUSH.observe(time.perf_counter() - started, "failed" if failed else "ok")
+        if failed:
+            self._requeue(failed)
+        return written
+
+    def _requeue(self, rows: list[tuple[UUID, UUID, bool, int]]):
+        """Вернуть незаписанное в счётчики: уйдёт со следующей записью, уже в её интервал"""
+        dropped = 0
+        for config_id, feature_id, enabled, count in rows:
+            key = (config_id, feature_id, enabled)
+            self._failures[key] += 1
+            if self._failures[key] >= self._max_attempts:
+                del self._failures[key]
+                dropped += count
+                continue
+            self.record(config_id, feature_id, enabled, count)
+        if dropped:
+            USAGE_DROPPED.inc(amount=dropped)
+            logger.warning(
+                f"Dropped {dropped} feature evaluations after {self._max_attempts} failed writes"
+            )
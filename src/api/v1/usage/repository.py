@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Optional, List, Protocol
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    and_,
+    bindparam,
+    column,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+
+from api.v1.usage.schema import UsageGranularity
+from database.models import FeatureConfigFlag, FeatureFlag, FeatureUsage
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
+
+# (config_id, feature_id, enabled, count)
+UsageRow = tuple[UUID, UUID, bool, int]
+
+
+class UsageRepository(Protocol):
+    """Интерфейс репозитория статистики вычислений функций"""
+
+    async def add_counts(self, bucket_start: datetime, rows: List[UsageRow]) -> None: ...
+
+    async def get_feature_series(
+        self,
+        feature_id: UUID,
+        since: datetime,
+        until: datetime,
+        granularity: UsageGranularity,
+        config_id: Optional[UUID] = None,
+    ) -> List[tuple[datetime, int, int]]: ...
+
+    async def get_config_summary(
+        self, config_id: UUID, since: datetime, until: datetime
+    ) -> List[tuple[UUID, str, int, int, Optional[datetime]]]: ...
+
+
+@traced
+@timed_repository
+class UsageRepositoryImpl(UsageRepository):
+    """Репозиторий статистики вычислений функций"""
+
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def add_counts(self, bucket_start: datetime, rows: List[UsageRow]) -> None:
+        """Прибавить счётчики к интервалу bucket_start одним upsert-ом из массивов.
+
+        JOIN с feature_config_flag отбрасывает пары, которых нет среди привязок
+        (опечатка в отчёте бота, функция уже удалена), вместо внешних ключей.
+        """
+        config_ids, feature_ids, enabled, counts = (list(values) for values in zip(*rows))
+        usage = (
+            func.unnest(
+                bindparam("config_ids", config_ids, type_=ARRAY(PG_UUID(as_uuid=True))),
+                bindparam("feature_ids", feature_ids, type_=ARRAY(PG_UUID(as_uuid=True))),
+                bindparam("enabled", enabled, type_=ARRAY(Boolean)),
+                bindparam("counts", counts, type_=ARRAY(BigInteger)),
+            )
+            .table_valued(
+                column("config_id", PG_UUID(as_uuid=True)),
+                column("feature_id", PG_UUID(as_uuid=True)),
+                column("enabled", Boolean),
+                column("count", BigInteger),
+            )
+            .render_derived(name="usage")
+        )
+        query = insert(FeatureUsage).from_select(
+            ["config_id", "feature_id", "bucket_start", "enabled", "count"],
+            select(
+                usage.c.config_id,
+                usage.c.feature_id,
+                bindparam("bucket_start", bucket_start, type_=DateTime(timezone=True)),
+                usage.c.enabled,
+                usage.c.count,
+            ).join(
+                FeatureConfigFlag,
+                and_(
+                    FeatureConfigFlag.config_id == usage.c.config_id,
+                    FeatureConfigFlag.feature_id == usage.c.feature_id,
+                ),
+            ),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=["config_id", "feature_id", "bucket_start", "enabled"],
+            set_={"count": FeatureUsage.count + query.excluded.count},
+        )
+        await self._session.execute(query)
+
+    async def get_feature_series(
+        self,
+        feature_id: UUID,
+        since: datetime,
+        until: datetime,
+        granularity: UsageGranularity,
+        config_id: Optional[UUID] = None,
+    ) -> List[tuple[datetime, int, int]]:
+        # Единица - литерал из enum: выражение в SELECT и GROUP BY совпадает без параметров
+        unit = literal_column(f"'{granularity.value}'")
+        bucket = func.date_trunc(unit, FeatureUsage.bucket_start).label("bucket")
+        query = (
+            select(
+                bucket,
+                func.coalesce(func.sum(FeatureUsage.count).filter(FeatureUsage.enabled), 0),
+                func.coalesce(func.sum(FeatureUsage.count).filter(~FeatureUsage.enabled), 0),
+            )
+            .where(
+                FeatureUsage.feature_id == feature_id,
+                FeatureUsage.bucket_start >= since,
+                FeatureUsage.bucket_start < until,
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        if config_id is not None:
+            query = query.where(FeatureUsage.config_id == config_id)
+        result = await self._session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def get_config_summary(
+        self, config_id: UUID, since: datetime, until: datetime
+    ) -> List[tuple[UUID, str, int, int, Optional[datetime]]]:
+        """Все функции конфигурации, включая не вычислявшиеся за период, редкие первыми"""
+        enabled = func.coalesce(func.sum(FeatureUsage.count).filter(FeatureUsage.enabled), 0)
+        disabled = func.coalesce(func.sum(FeatureUsage.count).filter(~FeatureUsage.enabled), 0)
+        query = (
+            select(
+                FeatureConfigFlag.feature_id,
+                FeatureFlag.name,
+                enabled,
+                disabled,
+                func.max(FeatureUsage.bucket_start),
+            )
+            .join(FeatureFlag, FeatureFlag.id == FeatureConfigFlag.feature_id)
+            .outerjoin(
+                FeatureUsage,
+                and_(
+                    FeatureUsage.config_id == FeatureConfigFlag.config_id,
+                    FeatureUsage.feature_id == FeatureConfigFlag.feature_id,
+                    FeatureUsage.bucket_start >= since,
+                    FeatureUsage.bucket_start < until,
+                ),
+            )
+            .where(FeatureConfigFlag.config_id == config_id)
+            .group_by(FeatureConfigFlag.feature_id, FeatureFlag.name)
+            .order_by((enabled + disabled).asc(), FeatureFlag.name)
+        )
+        result = await self._session.execute(query)
+        return [tuple(row) for row in result.all()]
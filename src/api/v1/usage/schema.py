@@ -0,0 +1,45 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+
+MAX_USAGE_REPORT_ITEMS = 10_000
+# Счётчик одного отчёта: сумма в feature_usage.count (bigint) не должна переполниться
+MAX_USAGE_COUNT = 10**9
+
+
+class UsageGranularity(str, Enum):
+    """Шаг временного ряда статистики"""
+
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class UsageCount(BaseModel):
+    feature_id: UUID
+    enabled: bool
+    count: int = Field(..., ge=1, le=MAX_USAGE_COUNT)
+
+
+class UsageReport(BaseModel):
+    """Счётчики вычислений, агрегированные ботом с прошлого отчёта"""
+
+    config_id: UUID
+    counts: List[UsageCount] = Field(..., max_length=MAX_USAGE_REPORT_ITEMS)
+
+
+class UsagePoint(BaseModel):
+    bucket_start: datetime
+    enabled: int
+    disabled: int
+
+
+class FeatureUsageSummary(BaseModel):
+    feature_id: UUID
+    name: str
+    enabled: int
+    disabled: int
+    # Начало последнего интервала с вычислениями; None - за период не вычислялась
+    last_evaluated_at: Optional[datetime]
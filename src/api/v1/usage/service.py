@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Protocol, List, Optional
+from uuid import UUID
+
+from api.v1.usage.repository import UsageRepository
+from api.v1.usage.schema import FeatureUsageSummary, UsageGranularity, UsagePoint
+from database.UnitOfWork import UnitOfWork
+from tracing.instrumentation import traced
+
+
+class UsageService(Protocol):
+    """Протокол сервиса чтения статистики вычислений"""
+
+    async def get_feature_series(
+        self,
+        feature_id: UUID,
+        since: datetime,
+        until: datetime,
+        granularity: UsageGranularity,
+        config_id: Optional[UUID] = None,
+    ) -> List[UsagePoint]: ...
+
+    async def get_config_summary(
+        self, config_id: UUID, since: datetime, until: datetime
+    ) -> List[FeatureUsageSummary]: ...
+
+
+@traced
+class UsageServiceImpl:
+    """Сервис чтения статистики вычислений. Счётчики пишет UsageCounters"""
+
+    def __init__(self, repository: UsageRepository, uow: UnitOfWork):
+        self._repository = repository
+        self._uow = uow
+
+    async def get_feature_series(
+        self,
+        feature_id: UUID,
+        since: datetime,
+        until: datetime,
+        granularity: UsageGranularity,
+        config_id: Optional[UUID] = None,
+    ) -> List[UsagePoint]:
+        async with self._uow:
+            series = await self._repository.get_feature_series(
+                feature_id, since, until, granularity, config_id
+            )
+        return [
+            UsagePoint(bucket_start=bucket_start, enabled=enabled, disabled=disabled)
+            for bucket_start, enabled, disabled in series
+        ]
+
+    async def get_config_summary(
+        self, config_id: UUID, since: datetime, until: datetime
+    ) -> List[FeatureUsageSummary]:
+        async with self._uow:
+            summary = await self._repository.get_config_summary(config_id, since, until)
+        return [
+            FeatureUsageSummary(
+                feature_id=feature_id,
+                name=name,
+                enabled=enabled,
+                disabled=disabled,
+                last_evaluated_at=last_evaluated_at,
+            )
+            for feature_id, name, enabled, disabled, last_evaluated_at in summary
+        ]
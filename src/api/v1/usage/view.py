@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from dishka.integrations.fastapi import FromDishka, inject
+
+from api.v1.usage.counters import UsageCounters
+from api.v1.usage.schema import FeatureUsageSummary, UsageGranularity, UsagePoint, UsageReport
+from api.v1.usage.service import UsageService
+from src.config import settings
+
+usage_router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+def _time_range(since: Optional[datetime], until: Optional[datetime]) -> tuple[datetime, datetime]:
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=7)
+    if since.tzinfo is None or until.tzinfo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since and until must include a timezone",
+        )
+    if until - since > timedelta(days=settings.usage.max_query_days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time range is limited to {settings.usage.max_query_days} days",
+        )
+    return since, until
+
+
+@usage_router.post("", status_code=status.HTTP_202_ACCEPTED)
+@inject
+async def report_usage(counters: FromDishka[UsageCounters], report: UsageReport):
+    """Отчёт бота о вычислениях функций; пишется в БД в течение USAGE_FLUSH_INTERVAL"""
+    for item in report.counts:
+        counters.record(report.config_id, item.feature_id, item.enabled, item.count)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
+@usage_router.get("/features/{feature_id}", response_model=List[UsagePoint])
+@inject
+async def get_feature_usage(
+    service: FromDishka[UsageService],
+    feature_id: UUID,
+    config_id: Optional[UUID] = Query(None, description="По умолчанию - все конфигурации"),
+    granularity: UsageGranularity = Query(UsageGranularity.DAY),
+    since: Optional[datetime] = Query(None, description="По умолчанию - 7 дней назад"),
+    until: Optional[datetime] = Query(None, description="По умолчанию - сейчас"),
+):
+    """Временной ряд вычислений функции"""
+    since, until = _time_range(since, until)
+    return await service.get_feature_series(feature_id, since, until, granularity, config_id)
+
+
+@usage_router.get("/configs/{config_id}", response_model=List[FeatureUsageSummary])
+@inject
+async def get_config_usage(
+    service: FromDishka[UsageService],
+    config_id: UUID,
+    since: Optional[datetime] = Query(None, description="По умолчанию - 7 дней назад"),
+    until: Optional[datetime] = Query(None, description="По умолчанию - сейчас"),
+):
+    """Вычисления каждой функции конфигурации за период; невычислявшиеся - первыми"""
+    since, until = _time_range(since, until)
+    return await service.get_config_summary(config_id, since, until)
@@ -0,0 +1,166 @@
+# cache/shared_snapshot.py
+import fcntl
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+MAGIC = b"BCSNAP02"
+# Управляющий файл: magic и выровненный 8-байтный номер поколения
+CONTROL = struct.Struct("<8sQ")
+GENERATION = struct.Struct("<Q")
+GENERATION_OFFSET = 8
+# magic, generation, время публикации (unix), число записей
+HEADER = struct.Struct("<8sQdI")
+# UUID, смещение, длина
+INDEX_ENTRY = struct.Struct("<16sQI")
+
+
+class SharedSnapshot:
+    """Неизменяемые снапшоты payload'ов по UUID в общей памяти (например, /dev/shm).
+
+    Каждое поколение пишется в отдельный файл и публикуется атомарным rename,
+    после чего номер поколения обновляется в управляющем файле. Читатели сравнивают
+    номер поколения из отображённого в память управляющего файла со своим и при
+    изменении переключаются на новый файл. Payload'ы отдаются как memoryview поверх
+    mmap без копирования.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self._directory = directory
+        self._name = name
+        self._control_path = os.path.join(directory, f"{name}.ctl")
+        self._control_fd = os.open(self._control_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with _locked(self._control_fd):
+            if os.fstat(self._control_fd).st_size < mmap.PAGESIZE:
+                os.ftruncate(self._control_fd, mmap.PAGESIZE)
+                os.pwrite(self._control_fd, CONTROL.pack(MAGIC, 0), 0)
+            elif os.pread(self._control_fd, len(MAGIC), 0) != MAGIC:
+                # Снапшот прошлого формата не читается, поколения начинаются заново
+                os.pwrite(self._control_fd, CONTROL.pack(MAGIC, 0), 0)
+        self._control = mmap.mmap(self._control_fd, mmap.PAGESIZE)
+
+        self._generation = 0
+        self._published_at = 0.0
+        self._data: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._index: dict[UUID, tuple[int, int]] = {}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def published_at(self) -> float:
+        """Время публикации текущего поколения; 0 - поколение ещё не подключено"""
+        return self._published_at
+
+    @property
+    def published_generation(self) -> int:
+        return GENERATION.unpack_from(self._control, GENERATION_OFFSET)[0]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def refresh(self) -> bool:
+        """Переключиться на последнее опубликованное поколение. True, если оно сменилось"""
+        published = self.published_generation
+        if published == self._generation:
+            return False
+
+        while published != self._generation:
+            try:
+                self._attach(published)
+            except FileNotFoundError:
+                # Поколение успели заменить более новым
+                published = self.published_generation
+        return True
+
+    def get(self, key: UUID) -> Optional[memoryview]:
+        location = self._index.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return self._view[offset : offset + length]
+
+    def publish(self, entries: dict[UUID, bytes]) -> int:
+        """Записать новое поколение. Вызывается из любого воркера"""
+        with _locked(self._control_fd):
+            generation = self.published_generation + 1
+            path = self._data_path(generation)
+            tmp_path = f"{path}.tmp"
+
+            data_offset = HEADER.size + INDEX_ENTRY.size * len(entries)
+            index, offset = [], data_offset
+            for key, payload in entries.items():
+                index.append(INDEX_ENTRY.pack(key.bytes, offset, len(payload)))
+                offset += len(payload)
+
+            with open(tmp_path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, generation, time.time(), len(entries)))
+                file.writelines(index)
+                file.writelines(entries.values())
+            os.rename(tmp_path, path)
+
+            GENERATION.pack_into(self._control, GENERATION_OFFSET, generation)
+            self._remove_stale(generation)
+
+        logger.debug(f"Published snapshot {self._name} generation {generation}")
+        return generation
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+        if self._data is not None:
+            self._data.close()
+        self._control.close()
+        os.close(self._control_fd)
+
+    def _attach(self, generation: int):
+        with open(self._data_path(generation), "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, file_generation, published_at, count = HEADER.unpack_from(data)
+        if magic != MAGIC or file_generation != generation:
+            data.close()
+            raise ValueError(f"Corrupted snapshot {self._data_path(generation)}")
+
+        index = {}
+        for position in range(count):
+            key, offset, length = INDEX_ENTRY.unpack_from(
+                data, HEADER.size + position * INDEX_ENTRY.size
+            )
+            index[UUID(bytes=key)] = (offset, length)
+
+        # Старые memoryview, отданные в ответы, держат предыдущий mmap до освобождения
+        self._data, self._view, self._index = data, memoryview(data), index
+        self._generation = generation
+        self._published_at = published_at
+
+    def _data_path(self, generation: int) -> str:
+        return os.path.join(self._directory, f"{self._name}.{generation}")
+
+    def _remove_stale(self, current: int):
+        # Предыдущее поколение оставляем для читателей, которые ещё не переключились
+        prefix = f"{self._name}."
+        for file_name in os.listdir(self._directory):
+            suffix = file_name[len(prefix) :]
+            if file_name.startswith(prefix) and suffix.isdigit() and int(suffix) < current - 1:
+                try:
+                    os.unlink(os.path.join(self._directory, file_name))
+                except FileNotFoundError:
+                    pass
+
+
+@contextmanager
+def _locked(fd: int):
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
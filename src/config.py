@@ -4,6 +4,7 @@ load_dotenv(override=True, encoding="UTF-8")
 
 import os
 from dataclasses import dataclass, field
+from uuid import uuid4
 
 
 @dataclass
@@ -17,6 +18,17 @@ class DatabaseConfig:
         if os.getenv("IS_TESTING", "False").lower() == "true"
         else os.getenv("DB_NAME")
     )
+    # Реплики только для чтения: "host1:5432,host2:5432"
+    replica_hosts: str = os.getenv("DB_REPLICA_HOSTS", "")
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    # Сколько соединений пула открыть при старте воркера
+    pool_warmup: int = int(os.getenv("DB_POOL_WARMUP", os.getenv("DB_POOL_SIZE", 10)))
+    # Кэш скомпилированных запросов SQLAlchemy и prepared statements asyncpg на соединение
+    query_cache_size: int = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+    prepared_statement_cache_size: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 500))
+    # pgbouncer в режиме transaction/statement не сохраняет prepared statements
+    pgbouncer_mode: bool = os.getenv("DB_PGBOUNCER_MODE", "False").lower() == "true"
 
     def __post_init__(self):
         if not self.user:
@@ -30,6 +42,10 @@ class DatabaseConfig:
         if not self.name:
             raise ValueError("DB_NAME or DB_TEST_NAME is not set")
 
+    @property
+    def maintenance_url(self) -> str:
+        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/postgres"
+
     @property
     def sync_url(self) -> str:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
@@ -40,6 +56,30 @@ class DatabaseConfig:
             f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
         )
 
+    @property
+    def connect_args(self) -> dict:
+        if self.pgbouncer_mode:
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return {
+            "statement_cache_size": self.prepared_statement_cache_size,
+            "prepared_statement_cache_size": self.prepared_statement_cache_size,
+        }
+
+    @property
+    def replica_async_urls(self) -> list[str]:
+        urls = []
+        for replica in filter(None, (item.strip() for item in self.replica_hosts.split(","))):
+            host, _, port = replica.partition(":")
+            port = port or self.port
+            urls.append(
+                f"postgresql+asyncpg://{self.user}:{self.password}@{host}:{port}/{self.name}"
+            )
+        return urls
+
 
 @dataclass
 class RedisConfig:
@@ -47,6 +87,7 @@ class RedisConfig:
     port: int = int(os.getenv("REDIS_PORT", 6379))
     db: int = int(os.getenv("REDIS_DB", 0))
     password: str = os.getenv("REDIS_PASSWORD")
+    enabled: bool = os.getenv("REDIS_ENABLED", "False").lower() == "true"
 
     def __post_init__(self):
         if not self.host:
@@ -64,6 +105,8 @@ class APISettings:
     token: str = os.getenv("API_TOKEN")
     ip: str = os.getenv("API_IP")
     port: int = int(os.getenv("API_PORT", 8000))
+    # Отладочные заголовки ответов (Server-Timing, X-DB-Queries)
+    debug: bool = os.getenv("API_DEBUG", "False").lower() == "true"
 
     def __post_init__(self):
         if not self.ip:
@@ -72,6 +115,73 @@ class APISettings:
             raise ValueError("API_PORT is not set")
 
 
+@dataclass
+class LoggingSettings:
+    level: str = os.getenv("LOG_LEVEL", "DEBUG").upper()
+    # text - цветной вывод для разработки, json - структурированные логи для продакшена
+    format: str = os.getenv("LOG_FORMAT", "text").lower()
+    enqueue: bool = os.getenv("LOG_ENQUEUE", "False").lower() == "true"
+    access_log: bool = os.getenv("ACCESS_LOG_ENABLED", "True").lower() == "true"
+    # Доля успешных запросов в access log; ошибки и медленные запросы пишутся всегда
+    access_log_sample_ratio: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATIO", "1.0"))
+    access_log_slow_ms: float = float(os.getenv("ACCESS_LOG_SLOW_MS", "500"))
+
+
+@dataclass
+class HealthSettings:
+    # Таймаут каждой проверки зависимостей в /health/ready
+    probe_timeout: float = float(os.getenv("HEALTH_PROBE_TIMEOUT", "1.0"))
+
+
+@dataclass
+class SlowQuerySettings:
+    threshold_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # Доля медленных SELECT, для которых снимается план EXPLAIN (FORMAT JSON)
+    explain_sample_ratio: float = float(os.getenv("SLOW_QUERY_EXPLAIN_RATIO", "0"))
+    # Сколько последних медленных запросов хранить для /monitoring/slow-queries
+    buffer_size: int = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 100))
+
+
+@dataclass
+class QueryStatsSettings:
+    # Сколько раз один запрос может выполниться за HTTP-запрос до предупреждения о N+1
+    repeat_threshold: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+
+
+@dataclass
+class TracingSettings:
+    enabled: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    service_name: str = os.getenv("OTEL_SERVICE_NAME", "bot-config-api")
+    # otlp, file, memory или console
+    exporter: str = os.getenv("TRACING_EXPORTER", "otlp")
+    file_path: str = os.getenv("TRACING_FILE", "traces.jsonl")
+    # Доля трассируемых запросов без входящего traceparent
+    sample_ratio: float = float(os.getenv("TRACING_SAMPLE_RATIO", "0.05"))
+
+
+@dataclass
+class ProfilingSettings:
+    enabled: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    # Без токена профилирование по запросу (X-Profile: 1) недоступно
+    token: str = os.getenv("PROFILING_TOKEN", "")
+    interval: float = float(os.getenv("PROFILING_INTERVAL", "0.001"))
+    # Доля запросов, профилируемых в фоне для хранилища самых медленных
+    sample_ratio: float = float(os.getenv("PROFILING_SAMPLE_RATIO", "0"))
+    slowest_per_route: int = int(os.getenv("PROFILING_SLOWEST_PER_ROUTE", 5))
+    directory: str = os.getenv("PROFILING_DIR", "profiles")
+
+
+@dataclass
+class MetricsSettings:
+    # Эндпоинт /metrics и middleware латентности запросов
+    enabled: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    # Каталог, через который воркеры gunicorn обмениваются метриками (например,
+    # /dev/shm/bot-metrics); пусто - /metrics отдаёт только метрики ответившего воркера
+    multiprocess_dir: str = os.getenv("METRICS_MULTIPROCESS_DIR", "")
+    # Как часто воркер обновляет свой файл метрик
+    multiprocess_interval: float = float(os.getenv("METRICS_MULTIPROCESS_INTERVAL", "5"))
+
+
 @dataclass
 class SentrySettings:
     sentry_dsn: str = os.getenv("SENTRY_DSN", "")
@@ -79,12 +189,171 @@ class SentrySettings:
     sentry_traces_sample_rate: float = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "1.0"))
 
 
+@dataclass
+class CacheSettings:
+    enabled: bool = os.getenv("CONFIG_CACHE_ENABLED", "True").lower() == "true"
+    ttl: float = float(os.getenv("CONFIG_CACHE_TTL", "5"))
+    max_entries: int = int(os.getenv("CONFIG_CACHE_MAX_ENTRIES", 10000))
+    # Загрузить активные конфигурации в память до того, как воркер начнёт принимать трафик
+    preload_active_configs: bool = os.getenv("CONFIG_CACHE_PRELOAD", "True").lower() == "true"
+    # Общий для воркеров снапшот активных конфигураций, например /dev/shm
+    snapshot_dir: str = os.getenv("CONFIG_SNAPSHOT_DIR", "")
+    snapshot_name: str = os.getenv("CONFIG_SNAPSHOT_NAME", "bot-config")
+    # Старше этого снапшот не отдаётся, а пересобирается из БД: изменения с других
+    # хостов и прямые правки БД не публикуются воркерами этого хоста
+    snapshot_max_age: float = float(os.getenv("CONFIG_SNAPSHOT_MAX_AGE", "30"))
+    # Скомпилированные правила таргетинга, по одной версии на конфигурацию
+    rules_max_entries: int = int(os.getenv("TARGETING_RULES_CACHE_MAX_ENTRIES", 1024))
+
+
+@dataclass
+class SchedulerSettings:
+    # Воркер-лидер применяет отложенные изменения; остальные ждут освобождения лидерства
+    enabled: bool = os.getenv("SCHEDULER_ENABLED", "True").lower() == "true"
+    # Как часто не-лидер пытается взять advisory lock
+    leader_retry_interval: float = float(os.getenv("SCHEDULER_LEADER_RETRY_INTERVAL", "5"))
+    # Полная перечитка ожидающих изменений на случай потерянного NOTIFY
+    resync_interval: float = float(os.getenv("SCHEDULER_RESYNC_INTERVAL", "300"))
+
+
+@dataclass
+class AuditSettings:
+    # Сколько месячных секций audit_event держать созданными наперёд
+    partitions_ahead: int = int(os.getenv("AUDIT_PARTITIONS_AHEAD", 3))
+    # Секции старше стольких месяцев отсоединяются от audit_event (0 - не отсоединять)
+    retention_months: int = int(os.getenv("AUDIT_RETENTION_MONTHS", 0))
+    maintenance_interval: float = float(os.getenv("AUDIT_MAINTENANCE_INTERVAL", "21600"))
+    # Максимальный период одного запроса к журналу
+    max_query_days: int = int(os.getenv("AUDIT_MAX_QUERY_DAYS", 366))
+
+
+@dataclass
+class VersionRetentionPolicy:
+    # Последние keep_last версий конфигурации хранятся всегда
+    keep_last: int
+    # Версии моложе keep_days дней хранятся всегда
+    keep_days: int
+
+
+def _retention_policy(environment: str, keep_last: int, keep_days: int) -> VersionRetentionPolicy:
+    prefix = f"VERSION_RETENTION_{environment.upper()}"
+    return VersionRetentionPolicy(
+        keep_last=int(os.getenv(f"{prefix}_KEEP_LAST", keep_last)),
+        keep_days=int(os.getenv(f"{prefix}_KEEP_DAYS", keep_days)),
+    )
+
+
+@dataclass
+class VersionRetentionSettings:
+    # Компактизация истории версий на воркере-лидере; помеченные версии не удаляются
+    enabled: bool = os.getenv("VERSION_RETENTION_ENABLED", "False").lower() == "true"
+    interval: float = float(os.getenv("VERSION_RETENTION_INTERVAL", "3600"))
+    # Строк в одном DELETE (одна короткая транзакция) и пауза между пачками
+    batch_size: int = int(os.getenv("VERSION_RETENTION_BATCH_SIZE", 1000))
+    batch_pause: float = float(os.getenv("VERSION_RETENTION_BATCH_PAUSE", "0.05"))
+    # VACUUM после удаления, чтобы освободившееся место сразу переиспользовалось
+    vacuum: bool = os.getenv("VERSION_RETENTION_VACUUM", "True").lower() == "true"
+    # Политики по значению Environment
+    policies: dict[str, VersionRetentionPolicy] = field(
+        default_factory=lambda: {
+            "production": _retention_policy("production", 100, 180),
+            "testing": _retention_policy("testing", 50, 30),
+            "development": _retention_policy("development", 20, 7),
+        }
+    )
+
+
+@dataclass
+class BotSettings:
+    # Heartbeat-ы копятся в памяти воркера и пишутся пачками раз в интервал
+    heartbeat_flush_interval: float = float(os.getenv("BOT_HEARTBEAT_FLUSH_INTERVAL", "1"))
+    # Максимум ботов в буфере; heartbeat нового бота сверх него получает 503
+    heartbeat_buffer_size: int = int(os.getenv("BOT_HEARTBEAT_BUFFER_SIZE", 50000))
+    # Строк в одном upsert
+    heartbeat_flush_batch: int = int(os.getenv("BOT_HEARTBEAT_FLUSH_BATCH", 5000))
+    # Retry-After для отклонённых heartbeat-ов, секунды
+    heartbeat_retry_after: int = int(os.getenv("BOT_HEARTBEAT_RETRY_AFTER", 5))
+
+
+@dataclass
+class UsageSettings:
+    # Счётчики вычислений функций пишутся в feature_usage раз в интервал
+    flush_interval: float = float(os.getenv("USAGE_FLUSH_INTERVAL", "10"))
+    # Длина интервала статистики в feature_usage, секунды
+    bucket_seconds: int = int(os.getenv("USAGE_BUCKET_SECONDS", 3600))
+    # Максимум различных (конфигурация, функция, результат) в памяти воркера
+    max_keys: int = int(os.getenv("USAGE_MAX_KEYS", 200000))
+    # Строк в одном upsert
+    flush_batch: int = int(os.getenv("USAGE_FLUSH_BATCH", 10000))
+    # Попыток записи счётчика, после которых он отбрасывается (например, переполнение count)
+    flush_max_attempts: int = int(os.getenv("USAGE_FLUSH_MAX_ATTEMPTS", 6))
+    # Максимальный период одного запроса статистики
+    max_query_days: int = int(os.getenv("USAGE_MAX_QUERY_DAYS", 90))
+
+
+@dataclass
+class AdmissionSettings:
+    # Ограничение частоты по клиенту и числа одновременных запросов к БД на воркер
+    enabled: bool = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+    # Корзина токенов клиента: пополнение в секунду и ёмкость
+    rate: float = float(os.getenv("RATE_LIMIT_RATE", "50"))
+    burst: int = int(os.getenv("RATE_LIMIT_BURST", 100))
+    # local - корзины в памяти воркера, redis - общие для воркеров (нужен REDIS_ENABLED)
+    backend: str = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+    # Максимум корзин в памяти воркера; давно не обращавшиеся клиенты вытесняются
+    max_clients: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 100000))
+    # Таймаут обращения к Redis; при ошибке воркер считает по своим корзинам
+    redis_timeout: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.05"))
+    # Одновременных запросов к БД на воркер; меньше пула с overflow (30),
+    # чтобы фоновым записям буферов и лидеру оставались соединения
+    max_concurrent: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", 25))
+    # Одновременных запросов к БД одного клиента
+    max_concurrent_per_client: int = int(os.getenv("ADMISSION_MAX_CONCURRENT_PER_CLIENT", 4))
+    # Retry-After для 503, когда воркер занят, секунды
+    retry_after: int = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+
+
+@dataclass
+class IdempotencySettings:
+    # Заголовок Idempotency-Key на POST/PUT/PATCH/DELETE: повтор получает сохранённый ответ
+    enabled: bool = os.getenv("IDEMPOTENCY_ENABLED", "True").lower() == "true"
+    # Сколько хранится ответ, секунды
+    ttl: int = int(os.getenv("IDEMPOTENCY_TTL", 86400))
+    # Блокировка ключа выполняющегося запроса; воркер продлевает её, пока запрос идёт,
+    # поэтому заново ключ можно занять только после падения воркера
+    lock_timeout: int = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 60))
+    # Сколько повтор ждёт ответа на выполняющийся запрос до 409
+    wait_timeout: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+    # Как часто повтор проверяет в БД запрос, выполняющийся на другом воркере
+    poll_interval: float = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.2"))
+    # Ответы больше этого не сохраняются, повтор выполнится заново
+    max_response_bytes: int = int(os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", 1048576))
+    # Удаление истёкших ключей на воркере-лидере пачками
+    purge_interval: float = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "600"))
+    purge_batch_size: int = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", 1000))
+
+
 @dataclass
 class Settings:
     db: DatabaseConfig = field(default_factory=lambda: DatabaseConfig())
     redis: RedisConfig = field(default_factory=lambda: RedisConfig())
     api: APISettings = field(default_factory=lambda: APISettings())
     sentry: SentrySettings = field(default_factory=lambda: SentrySettings())
+    cache: CacheSettings = field(default_factory=lambda: CacheSettings())
+    health: HealthSettings = field(default_factory=lambda: HealthSettings())
+    logging: LoggingSettings = field(default_factory=lambda: LoggingSettings())
+    metrics: MetricsSettings = field(default_factory=lambda: MetricsSettings())
+    query_stats: QueryStatsSettings = field(default_factory=lambda: QueryStatsSettings())
+    slow_queries: SlowQuerySettings = field(default_factory=lambda: SlowQuerySettings())
+    tracing: TracingSettings = field(default_factory=lambda: TracingSettings())
+    profiling: ProfilingSettings = field(default_factory=lambda: ProfilingSettings())
+    scheduler: SchedulerSettings = field(default_factory=lambda: SchedulerSettings())
+    audit: AuditSettings = field(default_factory=lambda: AuditSettings())
+    retention: VersionRetentionSettings = field(default_factory=lambda: VersionRetentionSettings())
+    bots: BotSettings = field(default_factory=lambda: BotSettings())
+    usage: UsageSettings = field(default_factory=lambda: UsageSettings())
+    admission: AdmissionSettings = field(default_factory=lambda: AdmissionSettings())
+    idempotency: IdempotencySettings = field(default_factory=lambda: IdempotencySettings())
 
 
 settings = Settings()
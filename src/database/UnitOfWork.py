@@ -1,11 +1,16 @@
 # database/UnitOfWork.py
+from typing import Callable
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from tracing.instrumentation import start_span
+
 
 class UnitOfWork:
     def __init__(self, session: AsyncSession):
         self._session = session
+        self._on_commit: list[Callable[[], None]] = []
 
     async def __aenter__(self):
         return self
@@ -18,14 +23,20 @@ class UnitOfWork:
 
     async def commit(self):
         try:
-            await self._session.commit()
+            with start_span("uow.commit"):
+                await self._session.commit()
             logger.debug("Transaction committed")
         except Exception as e:
             logger.error(f"Commit failed: {e}")
             await self.rollback()
             raise
 
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            callback()
+
     async def rollback(self):
+        self._on_commit.clear()
         try:
             await self._session.rollback()
             logger.debug("Transaction rolled back")
@@ -33,6 +44,22 @@ class UnitOfWork:
             logger.error(f"Rollback failed: {e}")
             raise
 
+    def on_commit(self, callback: Callable[[], None]):
+        """Выполнить callback после успешного коммита текущей транзакции"""
+        self._on_commit.append(callback)
+
     @property
     def session(self) -> AsyncSession:
         return self._session
+
+
+class ReadOnlyUnitOfWork(UnitOfWork):
+    """Unit of Work для читающих запросов.
+
+    Сессия работает в режиме autocommit, поэтому при выходе из контекста
+    COMMIT не отправляется и транзакция не открывается.
+    """
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            await self.rollback()
@@ -1,25 +1,49 @@
-# database/database.py - оставьте только InitDB
+# database/database.py
+import asyncio
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy_utils import database_exists, create_database
 from loguru import logger
-from src.config import settings
-
+from src.config import DatabaseConfig
 
-class InitDB:
-    def __init__(self):
-        self.custom_create_database()
 
-    def custom_create_database(self):
-        url = settings.db.sync_url
+async def ensure_database(db_config: DatabaseConfig) -> None:
+    """Проверить наличие БД через asyncpg и создать её при необходимости"""
+    try:
+        connection = await asyncpg.connect(db_config.sync_url)
+    except asyncpg.InvalidCatalogNameError:
+        connection = await asyncpg.connect(db_config.maintenance_url)
         try:
-            if not database_exists(url):
-                create_database(url)
-                logger.success("Database created!")
-            else:
-                logger.info("Database already exists.")
-        except Exception as e:
-            logger.error(f"Failed to create or check database: {e}")
-            raise
+            await connection.execute(f'CREATE DATABASE "{db_config.name}"')
+            logger.success("Database created!")
+        except asyncpg.DuplicateDatabaseError:
+            # Базу успел создать соседний воркер
+            logger.info("Database already exists.")
+        finally:
+            await connection.close()
+        return
+    except Exception as e:
+        logger.error(f"Failed to create or check database: {e}")
+        raise
+
+    await connection.close()
+    logger.info("Database already exists.")
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> int:
+    """Открыть соединения пула заранее, чтобы первые запросы не платили за подключение"""
+    connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return 0
+
+    async def _ping():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(connections)))
+    return connections
 
 
 class Base(DeclarativeBase):
@@ -5,14 +5,20 @@ from datetime import datetime, timezone
 from enum import Enum
 
 from sqlalchemy import (
+    BigInteger,
+    Identity,
     String,
     Boolean,
     Integer,
+    Float,
+    CheckConstraint,
+    Index,
     ForeignKey,
     UniqueConstraint,
     text,
     DateTime,
     Text,
+    LargeBinary,
     Enum as SQLEnum,
 )
 from sqlalchemy.orm import (
@@ -21,7 +27,7 @@ from sqlalchemy.orm import (
     relationship,
     DeclarativeBase,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 
 class Base(DeclarativeBase):
@@ -94,7 +100,12 @@ class FeatureConfigFlag(Base):
     """Связь между конфигурацией и функцией с настройками"""
 
     __tablename__ = "feature_config_flag"
-    __table_args__ = (UniqueConstraint("config_id", "feature_id", name="uix_config_feature"),)
+    __table_args__ = (
+        UniqueConstraint("config_id", "feature_id", name="uix_config_feature"),
+        CheckConstraint(
+            "rollout_percentage >= 0 AND rollout_percentage <= 100", name="ck_rollout_percentage"
+        ),
+    )
 
     config_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -110,6 +121,13 @@ class FeatureConfigFlag(Base):
     is_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_free: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     disabled_message: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    # Доля пользователей, для которых функция включена (см. api.v1.feature.rollout)
+    rollout_percentage: Mapped[float] = mapped_column(
+        Float, nullable=False, default=100.0, server_default=text("100")
+    )
+    rollout_salt: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # TargetingRules: {"match": "all" | "any", "conditions": [...]}
+    rules: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=text("TIMEZONE('utc', now())")
@@ -134,6 +152,10 @@ class FeatureConfigVersion(Base):
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
     changelog: Mapped[str | None] = mapped_column(Text)
     created_by: Mapped[str | None] = mapped_column(String(64))
+    # Помеченные версии не удаляются политикой хранения
+    is_tagged: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=text("false"), nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=text("TIMEZONE('utc', now())")
     )
@@ -142,3 +164,168 @@ class FeatureConfigVersion(Base):
     config: Mapped["FeatureConfig"] = relationship(back_populates="versions")
 
     __table_args__ = (UniqueConstraint("config_id", "version_number", name="uix_config_version"),)
+
+
+class ScheduledAction(str, Enum):
+    """Действия отложенных изменений"""
+
+    TOGGLE_FEATURE = "toggle_feature"
+    UPDATE_MESSAGE = "update_message"
+    ACTIVATE = "activate"
+    DEACTIVATE = "deactivate"
+
+
+class ScheduledChangeStatus(str, Enum):
+    """Статусы отложенных изменений"""
+
+    PENDING = "pending"
+    APPLIED = "applied"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ScheduledChange(Base):
+    """Изменение конфигурации, запланированное на момент run_at"""
+
+    __tablename__ = "scheduled_change"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    config_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("feature_config.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    # Пусто для activate/deactivate
+    feature_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("feature_flag.id", ondelete="CASCADE"), nullable=True
+    )
+    action: Mapped[ScheduledAction] = mapped_column(SQLEnum(ScheduledAction), nullable=False)
+    is_enabled: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    disabled_message: Mapped[str | None] = mapped_column(String(256), nullable=True)
+
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    status: Mapped[ScheduledChangeStatus] = mapped_column(
+        SQLEnum(ScheduledChangeStatus),
+        nullable=False,
+        default=ScheduledChangeStatus.PENDING,
+    )
+    applied_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_by: Mapped[str | None] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("TIMEZONE('utc', now())")
+    )
+
+    __table_args__ = (
+        # Планировщик читает только ожидающие изменения
+        Index(
+            "ix_scheduled_change_pending_run_at",
+            "run_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+
+class AuditEvent(Base):
+    """Неизменяемая запись журнала аудита.
+
+    Таблица секционирована по месяцам occurred_at (см. scheduler.audit_partitions),
+    поэтому первичный ключ включает ключ секционирования. Внешних ключей нет:
+    записи переживают удаление сущностей.
+    """
+
+    __tablename__ = "audit_event"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=text("now()")
+    )
+    actor: Mapped[str | None] = mapped_column(String(64))
+    action: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(80), nullable=False)
+    config_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    before: Mapped[dict | None] = mapped_column(JSONB)
+    after: Mapped[dict | None] = mapped_column(JSONB)
+    request_id: Mapped[str | None] = mapped_column(String(64))
+
+    __table_args__ = (
+        Index("ix_audit_event_entity", "entity_type", "entity_id", "occurred_at"),
+        Index("ix_audit_event_config", "config_id", "occurred_at"),
+        Index("ix_audit_event_occurred_at", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+
+class Bot(Base):
+    """Бот и последнее состояние из его heartbeat.
+
+    Строка создаётся первым heartbeat-ом и обновляется пачками из буфера
+    (см. api.v1.bot.heartbeats); история heartbeat-ов не хранится.
+    """
+
+    __tablename__ = "bot"
+
+    # Идентификатор задаёт сам бот (имя хоста, id инстанса)
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    config_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("feature_config.id", ondelete="SET NULL"), index=True
+    )
+    applied_version: Mapped[int | None] = mapped_column(Integer)
+    stats: Mapped[dict | None] = mapped_column(JSONB)
+    heartbeat_count: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default=text("0"), nullable=False
+    )
+    first_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("now()"), nullable=False
+    )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+
+class FeatureUsage(Base):
+    """Число вычислений функции в конфигурации за интервал bucket_start.
+
+    Счётчики копятся в памяти воркеров (api.v1.usage.counters) и добавляются
+    upsert-ом. Внешних ключей нет, как у audit_event: статистика переживает
+    удаление функций и не проверяется на каждой вставке.
+    """
+
+    __tablename__ = "feature_usage"
+
+    config_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    feature_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # Результат вычисления: функция включена или нет
+    enabled: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_feature_usage_feature", "feature_id", "bucket_start"),)
+
+
+class IdempotencyKey(Base):
+    """Ответ на изменяющий запрос с заголовком Idempotency-Key.
+
+    Строка вставляется до выполнения запроса (status_code пуст, expires_at -
+    срок блокировки) и дополняется ответом после него. Повтор с тем же ключом
+    получает сохранённый ответ, не выполняя запрос ещё раз (см. idempotency).
+    """
+
+    __tablename__ = "idempotency_key"
+
+    # Клиент запроса (admission.middleware.client_key): ключи разных клиентов не пересекаются
+    client: Mapped[str] = mapped_column(String(80), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # sha256 метода, пути и тела: тот же ключ с другим запросом - ошибка клиента
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer)
+    response_headers: Mapped[list | None] = mapped_column(JSONB)
+    response_body: Mapped[bytes | None] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("now()"), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
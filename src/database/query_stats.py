@@ -0,0 +1,139 @@
+# database/query_stats.py
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+
+
+class QueryStats:
+    """SQL-запросы, выполненные в рамках одного запроса к API"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def add(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def merge(self, other: "QueryStats"):
+        self.count += other.count
+        self.duration += other.duration
+        self.statements.update(other.statements)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Запросы одной формы, выполненные больше threshold раз - признак N+1"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def instrument_query_stats(engine: AsyncEngine) -> AsyncEngine:
+    """Подписаться на события движка и считать запросы в QueryStats текущего контекста"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+    return engine
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    # Параметры передаются отдельно, поэтому текст запроса и есть его форма
+    stats.add(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute для упавшего запроса не вызывается: время старта снимается здесь
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        started.pop()
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """Для тестов: упасть, если код внутри блока выполнил больше max_queries запросов.
+
+    Запросы к приложению через httpx.ASGITransport выполняются в том же контексте
+    и тоже учитываются.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+    if stats.count > max_queries:
+        statements = "\n".join(f"{n}x {sql}" for sql, n in stats.statements.most_common())
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, executed {stats.count}:\n{statements}"
+        )
+
+
+class QueryStatsMiddleware:
+    """Считает SQL-запросы каждого HTTP-запроса и предупреждает о повторяющихся.
+
+    В режиме API_DEBUG добавляет в ответ заголовки Server-Timing и X-DB-Queries.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.expose_headers = settings.api.debug
+        self.repeat_threshold = settings.query_stats.repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        parent = _current_stats.get()
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append(
+                    (
+                        b"server-timing",
+                        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'.encode(),
+                    )
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            if parent is not None:
+                parent.merge(stats)
+            for statement, count in stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    f"Possible N+1 in {scope['method']} {scope['path']}: statement executed "
+                    f"{count} times: {' '.join(statement.split())[:300]}"
+                )
@@ -0,0 +1,103 @@
+# database/replica.py
+from itertools import cycle
+from typing import Optional, NewType
+from uuid import UUID
+
+from fastapi import Request
+from loguru import logger
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from database.models import FeatureConfigVersion
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+# Ключ session.info у сессий реплик
+REPLICA_SESSION = "replica"
+
+# Сессии primary в режиме autocommit для читающих запросов
+ReadOnlySessionmaker = NewType("ReadOnlySessionmaker", async_sessionmaker[AsyncSession])
+
+
+def is_read_only_request(request: Request) -> bool:
+    return request.method in READ_ONLY_METHODS
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """Сессия читает реплику: данные могут отставать от primary"""
+    return session.info.get(REPLICA_SESSION, False)
+
+
+def read_only_sessionmaker(
+    engine: AsyncEngine, replica: bool = False
+) -> async_sessionmaker[AsyncSession]:
+    """Сессии в режиме autocommit: драйвер не отправляет BEGIN/COMMIT вокруг запросов"""
+    return async_sessionmaker(
+        bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        info={REPLICA_SESSION: replica},
+    )
+
+
+class ReplicaRouter:
+    """Маршрутизация читающих запросов на реплики.
+
+    Запросы GET/HEAD получают сессию одной из реплик (round-robin), все остальные
+    идут в primary. Если клиент передал заголовок X-Config-Version с номером версии,
+    которой на реплике ещё нет, запрос читается из primary.
+    """
+
+    VERSION_HEADER = "X-Config-Version"
+
+    def __init__(self, engines: list[AsyncEngine]):
+        self._engines = engines
+        self._sessionmakers = [read_only_sessionmaker(engine, replica=True) for engine in engines]
+        self._next = cycle(self._sessionmakers) if self._sessionmakers else None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._sessionmakers)
+
+    def next_sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        return next(self._next)
+
+    async def is_stale(self, session: AsyncSession, request: Request) -> bool:
+        """Проверить, что реплика не отстаёт от версии, которую видел клиент"""
+        presented = request.headers.get(self.VERSION_HEADER)
+        if presented is None:
+            return False
+
+        config_id = self._parse_config_id(request)
+        try:
+            presented_version = int(presented)
+        except ValueError:
+            presented_version = None
+        if config_id is None or presented_version is None:
+            # Проверить версию нельзя - читаем из primary
+            return True
+
+        query = select(func.max(FeatureConfigVersion.version_number)).where(
+            FeatureConfigVersion.config_id == config_id
+        )
+        replica_version = (await session.execute(query)).scalar()
+        if replica_version is None or replica_version < presented_version:
+            logger.debug(
+                f"Replica is behind for config {config_id}: "
+                f"{replica_version} < {presented_version}, falling back to primary"
+            )
+            return True
+        return False
+
+    async def dispose(self):
+        for engine in self._engines:
+            await engine.dispose()
+
+    @staticmethod
+    def _parse_config_id(request: Request) -> Optional[UUID]:
+        config_id = request.path_params.get("config_id")
+        if config_id is None:
+            return None
+        try:
+            return UUID(str(config_id))
+        except ValueError:
+            return None
@@ -0,0 +1,112 @@
+# database/slow_queries.py
+import asyncio
+import contextvars
+import functools
+import json
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from metrics.database import current_repository_method
+from src.config import SlowQuerySettings
+
+EXPLAINABLE = ("SELECT", "WITH")
+
+
+def parameters_shape(parameters, executemany: bool = False):
+    """Типы связанных параметров без значений"""
+    if executemany and parameters:
+        return {"rows": len(parameters), "row": parameters_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Журнал запросов дольше порога с выборочным захватом плана.
+
+    Последние записи хранятся в кольцевом буфере. EXPLAIN выполняется
+    в отдельном соединении после завершения запроса и не больше одного за раз.
+    """
+
+    def __init__(self, slow_query_settings: SlowQuerySettings):
+        self._threshold = slow_query_settings.threshold_ms / 1000
+        self._explain_ratio = slow_query_settings.explain_sample_ratio
+        self._entries: deque[dict] = deque(maxlen=slow_query_settings.buffer_size)
+        self._explaining = False
+        self._tasks: set[asyncio.Task] = set()
+
+    def instrument(self, engine: AsyncEngine) -> AsyncEngine:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(
+            engine.sync_engine,
+            "after_cursor_execute",
+            functools.partial(self._after_cursor_execute, engine),
+        )
+        return engine
+
+    def entries(self) -> list[dict]:
+        return list(reversed(self._entries))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, engine, conn, cursor, statement, parameters, context, executemany
+    ):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self._threshold:
+            return
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "method": current_repository_method.get(),
+            "statement": statement,
+            "parameters": parameters_shape(parameters, executemany),
+            "plan": None,
+        }
+        self._entries.append(entry)
+        logger.bind(slow_query=True, **{k: v for k, v in entry.items() if k != "plan"}).warning(
+            f"Slow query {entry['duration_ms']} ms in {entry['method'] or 'unknown'}: "
+            f"{' '.join(statement.split())[:300]}"
+        )
+
+        if self._should_explain(statement, executemany):
+            self._explaining = True
+            # Пустой контекст: EXPLAIN не попадает в статистику и трассу текущего запроса
+            task = asyncio.get_running_loop().create_task(
+                self._explain(engine, statement, parameters, entry), context=contextvars.Context()
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, statement: str, executemany: bool) -> bool:
+        if executemany or self._explaining or random.random() >= self._explain_ratio:
+            return False
+        return statement.lstrip()[:6].upper().startswith(EXPLAINABLE)
+
+    async def _explain(self, engine: AsyncEngine, statement: str, parameters, entry: dict):
+        try:
+            async with engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+            entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+        except Exception as e:
+            entry["plan"] = {"error": repr(e)}
+            logger.warning(f"Failed to capture plan for slow query: {e}")
+        finally:
+            self._explaining = False
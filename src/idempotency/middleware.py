@@ -0,0 +1,165 @@
+# idempotency/middleware.py
+import hashlib
+import json
+from typing import Optional
+
+from admission.middleware import client_key
+from idempotency.store import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotencyStore,
+    StoredResponse,
+)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+MAX_KEY_LENGTH = 255
+# Retry-After для 409: первый запрос ещё выполняется
+IN_PROGRESS_RETRY_AFTER = b"1"
+
+
+def request_fingerprint(scope, body: bytes) -> str:
+    """Отпечаток запроса: тот же ключ с другим методом, путём или телом отклоняется"""
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope["query_string"], body):
+        digest.update(part)
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_error(send, status_code: int, detail: str, headers: tuple = ()):
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Заголовок Idempotency-Key на изменяющих запросах к /api.
+
+    Первый запрос с ключом выполняется, его ответ (статус, заголовки, тело)
+    сохраняет IdempotencyStore. Повтор с тем же ключом и тем же запросом
+    получает сохранённый ответ с заголовком Idempotent-Replayed: true, а
+    обработчик, сервис и транзакция записи не выполняются. Тот же ключ с другим
+    запросом - 422; ответа на выполняющийся запрос не дождались - 409.
+    """
+
+    def __init__(self, app, api_token: Optional[str] = None):
+        self.app = app
+        self.api_token = api_token
+        self._store: IdempotencyStore | None = None
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith("/api/")
+        ):
+            return await self.app(scope, receive, send)
+        key = None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                key = value.decode("latin-1")
+                break
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _send_error(
+                send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+            )
+
+        body = await _read_body(receive)
+        client = client_key(scope, self.api_token)
+        store = await self._get_store(scope)
+        try:
+            stored = await store.begin(client, key, request_fingerprint(scope, body))
+        except IdempotencyKeyReusedError:
+            return await _send_error(
+                send, 422, "Idempotency-Key was already used for a different request"
+            )
+        except IdempotencyKeyInProgressError:
+            return await _send_error(
+                send,
+                409,
+                "A request with this Idempotency-Key is still in progress",
+                ((b"retry-after", IN_PROGRESS_RETRY_AFTER),),
+            )
+        if stored is not None:
+            return await self._replay(send, stored)
+
+        response = None
+        try:
+            response = await self._execute(scope, receive, send, body)
+        finally:
+            # Без ответа (исключение, отмена) ключ освобождается
+            await store.finish(client, key, response)
+
+    async def _execute(self, scope, receive, send, body: bytes) -> StoredResponse | None:
+        """Выполнить запрос, передавая ответ клиенту и собирая его копию"""
+        body_sent = False
+        status_code = None
+        headers: list[list[str]] = []
+        chunks: list[bytes] = []
+
+        async def replay_receive():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_receive, send_wrapper)
+        if status_code is None:
+            return None
+        return StoredResponse(status_code, headers, b"".join(chunks))
+
+    @staticmethod
+    async def _replay(send, stored: StoredResponse):
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers
+        ]
+        headers.append((REPLAYED_HEADER, b"true"))
+        await send(
+            {"type": "http.response.start", "status": stored.status_code, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _get_store(self, scope) -> IdempotencyStore:
+        if self._store is None:
+            # Контейнер создаётся после middleware, поэтому хранилище берётся при первом запросе
+            self._store = await scope["app"].state.dishka_container.get(IdempotencyStore)
+        return self._store
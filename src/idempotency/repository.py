@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Optional, Protocol
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import IdempotencyKey
+from metrics.database import timed_repository
+from tracing.instrumentation import traced
+
+
+class IdempotencyKeyRepository(Protocol):
+    """Интерфейс репозитория ключей идемпотентности"""
+
+    async def claim(
+        self, client: str, key: str, fingerprint: str, now: datetime, lock_until: datetime
+    ) -> bool: ...
+
+    async def get(self, client: str, key: str) -> Optional[IdempotencyKey]: ...
+
+    async def complete(
+        self,
+        client: str,
+        key: str,
+        status_code: int,
+        headers: list[list[str]],
+        body: bytes,
+        expires_at: datetime,
+    ) -> None: ...
+
+    async def release(self, client: str, key: str) -> None: ...
+
+    async def extend(
+        self, leases: list[tuple[str, str, datetime]], lock_until: datetime
+    ) -> int: ...
+
+    async def delete_expired(self, now: datetime, limit: int) -> int: ...
+
+
+@traced
+@timed_repository
+class IdempotencyKeyRepositoryImpl(IdempotencyKeyRepository):
+    """Репозиторий ключей идемпотентности"""
+
+    def __init__(self, db_session: AsyncSession):
+        self._session = db_session
+
+    async def claim(
+        self, client: str, key: str, fingerprint: str, now: datetime, lock_until: datetime
+    ) -> bool:
+        """Занять ключ для выполнения запроса; False - ключ уже занят или хранит ответ.
+
+        Истёкшая строка (сохранённый ответ или брошенная блокировка) занимается
+        заново тем же INSERT ... ON CONFLICT: без гонки между проверкой и вставкой.
+        """
+        query = insert(IdempotencyKey).values(
+            client=client, key=key, fingerprint=fingerprint, created_at=now, expires_at=lock_until
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[IdempotencyKey.client, IdempotencyKey.key],
+            set_={
+                "fingerprint": query.excluded.fingerprint,
+                "status_code": None,
+                "response_headers": None,
+                "response_body": None,
+                "created_at": query.excluded.created_at,
+                "expires_at": query.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < now,
+        ).returning(IdempotencyKey.key)
+        result = await self._session.execute(query)
+        return result.scalar() is not None
+
+    async def get(self, client: str, key: str) -> Optional[IdempotencyKey]:
+        query = select(IdempotencyKey).where(
+            IdempotencyKey.client == client, IdempotencyKey.key == key
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def complete(
+        self,
+        client: str,
+        key: str,
+        status_code: int,
+        headers: list[list[str]],
+        body: bytes,
+        expires_at: datetime,
+    ) -> None:
+        await self._session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.client == client, IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response_headers=headers,
+                response_body=body,
+                expires_at=expires_at,
+            )
+        )
+
+    async def release(self, client: str, key: str) -> None:
+        """Освободить ключ запроса без сохранённого ответа"""
+        await self._session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.client == client,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+
+    async def extend(self, leases: list[tuple[str, str, datetime]], lock_until: datetime) -> int:
+        """Продлить блокировки выполняющихся запросов.
+
+        leases - (client, key, created_at) занятых строк: created_at отличает нашу
+        блокировку от занятой заново другим воркером после её истечения.
+        """
+        result = await self._session.execute(
+            update(IdempotencyKey)
+            .where(
+                tuple_(IdempotencyKey.client, IdempotencyKey.key, IdempotencyKey.created_at).in_(
+                    leases
+                ),
+                IdempotencyKey.status_code.is_(None),
+            )
+            .values(expires_at=lock_until)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def delete_expired(self, now: datetime, limit: int) -> int:
+        expired = (
+            select(IdempotencyKey.client, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < now)
+            .limit(limit)
+        )
+        result = await self._session.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.client, IdempotencyKey.key).in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,193 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from idempotency.repository import IdempotencyKeyRepositoryImpl
+from metrics.registry import registry
+from src.config import IdempotencySettings
+
+IDEMPOTENT_REQUESTS = registry.counter(
+    "idempotent_requests_total", "Requests with an Idempotency-Key by outcome", ("result",)
+)
+IDEMPOTENT_IN_FLIGHT = registry.callback(
+    "idempotent_requests_in_flight", "Idempotency keys being executed by the worker", "gauge"
+)
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Ключ уже использован для другого запроса"""
+
+
+class IdempotencyKeyInProgressError(Exception):
+    """Запрос с этим ключом ещё выполняется, ответа не дождались"""
+
+
+@dataclass(slots=True)
+class StoredResponse:
+    status_code: int
+    headers: list[list[str]]
+    body: bytes
+
+
+class IdempotencyStore:
+    """Ответы на запросы с Idempotency-Key.
+
+    Первый запрос занимает ключ строкой idempotency_key (отдельная короткая
+    транзакция, не транзакция запроса) и выполняется; его ответ сохраняется
+    на ttl секунд. Повтор получает сохранённый ответ. Повтор, пришедший, пока
+    первый запрос выполняется, ждёт его ответа: на том же воркере - future без
+    обращений к БД, на другом - опрашивая строку раз в poll_interval.
+
+    Пока запрос выполняется, воркер продлевает блокировку каждую треть
+    lock_timeout, поэтому долгий запрос не выполнится повтором второй раз.
+    Блокировка упавшего воркера истекает через lock_timeout.
+
+    Ответы 5xx не сохраняются: ключ освобождается, и повтор выполнит запрос заново.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        idempotency_settings: IdempotencySettings,
+    ):
+        self._sessionmaker = sessionmaker
+        self._ttl = timedelta(seconds=idempotency_settings.ttl)
+        self._lock_timeout = timedelta(seconds=idempotency_settings.lock_timeout)
+        self._wait_timeout = idempotency_settings.wait_timeout
+        self._poll_interval = idempotency_settings.poll_interval
+        self._max_response_bytes = idempotency_settings.max_response_bytes
+        # (client, key) -> (fingerprint, ответ выполняющегося на воркере запроса)
+        self._in_flight: dict[tuple[str, str], tuple[str, asyncio.Future]] = {}
+        # (client, key) -> created_at строк, занятых этим воркером
+        self._leases: dict[tuple[str, str], datetime] = {}
+        self._renew_task: Optional[asyncio.Task] = None
+        IDEMPOTENT_IN_FLIGHT.add_callback("idempotency", lambda: [({}, len(self._in_flight))])
+
+    async def begin(self, client: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """Сохранённый ответ или None - ключ занят, запрос нужно выполнить и вызвать finish"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._wait_timeout
+        while True:
+            entry = self._in_flight.get((client, key))
+            if entry is not None:
+                response = await self._wait_local(key, entry, fingerprint, deadline - loop.time())
+                if response is not None:
+                    IDEMPOTENT_REQUESTS.inc("replayed")
+                    return response
+                # Первый запрос не сохранил ответ - занять ключ заново
+                continue
+
+            future = loop.create_future()
+            self._in_flight[(client, key)] = (fingerprint, future)
+            try:
+                claimed, row = await self._claim(client, key, fingerprint)
+            except BaseException:
+                self._resolve(client, key, None)
+                raise
+            if claimed:
+                IDEMPOTENT_REQUESTS.inc("executed")
+                return None
+            self._resolve(client, key, None)
+
+            if row is None:
+                # Строку удалили между INSERT и SELECT
+                continue
+            if row.fingerprint != fingerprint:
+                IDEMPOTENT_REQUESTS.inc("reused")
+                raise IdempotencyKeyReusedError(key)
+            if row.status_code is not None:
+                IDEMPOTENT_REQUESTS.inc("replayed")
+                return StoredResponse(row.status_code, row.response_headers, row.response_body)
+            # Запрос выполняется на другом воркере
+            if loop.time() + self._poll_interval > deadline:
+                IDEMPOTENT_REQUESTS.inc("in_progress")
+                raise IdempotencyKeyInProgressError(key)
+            await asyncio.sleep(self._poll_interval)
+
+    async def finish(self, client: str, key: str, response: Optional[StoredResponse]):
+        """Сохранить ответ занятого ключа; None - запрос не завершился, освободить ключ"""
+        storable = (
+            response is not None
+            and response.status_code < 500
+            and len(response.body) <= self._max_response_bytes
+        )
+        self._leases.pop((client, key), None)
+        # Ждущие на воркере получают ответ сразу, даже если в БД он не попадёт (слишком велик)
+        shared = response if response is not None and response.status_code < 500 else None
+        self._resolve(client, key, shared)
+        try:
+            async with self._sessionmaker() as session:
+                repository = IdempotencyKeyRepositoryImpl(session)
+                if storable:
+                    expires_at = datetime.now(timezone.utc) + self._ttl
+                    await repository.complete(
+                        client,
+                        key,
+                        response.status_code,
+                        response.headers,
+                        response.body,
+                        expires_at,
+                    )
+                else:
+                    await repository.release(client, key)
+                await session.commit()
+        except Exception as e:
+            # Ключ освободится по lock_timeout; повтор до этого получит 409
+            logger.error(f"Failed to save response for idempotency key {key!r}: {e}")
+
+    async def _claim(self, client: str, key: str, fingerprint: str):
+        now = datetime.now(timezone.utc)
+        async with self._sessionmaker() as session:
+            repository = IdempotencyKeyRepositoryImpl(session)
+            claimed = await repository.claim(
+                client, key, fingerprint, now, now + self._lock_timeout
+            )
+            await session.commit()
+            if claimed:
+                self._leases[(client, key)] = now
+                if self._renew_task is None or self._renew_task.done():
+                    self._renew_task = asyncio.get_running_loop().create_task(
+                        self._renew_leases()
+                    )
+                return True, None
+            return False, await repository.get(client, key)
+
+    async def _renew_leases(self):
+        interval = self._lock_timeout.total_seconds() / 3
+        while self._leases:
+            await asyncio.sleep(interval)
+            leases = [(client, key, claimed) for (client, key), claimed in self._leases.items()]
+            if not leases:
+                return
+            try:
+                async with self._sessionmaker() as session:
+                    await IdempotencyKeyRepositoryImpl(session).extend(
+                        leases, datetime.now(timezone.utc) + self._lock_timeout
+                    )
+                    await session.commit()
+            except Exception as e:
+                # Следующая попытка - через interval, до истечения блокировки их ещё две
+                logger.error(f"Failed to extend {len(leases)} idempotency key locks: {e}")
+
+    async def _wait_local(
+        self, key: str, entry: tuple[str, asyncio.Future], fingerprint: str, timeout: float
+    ) -> Optional[StoredResponse]:
+        owner_fingerprint, future = entry
+        if owner_fingerprint != fingerprint:
+            IDEMPOTENT_REQUESTS.inc("reused")
+            raise IdempotencyKeyReusedError(key)
+        try:
+            # shield: отмена ждущего запроса не отменяет future первого
+            return await asyncio.wait_for(asyncio.shield(future), max(0.0, timeout))
+        except TimeoutError:
+            IDEMPOTENT_REQUESTS.inc("in_progress")
+            raise IdempotencyKeyInProgressError(key)
+
+    def _resolve(self, client: str, key: str, response: Optional[StoredResponse]):
+        entry = self._in_flight.pop((client, key), None)
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(response)
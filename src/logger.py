@@ -1,7 +1,15 @@
+import json
 import logging
+import random
 import sys
+import time
+import traceback
+import uuid
+
 from loguru import logger
 
+from src.config import LoggingSettings
+
 
 class InterceptHandler(logging.Handler):
     def emit(self, record):
@@ -19,22 +27,151 @@ class InterceptHandler(logging.Handler):
         logger.opt(depth=6, exception=record.exc_info).log(level, record.getMessage())
 
 
-def setup_logging():
+def _json_format(record) -> str:
+    """Компактная JSON-строка вместо полного record из serialize=True"""
+    entry = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    entry.update((key, value) for key, value in record["extra"].items() if key != "json")
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        entry["exception"] = "".join(
+            traceback.format_exception(exc_type, exc_value, exc_traceback)
+        )
+    record["extra"]["json"] = json.dumps(entry, default=str, ensure_ascii=False)
+    return "{extra[json]}\n"
+
+
+def setup_logging(log_settings: LoggingSettings):
+    # Записи ниже уровня отбрасываются в stdlib, не доходя до InterceptHandler
     logging.root.handlers = [InterceptHandler()]
-    logging.root.setLevel(logging.DEBUG)
+    logging.root.setLevel(log_settings.level)
 
     for logger_name in ("uvicorn", "uvicorn.error", "uvicorn.access", "fastapi"):
         logging_logger = logging.getLogger(logger_name)
         logging_logger.handlers = [InterceptHandler()]
         logging_logger.propagate = False
 
+    # Access log пишет AccessLogMiddleware с сэмплированием
+    logging.getLogger("uvicorn.access").disabled = log_settings.access_log
+
     logger.remove()
+    if log_settings.format == "json":
+        logger.add(
+            sys.stdout,
+            level=log_settings.level,
+            format=_json_format,
+            # Запись в stdout идёт в фоновом потоке, event loop не блокируется
+            enqueue=log_settings.enqueue,
+            backtrace=False,
+            diagnose=False,
+        )
+        return
+
     logger.add(
         sys.stdout,
         colorize=True,
-        level="DEBUG",
+        level=log_settings.level,
+        enqueue=log_settings.enqueue,
         format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
                "<level>{level: <8}</level> | "
                "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
                "<level>{message}</level>"
     )
+
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+def get_request_id(scope) -> str | None:
+    return scope.get("state", {}).get("request_id")
+
+
+class RequestIdMiddleware:
+    """Идентификатор запроса из X-Request-Id или новый; возвращается в ответе.
+
+    Хранится в scope["state"] (request.state.request_id) для access log и аудита.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class AccessLogMiddleware:
+    """Сэмплированный access log.
+
+    Ошибки (статус >= 400) и медленные запросы логируются всегда, остальные -
+    с вероятностью ACCESS_LOG_SAMPLE_RATIO.
+    """
+
+    def __init__(self, app, log_settings: LoggingSettings):
+        self.app = app
+        self.sample_ratio = log_settings.access_log_sample_ratio
+        self.slow_threshold = log_settings.access_log_slow_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            if (
+                status_code >= 400
+                or duration >= self.slow_threshold
+                or random.random() < self.sample_ratio
+            ):
+                self._log(scope, status_code, duration)
+
+    @staticmethod
+    def _log(scope, status_code: int, duration: float):
+        client = scope.get("client")
+        path = scope["path"]
+        if scope.get("query_string"):
+            path = f"{path}?{scope['query_string'].decode('latin-1')}"
+        level = "ERROR" if status_code >= 500 else "WARNING" if status_code >= 400 else "INFO"
+        logger.bind(
+            access=True,
+            method=scope["method"],
+            path=scope["path"],
+            status=status_code,
+            duration_ms=round(duration * 1000, 2),
+            client=client[0] if client else None,
+            request_id=get_request_id(scope),
+        ).log(level, f"{scope['method']} {path} {status_code} {duration * 1000:.1f} ms")
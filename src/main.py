@@ -1,37 +1,90 @@
 # main.py
+from startup import StartupState, ColdStartMiddleware, bootstrap
+from admission.middleware import AdmissionMiddleware, ConcurrencyLimiter
+from admission.rate_limit import build_rate_limiter
+from idempotency.middleware import IdempotencyMiddleware
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from dishka.integrations.fastapi import setup_dishka
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from api.v1.bot.heartbeats import HeartbeatBuffer
+from api.v1.usage.counters import UsageCounters
 from exceptions.exceptions import ApiError
 from exceptions.exceptions_handler import setup_exception_handlers
-from logger import setup_logging
+from logger import AccessLogMiddleware, RequestIdMiddleware, setup_logging
 from DI.container import create_container
-from database.database import InitDB
+from database.replica import ReplicaRouter
 from src.api import router as api_router
+from api.health.view import health_router
+from api.metrics.view import metrics_router
+from metrics.http import MetricsMiddleware
+from metrics.registry import registry
+from metrics.workers import WorkerMetrics
+from database.query_stats import QueryStatsMiddleware
+from tracing.instrumentation import TracingMiddleware
+from tracing.setup import init_tracing
+from profiling.middleware import ProfilingMiddleware, profiling_available
+from profiling.store import SlowestProfiles
+from scheduler.audit_partitions import AuditPartitionManager
+from scheduler.idempotency_keys import IdempotencyKeyPurger
+from scheduler.leader import LeaderElection
+from scheduler.scheduled_changes import ChangeScheduler
+from scheduler.version_retention import VersionCompactor
+from src.config import settings
 from loguru import logger
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Инициализация БД
-    InitDB()
+    # Инициализация БД, прогрев пула и кэша
+    await bootstrap(app.state.dishka_container, app.state.startup)
+    container = app.state.dishka_container
+    heartbeats = await container.get(HeartbeatBuffer)
+    heartbeats.start()
+    usage = await container.get(UsageCounters)
+    usage.start()
+    worker_metrics = getattr(app.state, "worker_metrics", None)
+    if worker_metrics is not None:
+        worker_metrics.start()
+    leader = None
+    if settings.scheduler.enabled:
+        # Отложенные изменения, секции аудита, компактизацию версий и очистку ключей
+        # идемпотентности обслуживает только воркер, взявший advisory lock
+        leader = await container.get(LeaderElection)
+        leader.add_job((await container.get(ChangeScheduler)).run)
+        leader.add_job((await container.get(AuditPartitionManager)).run)
+        if settings.retention.enabled:
+            leader.add_job((await container.get(VersionCompactor)).run)
+        if settings.idempotency.enabled:
+            leader.add_job((await container.get(IdempotencyKeyPurger)).run)
+        leader.start()
     yield
 
+    if leader is not None:
+        await leader.stop()
+    # Остаток heartbeat-ов и счётчиков записывается до закрытия engine
+    await heartbeats.stop()
+    await usage.stop()
+    if worker_metrics is not None:
+        await worker_metrics.stop()
+    if settings.admission.enabled:
+        await app.state.rate_limiter.close()
     # Правильное закрытие engine
-    container = app.state.dishka_container
     if container:
         async with container() as request_container:
             try:
                 engine = await request_container.get(AsyncEngine)
                 await engine.dispose()
+                replica_router = await request_container.get(ReplicaRouter)
+                await replica_router.dispose()
             except Exception as e:
                 print(f"Error closing engine: {e}")
 
 
 def create_app() -> FastAPI:
-    setup_logging()
+    setup_logging(settings.logging)
+    tracing_enabled = init_tracing(settings.tracing)
     logger.info("Creating FastAPI app")
     app = FastAPI(
         title="Bot Config API",
@@ -45,10 +98,53 @@ def create_app() -> FastAPI:
             500: {"model": ApiError, "description": "Internal Server Error"},
         },
     )
+    app.state.startup = StartupState()
+    app.add_middleware(ColdStartMiddleware, state=app.state.startup)
+    if settings.idempotency.enabled:
+        # Внутри допуска: повтор тоже расходует токен клиента и место для запроса к БД
+        app.add_middleware(IdempotencyMiddleware, api_token=settings.api.token)
+    if settings.admission.enabled:
+        # Внутри метрик и access log: отклонённые запросы видны в них со статусом 429/503
+        app.state.rate_limiter = build_rate_limiter(settings.admission, settings.redis)
+        app.add_middleware(
+            AdmissionMiddleware,
+            admission_settings=settings.admission,
+            rate_limiter=app.state.rate_limiter,
+            concurrency=ConcurrencyLimiter(
+                settings.admission.max_concurrent, settings.admission.max_concurrent_per_client
+            ),
+            api_token=settings.api.token,
+            # Без ConfigCache чтение конфигурации всегда идёт в БД
+            cached_reads_exempt=settings.cache.enabled,
+        )
+    app.add_middleware(QueryStatsMiddleware)
+    if settings.logging.access_log:
+        app.add_middleware(AccessLogMiddleware, log_settings=settings.logging)
+    if settings.metrics.enabled:
+        app.add_middleware(MetricsMiddleware)
+    if tracing_enabled:
+        app.add_middleware(TracingMiddleware)
+    if settings.profiling.enabled:
+        if profiling_available():
+            app.state.profiles = SlowestProfiles(settings.profiling.slowest_per_route)
+            app.add_middleware(
+                ProfilingMiddleware, profiling_settings=settings.profiling, store=app.state.profiles
+            )
+        else:
+            logger.warning("pyinstrument is not installed, profiling disabled")
+    # Внешний слой: идентификатор запроса нужен access log и аудиту
+    app.add_middleware(RequestIdMiddleware)
     container = create_container()
     setup_dishka(container, app)
     setup_exception_handlers(app)
     app.include_router(api_router)
+    app.include_router(health_router)
+    if settings.metrics.enabled:
+        app.include_router(metrics_router)
+        if settings.metrics.multiprocess_dir:
+            app.state.worker_metrics = WorkerMetrics(
+                registry, settings.metrics.multiprocess_dir, settings.metrics.multiprocess_interval
+            )
 
     return app
 
@@ -0,0 +1,22 @@
+# metrics/cache.py
+from metrics.registry import registry
+
+CACHE_REQUESTS = registry.callback(
+    "cache_requests_total",
+    "Cache lookups by result",
+    "counter",
+    ("cache", "result"),
+)
+
+
+def instrument_cache(name: str, cache):
+    """Выставить счётчики hits/misses кэша в метрики"""
+
+    def collect():
+        return [
+            ({"cache": name, "result": "hit"}, cache.hits),
+            ({"cache": name, "result": "miss"}, cache.misses),
+        ]
+
+    CACHE_REQUESTS.add_callback(name, collect)
+    return cache
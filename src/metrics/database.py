@@ -0,0 +1,93 @@
+# metrics/database.py
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from metrics.registry import registry
+
+QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds",
+    "Repository method latency including result loading",
+    ("method",),
+)
+POOL_WAIT = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pool connection",
+    ("pool",),
+)
+POOL_CONNECTIONS = registry.callback(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state",
+    "gauge",
+    ("pool", "state"),
+)
+
+
+# Метод репозитория, выполняющий текущий запрос - для журнала медленных запросов
+current_repository_method: ContextVar[Optional[str]] = ContextVar(
+    "current_repository_method", default=None
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий ожидание соединения"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, self.metrics_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> AsyncEngine:
+    """Подписать пул движка и выставить его состояние в метрики"""
+    engine.pool.metrics_name = name
+
+    def collect():
+        pool = engine.pool
+        return [
+            ({"pool": name, "state": "size"}, pool.size()),
+            ({"pool": name, "state": "checked_in"}, pool.checkedin()),
+            ({"pool": name, "state": "checked_out"}, pool.checkedout()),
+            # До заполнения пула SQLAlchemy считает overflow отрицательным
+            ({"pool": name, "state": "overflow"}, max(pool.overflow(), 0)),
+        ]
+
+    POOL_CONNECTIONS.add_callback(name, collect)
+    return engine
+
+
+def timed_repository(cls):
+    """Декоратор класса: замеряет все публичные async-методы репозитория"""
+    for attr_name, method in list(vars(cls).items()):
+        if attr_name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, attr_name, _timed(method, f"{cls.__name__}.{attr_name}"))
+    return cls
+
+
+def _timed(method, label: str):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_repository_method.set(label)
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            QUERY_DURATION.observe(time.perf_counter() - started, label)
+            current_repository_method.reset(token)
+
+    return wrapper
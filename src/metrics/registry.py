@@ -0,0 +1,218 @@
+# metrics/registry.py
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = tuple[str, ...]
+Sample = tuple[dict[str, str], float]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], *extra: str) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    pairs.extend(label for label in extra if label)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Метрика с фиксированным набором лейблов.
+
+    Значения меняются только из потока event loop, поэтому обновления идут
+    без блокировок: это обычные операции над dict и list.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def render(self, extra: str = "") -> list[str]:
+        return self.header() + self.samples(extra)
+
+    @abstractmethod
+    def samples(self, extra: str = "") -> list[str]:
+        """Строки значений; extra - лейбл, добавляемый к каждой (например, worker)"""
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self, extra: str = "") -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels, extra)} {_format_value(value)}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def samples(self, extra: str = "") -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels, extra)} {_format_value(value)}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        # Последний элемент - попадания выше верхней границы (+Inf)
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def samples(self, extra: str = "") -> list[str]:
+        lines = []
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                label_str = _format_labels(self.label_names, labels, extra, le)
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.label_names, labels, extra)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Метрика, значения которой считываются из объектов приложения в момент scrape"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        type: str,
+        label_names: Labels = (),
+    ):
+        super().__init__(name, documentation, label_names)
+        self.type = type
+        self._callbacks: dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def add_callback(self, key: str, callback: Callable[[], Iterable[Sample]]) -> None:
+        self._callbacks[key] = callback
+
+    def samples(self, extra: str = "") -> list[str]:
+        lines = []
+        for callback in list(self._callbacks.values()):
+            for labels, value in callback():
+                label_str = _format_labels(
+                    self.label_names, [labels[name] for name in self.label_names], extra
+                )
+                lines.append(f"{self.name}{label_str} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса с выводом в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, label_names: Labels = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Labels = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def callback(
+        self, name: str, documentation: str, type: str, label_names: Labels = ()
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, type, label_names))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def families(self, extra: str = "") -> dict[str, tuple[list[str], list[str]]]:
+        """Заголовок и строки значений каждой метрики, для объединения с другими процессами"""
+        return {
+            name: (metric.header(), metric.samples(extra))
+            for name, metric in list(self._metrics.items())
+        }
+
+    def _register(self, metric: Metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                raise ValueError(f"Metric {metric.name} is already registered differently")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,115 @@
+# metrics/workers.py
+import asyncio
+import json
+import os
+from typing import Optional
+
+from loguru import logger
+
+from metrics.registry import MetricsRegistry
+
+
+class WorkerMetrics:
+    """Метрики всех воркеров gunicorn через общий каталог.
+
+    У каждого воркера свой реестр, а /metrics отвечает тот воркер, которому
+    достался запрос. Поэтому каждый воркер раз в interval пишет свои метрики с
+    лейблом worker=<pid> в <directory>/<pid>.json, а ответ /metrics собирается из
+    свежих метрик своего процесса и файлов остальных живых воркеров. Файлы
+    завершившихся воркеров удаляются при чтении.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float):
+        self._registry = registry
+        self._directory = directory
+        self._interval = interval
+        self._pid = os.getpid()
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self._directory, f"{self._pid}.json")
+
+    def _own(self) -> dict[str, tuple[list[str], list[str]]]:
+        return self._registry.families(f'worker="{self._pid}"')
+
+    def write(self, families: dict[str, tuple[list[str], list[str]]]):
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(families, file)
+        os.replace(tmp_path, self._path)
+
+    def render(self) -> str:
+        families = self._own()
+        for path in self._other_workers():
+            try:
+                with open(path) as file:
+                    other = json.load(file)
+            except (OSError, ValueError):
+                # Файл заменяется через rename; пропавший или битый - воркер завершился
+                continue
+            for name, (header, samples) in other.items():
+                if name in families:
+                    families[name][1].extend(samples)
+                else:
+                    families[name] = (header, samples)
+
+        lines = []
+        for header, samples in families.values():
+            lines.extend(header)
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def _other_workers(self) -> list[str]:
+        workers = []
+        for file_name in os.listdir(self._directory):
+            pid, _, extension = file_name.partition(".")
+            if extension != "json" or not pid.isdigit() or int(pid) == self._pid:
+                continue
+            path = os.path.join(self._directory, file_name)
+            if not _alive(int(pid)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            workers.append(path)
+        return workers
+
+    def start(self):
+        # Приложение могло быть создано в мастере (--preload), pid берётся в воркере
+        self._pid = os.getpid()
+        self.write(self._own())
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                # Значения метрик читаются только в потоке event loop, в файл пишет поток
+                await asyncio.to_thread(self.write, self._own())
+            except Exception as e:
+                logger.error(f"Failed to write worker metrics: {e}")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,137 @@
+# profiling/middleware.py
+import asyncio
+import hmac
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+from uuid import uuid4
+
+from loguru import logger
+
+from profiling.store import ProfileRecord, SlowestProfiles
+from src.config import ProfilingSettings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+
+def profiling_available() -> bool:
+    return Profiler is not None
+
+
+def check_profiling_token(profiling_settings: ProfilingSettings, token: Optional[str]) -> bool:
+    if not profiling_settings.token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), profiling_settings.token.encode())
+
+
+def render_speedscope(record: ProfileRecord) -> str:
+    return SpeedscopeRenderer().render(record.session)
+
+
+class ProfilingMiddleware:
+    """Профилирование запросов семплирующим профайлером pyinstrument.
+
+    Запрос с X-Profile: 1 и X-Profile-Token (или ?profile=1&profile_token=...)
+    профилируется всегда: speedscope-файл сохраняется в PROFILING_DIR, его id
+    возвращается в заголовке X-Profile-Id. Кроме того, доля PROFILING_SAMPLE_RATIO
+    запросов профилируется в фоне, и для каждого маршрута хранятся профили
+    самых медленных из них.
+    """
+
+    def __init__(self, app, profiling_settings: ProfilingSettings, store: SlowestProfiles):
+        self.app = app
+        self.settings = profiling_settings
+        self.store = store
+        # Фоновое профилирование не больше одного запроса за раз
+        self._sampling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        on_demand = self._requested(scope)
+        if not on_demand:
+            if self._sampling or random.random() >= self.settings.sample_ratio:
+                return await self.app(scope, receive, send)
+            self._sampling = True
+
+        try:
+            await self._profile(scope, receive, send, on_demand)
+        finally:
+            if not on_demand:
+                self._sampling = False
+
+    async def _profile(self, scope, receive, send, on_demand: bool):
+        profile_id = uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if on_demand:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile_id.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=self.settings.interval, async_mode="enabled")
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            record = ProfileRecord(
+                id=profile_id,
+                method=scope["method"],
+                route=getattr(scope.get("route"), "path", "unmatched"),
+                path=scope["path"],
+                status=status_code,
+                duration=time.perf_counter() - started,
+                started_at=started_at,
+                session=session,
+            )
+            self.store.offer(record)
+            if on_demand:
+                await self._save(record)
+
+    async def _save(self, record: ProfileRecord):
+        path = os.path.join(self.settings.directory, f"{record.id}.speedscope.json")
+
+        def write():
+            os.makedirs(self.settings.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(render_speedscope(record))
+
+        try:
+            await asyncio.to_thread(write)
+            logger.info(
+                f"Profile of {record.method} {record.path} "
+                f"({record.duration * 1000:.1f} ms) saved to {path}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to save profile {record.id}: {e}")
+
+    def _requested(self, scope) -> bool:
+        headers = dict(scope["headers"])
+        flag = headers.get(b"x-profile", b"").decode("latin-1")
+        token = headers.get(b"x-profile-token", b"").decode("latin-1")
+        if not flag and scope.get("query_string"):
+            query = parse_qs(scope["query_string"].decode("latin-1"))
+            flag = query.get("profile", [""])[0]
+            token = query.get("profile_token", [""])[0]
+        if flag not in ("1", "true"):
+            return False
+        if not check_profiling_token(self.settings, token):
+            logger.warning(f"Profiling requested for {scope['path']} with an invalid token")
+            return False
+        return True
@@ -0,0 +1,69 @@
+# profiling/store.py
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    method: str
+    route: str
+    path: str
+    status: int
+    duration: float
+    started_at: datetime
+    # pyinstrument Session: рендерится только при запросе профиля
+    session: Any
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 2),
+            "started_at": self.started_at.isoformat(),
+        }
+
+
+class SlowestProfiles:
+    """Профили N самых медленных запросов для каждого маршрута"""
+
+    def __init__(self, per_route: int):
+        self._per_route = per_route
+        self._heaps: dict[str, list[tuple[float, int, ProfileRecord]]] = {}
+        self._by_id: dict[str, ProfileRecord] = {}
+        self._sequence = itertools.count()
+
+    def offer(self, record: ProfileRecord) -> bool:
+        """Сохранить профиль, если он медленнее самого быстрого из сохранённых"""
+        if self._per_route <= 0:
+            return False
+        key = f"{record.method} {record.route}"
+        heap = self._heaps.setdefault(key, [])
+        item = (record.duration, next(self._sequence), record)
+
+        if len(heap) < self._per_route:
+            heapq.heappush(heap, item)
+        elif record.duration > heap[0][0]:
+            evicted = heapq.heapreplace(heap, item)[2]
+            self._by_id.pop(evicted.id, None)
+        else:
+            return False
+
+        self._by_id[record.id] = record
+        return True
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        return self._by_id.get(profile_id)
+
+    def summaries(self) -> list[dict]:
+        return [
+            record.summary()
+            for _, heap in sorted(self._heaps.items())
+            for _, _, record in sorted(heap, key=lambda item: item[0], reverse=True)
+        ]
@@ -0,0 +1,94 @@
+# scheduler/audit_partitions.py
+import asyncio
+import re
+from datetime import datetime, timezone
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import AuditSettings
+
+PARTITION_NAME = re.compile(r"^audit_event_(\d{4})_(\d{2})$")
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    """Начало месяца (UTC), отстоящего от moment на months"""
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month_start: datetime) -> str:
+    return f"audit_event_{month_start:%Y_%m}"
+
+
+class AuditPartitionManager:
+    """Месячные секции audit_event: создаёт наперёд и отсоединяет старые.
+
+    Работает как задача воркера-лидера. Отсоединённая секция остаётся обычной
+    таблицей: её можно выгрузить в архив и удалить отдельно.
+    """
+
+    def __init__(self, engine: AsyncEngine, audit_settings: AuditSettings):
+        self._engine = engine
+        self._ahead = audit_settings.partitions_ahead
+        self._retention_months = audit_settings.retention_months
+        self._interval = audit_settings.maintenance_interval
+
+    async def run(self, connection: asyncpg.Connection):
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.exception(f"Audit partition maintenance failed: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def maintain(self):
+        current = add_months(datetime.now(timezone.utc), 0)
+        existing = await self._partitions()
+
+        for offset in range(self._ahead + 1):
+            start = add_months(current, offset)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            # Каждая секция в своей транзакции: конфликт со строками в DEFAULT не мешает остальным
+            await self._execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_event "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+            )
+            logger.info(f"Created audit partition {name}")
+
+        if not self._retention_months:
+            return
+        cutoff = add_months(current, -self._retention_months)
+        for name, start in existing.items():
+            if add_months(start, 1) <= cutoff:
+                await self._execute(f"ALTER TABLE audit_event DETACH PARTITION {name}")
+                logger.info(f"Detached audit partition {name}")
+
+    async def _partitions(self) -> dict[str, datetime]:
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'audit_event'::regclass"
+                )
+            )
+            names = result.scalars().all()
+        partitions = {}
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                year, month = int(match.group(1)), int(match.group(2))
+                partitions[name] = datetime(year, month, 1, tzinfo=timezone.utc)
+        return partitions
+
+    async def _execute(self, statement: str):
+        try:
+            async with self._engine.begin() as connection:
+                await connection.execute(text(statement))
+        except Exception as e:
+            logger.error(f"Audit partition DDL failed ({statement}): {e}")
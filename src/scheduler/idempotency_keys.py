@@ -0,0 +1,58 @@
+# scheduler/idempotency_keys.py
+import asyncio
+from datetime import datetime, timezone
+
+import asyncpg
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from idempotency.repository import IdempotencyKeyRepositoryImpl
+from metrics.registry import registry
+from src.config import IdempotencySettings
+
+IDEMPOTENCY_KEYS_PURGED = registry.counter(
+    "idempotency_keys_purged_total", "Expired idempotency keys deleted"
+)
+
+
+class IdempotencyKeyPurger:
+    """Удаляет истёкшие ключи идемпотентности. Работает на лидере.
+
+    Истёкший ключ не мешает запросам (его занимает заново следующий запрос),
+    удаление только ограничивает размер таблицы. DELETE идёт пачками по
+    purge_batch_size строк, каждая в своей транзакции.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        idempotency_settings: IdempotencySettings,
+    ):
+        self._sessionmaker = sessionmaker
+        self._interval = idempotency_settings.purge_interval
+        self._batch_size = idempotency_settings.purge_batch_size
+
+    async def run(self, connection: asyncpg.Connection):
+        while True:
+            try:
+                await self.purge()
+            except Exception as e:
+                logger.exception(f"Idempotency key purge failed: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def purge(self) -> int:
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        while True:
+            async with self._sessionmaker() as session:
+                count = await IdempotencyKeyRepositoryImpl(session).delete_expired(
+                    now, self._batch_size
+                )
+                await session.commit()
+            deleted += count
+            IDEMPOTENCY_KEYS_PURGED.inc(amount=count)
+            if count < self._batch_size:
+                break
+        if deleted:
+            logger.info(f"Purged {deleted} expired idempotency keys")
+        return deleted
@@ -0,0 +1,73 @@
+# scheduler/leader.py
+import asyncio
+from contextlib import suppress
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+from loguru import logger
+
+# Session-level advisory lock лидера. SNAPSHOT_LOCK_KEY кэша - 7_260_315_001
+LEADER_LOCK_KEY = 7_260_315_002
+
+LeaderJob = Callable[[asyncpg.Connection], Awaitable[None]]
+
+
+class LeaderElection:
+    """Выбор одного воркера-лидера через pg_try_advisory_lock на отдельном соединении.
+
+    Лидерство держится, пока живо соединение: при его обрыве Postgres снимает
+    блокировку, задачи лидера отменяются, и выборы начинаются заново. Задачи
+    получают это соединение, например для LISTEN.
+    """
+
+    def __init__(self, dsn: str, lock_key: int, retry_interval: float):
+        self._dsn = dsn
+        self._lock_key = lock_key
+        self._retry_interval = retry_interval
+        self._jobs: list[LeaderJob] = []
+        self._task: Optional[asyncio.Task] = None
+        self.is_leader = False
+
+    def add_job(self, job: LeaderJob):
+        self._jobs.append(job)
+
+    def start(self):
+        if self._task is None and self._jobs:
+            self._task = asyncio.create_task(self._run(), name="leader-election")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self._campaign()
+            except Exception as e:
+                logger.warning(f"Leader jobs stopped: {e!r}")
+            await asyncio.sleep(self._retry_interval)
+
+    async def _campaign(self):
+        connection = await asyncpg.connect(self._dsn)
+        try:
+            if not await connection.fetchval("SELECT pg_try_advisory_lock($1)", self._lock_key):
+                return
+            self.is_leader = True
+            logger.info("Worker elected leader")
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._keepalive(connection))
+                for job in self._jobs:
+                    group.create_task(job(connection))
+        finally:
+            self.is_leader = False
+            # Закрытие соединения снимает advisory lock
+            await connection.close(timeout=5)
+
+    async def _keepalive(self, connection: asyncpg.Connection):
+        """Обрыв соединения роняет TaskGroup и отменяет задачи лидера"""
+        while True:
+            await asyncio.sleep(self._retry_interval)
+            await connection.execute("SELECT 1")
@@ -0,0 +1,171 @@
+# scheduler/scheduled_changes.py
+import asyncio
+import heapq
+import time
+from datetime import datetime, timezone
+
+import asyncpg
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.v1.audit.log import AuditLog
+from api.v1.audit.repository import AuditEventRepositoryImpl
+from api.v1.feature.feature_config.cache import ConfigCache
+from api.v1.feature.feature_config.config_version.repository import (
+    FeatureConfigVersionRepositoryImpl,
+)
+from api.v1.feature.feature_config.repository import FeatureConfigRepositoryImpl
+from api.v1.feature.feature_config.scheduled_change.repository import (
+    SCHEDULED_CHANGE_CHANNEL,
+    ScheduledChangeRepositoryImpl,
+)
+from api.v1.feature.feature_config.service import FeatureConfigServiceImpl
+from api.v1.feature.repository import FeatureConfigFlagRepositoryImpl
+from api.v1.feature.schemas import FeatureConfigFlagUpdate
+from database.UnitOfWork import UnitOfWork
+from database.models import ScheduledAction, ScheduledChange, ScheduledChangeStatus
+from metrics.registry import registry
+from src.config import SchedulerSettings
+
+# actor в журнале аудита и created_by версий для изменений, применённых по расписанию
+SCHEDULER_ACTOR = "scheduler"
+
+APPLY_DELAY = registry.histogram(
+    "scheduled_change_delay_seconds",
+    "Delay between run_at and applying a scheduled change",
+    ("action", "status"),
+)
+
+
+class ChangeScheduler:
+    """Применяет отложенные изменения в момент run_at. Работает только на лидере.
+
+    Ожидающие изменения лежат в куче (run_at, id), задача спит до ближайшего
+    и просыпается раньше, когда NOTIFY сообщает о новом изменении. Опроса БД
+    нет, кроме редкой полной перечитки на случай потерянного уведомления.
+    Каждое изменение применяется под FOR UPDATE SKIP LOCKED в одной транзакции
+    с самим изменением конфигурации.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        cache: ConfigCache,
+        scheduler_settings: SchedulerSettings,
+    ):
+        self._sessionmaker = sessionmaker
+        self._cache = cache
+        self._resync_interval = scheduler_settings.resync_interval
+        self._heap: list[tuple[float, int]] = []
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def run(self, connection: asyncpg.Connection):
+        await connection.add_listener(SCHEDULED_CHANGE_CHANNEL, self._on_notify)
+        try:
+            await self._load_pending()
+            next_resync = time.monotonic() + self._resync_interval
+            while True:
+                await self._apply_due()
+                if time.monotonic() >= next_resync:
+                    await self._load_pending()
+                    next_resync = time.monotonic() + self._resync_interval
+
+                # Сначала clear, потом расчёт таймаута: NOTIFY между ними не потеряется
+                self._wakeup.clear()
+                timeout = next_resync - time.monotonic()
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+                except TimeoutError:
+                    pass
+        finally:
+            self._heap.clear()
+            if not connection.is_closed():
+                await connection.remove_listener(SCHEDULED_CHANGE_CHANNEL, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        change_id, run_at = payload.split(":")
+        heapq.heappush(self._heap, (float(run_at), int(change_id)))
+        self._wakeup.set()
+
+    async def _load_pending(self):
+        async with self._sessionmaker() as session:
+            pending = await ScheduledChangeRepositoryImpl(session).get_pending()
+        self._heap = [(run_at.timestamp(), change_id) for change_id, run_at in pending]
+        heapq.heapify(self._heap)
+        logger.info(f"Scheduler loaded {len(self._heap)} pending changes")
+
+    async def _apply_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, change_id = heapq.heappop(self._heap)
+            try:
+                await self._apply(change_id)
+            except Exception as e:
+                logger.exception(f"Scheduled change {change_id} failed: {e}")
+                await self._mark_failed(change_id, repr(e))
+
+    async def _apply(self, change_id: int):
+        async with self._sessionmaker() as session:
+            uow = UnitOfWork(session)
+            audit = AuditLog(
+                AuditEventRepositoryImpl(session), SCHEDULER_ACTOR, f"scheduled-change-{change_id}"
+            )
+            service = FeatureConfigServiceImpl(
+                FeatureConfigRepositoryImpl(session),
+                FeatureConfigFlagRepositoryImpl(session),
+                FeatureConfigVersionRepositoryImpl(session),
+                uow,
+                self._cache,
+                audit,
+            )
+            change = await ScheduledChangeRepositoryImpl(session).lock_pending(change_id)
+            if change is None:
+                # Уже применено, отменено или его держит другой лидер
+                await session.rollback()
+                return
+
+            now = datetime.now(timezone.utc)
+            delay = (now - change.run_at).total_seconds()
+            if delay < 0:
+                heapq.heappush(self._heap, (change.run_at.timestamp(), change.id))
+                await session.rollback()
+                return
+
+            # Статус коммитится вместе с изменением в UnitOfWork сервиса
+            change.status = ScheduledChangeStatus.APPLIED
+            change.applied_at = now
+            action = change.action.value
+            applied = await self._execute(service, change)
+
+        if not applied:
+            await self._mark_failed(change_id, "Config or feature binding not found")
+            APPLY_DELAY.observe(delay, action, "failed")
+            return
+        APPLY_DELAY.observe(delay, action, "applied")
+        logger.info(f"Applied scheduled change {change_id} ({action}) {delay * 1000:.0f} ms late")
+
+    @staticmethod
+    async def _execute(service: FeatureConfigServiceImpl, change: ScheduledChange) -> bool:
+        if change.action == ScheduledAction.ACTIVATE:
+            return await service.activate_config(change.config_id)
+        if change.action == ScheduledAction.DEACTIVATE:
+            return await service.deactivate_config(change.config_id)
+
+        if change.action == ScheduledAction.TOGGLE_FEATURE:
+            update_data = FeatureConfigFlagUpdate(is_enabled=change.is_enabled)
+        else:
+            update_data = FeatureConfigFlagUpdate(disabled_message=change.disabled_message)
+        updated = await service.update_config_feature(
+            change.config_id, change.feature_id, update_data
+        )
+        return updated is not None
+
+    async def _mark_failed(self, change_id: int, error: str):
+        async with self._sessionmaker() as session:
+            await ScheduledChangeRepositoryImpl(session).mark_failed(change_id, error)
+            await session.commit()
@@ -0,0 +1,166 @@
+# scheduler/version_retention.py
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from api.v1.audit.log import AuditLog
+from api.v1.audit.repository import AuditEventRepositoryImpl
+from api.v1.feature.feature_config.cache import ConfigCache
+from api.v1.feature.feature_config.config_version.repository import (
+    FeatureConfigVersionRepositoryImpl,
+)
+from api.v1.feature.feature_config.repository import FeatureConfigRepositoryImpl
+from database.models import Environment
+from metrics.registry import registry
+from src.config import VersionRetentionPolicy, VersionRetentionSettings
+
+# actor в журнале аудита для отчётов компактизации
+RETENTION_ACTOR = "retention"
+VERSION_TABLE = "feature_config_version"
+
+VERSIONS_DELETED = registry.counter(
+    "config_versions_deleted_total",
+    "Config versions deleted by the retention policy",
+    ("environment",),
+)
+RECLAIMED_BYTES = registry.counter(
+    "config_versions_reclaimed_bytes_total",
+    "Estimated size of deleted config versions including index entries",
+)
+
+
+class VersionCompactor:
+    """Удаляет историю версий по политике хранения окружения. Работает на лидере.
+
+    Версия удаляется, только если она не среди последних keep_last версий своей
+    конфигурации, старше keep_days дней и не помечена. Удаление идёт пачками
+    по batch_size строк, каждая в своей короткой транзакции, с паузой между пачками:
+    блокировки не копятся, а autovacuum и реплики успевают за удалением.
+
+    DELETE не возвращает место ОС: VACUUM делает его доступным для новых строк,
+    поэтому в отчёте, кроме размера таблицы до и после, есть оценка освобождённого
+    места (удалённые строки * средний размер строки вместе с индексами).
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        cache: ConfigCache,
+        retention_settings: VersionRetentionSettings,
+    ):
+        # VACUUM нельзя выполнить внутри транзакции
+        self._autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        self._sessionmaker = sessionmaker
+        self._cache = cache
+        self._interval = retention_settings.interval
+        self._batch_size = retention_settings.batch_size
+        self._batch_pause = retention_settings.batch_pause
+        self._vacuum = retention_settings.vacuum
+        self._policies = retention_settings.policies
+
+    async def run(self, connection: asyncpg.Connection):
+        while True:
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.exception(f"Config version compaction failed: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def compact(self) -> dict:
+        """Один проход по всем окружениям; возвращает отчёт"""
+        started = time.perf_counter()
+        bytes_before, row_bytes = await self._table_size()
+        now = datetime.now(timezone.utc)
+
+        deleted: dict[str, int] = {}
+        for environment in Environment:
+            policy = self._policies.get(environment.value)
+            if policy is None:
+                continue
+            deleted[environment.value] = await self._compact_environment(environment, policy, now)
+
+        total = sum(deleted.values())
+        if total and self._vacuum:
+            async with self._autocommit_engine.connect() as connection:
+                await connection.execute(text(f"VACUUM (ANALYZE) {VERSION_TABLE}"))
+        bytes_after, _ = await self._table_size()
+
+        report = {
+            "deleted_rows": deleted,
+            "total_deleted_rows": total,
+            "estimated_reclaimed_bytes": round(total * row_bytes),
+            "table_bytes_before": bytes_before,
+            "table_bytes_after": bytes_after,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+        if total:
+            RECLAIMED_BYTES.inc(amount=report["estimated_reclaimed_bytes"])
+            await self._record(report)
+            logger.bind(**report).info(
+                f"Compacted {total} config versions, "
+                f"~{report['estimated_reclaimed_bytes'] // 1024} KiB reclaimed"
+            )
+        return report
+
+    async def _compact_environment(
+        self, environment: Environment, policy: VersionRetentionPolicy, now: datetime
+    ) -> int:
+        async with self._sessionmaker() as session:
+            configs = await FeatureConfigRepositoryImpl(session).get_by_environment(environment)
+        config_ids = [config.id for config in configs]
+
+        # Последняя версия хранится всегда: от неё считается номер следующей
+        keep_last = max(1, policy.keep_last)
+        created_before = now - timedelta(days=policy.keep_days)
+        deleted = 0
+        for config_id in config_ids:
+            count = await self._compact_config(config_id, keep_last, created_before)
+            if count:
+                VERSIONS_DELETED.inc(environment.value, amount=count)
+                self._cache.invalidate(config_id)
+                deleted += count
+        return deleted
+
+    async def _compact_config(
+        self, config_id: UUID, keep_last: int, created_before: datetime
+    ) -> int:
+        deleted = 0
+        async with self._sessionmaker() as session:
+            repository = FeatureConfigVersionRepositoryImpl(session)
+            boundary = await repository.get_retention_boundary(config_id, keep_last)
+            while boundary is not None:
+                count = await repository.delete_expired(
+                    config_id, boundary, created_before, self._batch_size
+                )
+                await session.commit()
+                deleted += count
+                if count < self._batch_size:
+                    break
+                await asyncio.sleep(self._batch_pause)
+        return deleted
+
+    async def _table_size(self) -> tuple[int, float]:
+        """Полный размер таблицы с индексами и средний размер строки в байтах"""
+        async with self._sessionmaker() as session:
+            result = await session.execute(
+                text(
+                    "SELECT pg_total_relation_size(c.oid), c.reltuples FROM pg_class c "
+                    f"WHERE c.oid = '{VERSION_TABLE}'::regclass"
+                )
+            )
+            total_bytes, rows = result.one()
+        # reltuples = -1, пока таблицу ни разу не анализировали
+        return total_bytes, total_bytes / rows if rows > 0 else 0.0
+
+    async def _record(self, report: dict):
+        async with self._sessionmaker() as session:
+            audit = AuditLog(AuditEventRepositoryImpl(session), RETENTION_ACTOR, None)
+            await audit.record("compact", "config_version", VERSION_TABLE, after=report)
+            await session.commit()
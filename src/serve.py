@@ -0,0 +1,229 @@
+"""Production entrypoint: gunicorn master + uvicorn workers on uvloop/httptools.
+
+    python serve.py --workers 4 --preload
+
+Размер пула соединений каждого воркера рассчитывается так, чтобы
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) не превышало max_connections Postgres.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BASE_DIR)
+
+from dotenv import load_dotenv
+
+load_dotenv(override=True, encoding="UTF-8")
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from loguru import logger
+from uvicorn.server import Server
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    from uvicorn.workers import UvicornWorker
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """Квота CPU контейнера (cgroup v2, затем v1); None - квоты нет"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """Число CPU процесса: affinity, ограниченная квотой cgroup.
+
+    os.cpu_count() возвращает ядра хоста: в контейнере с лимитом CPU воркеров
+    (и пулов соединений) было бы больше, чем процессорного времени.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return cpus
+
+
+def size_worker_pools(workers: int, max_connections: int, reserved_connections: int):
+    """Разделить бюджет соединений Postgres между воркерами.
+
+    Явно заданные DB_POOL_SIZE/DB_MAX_OVERFLOW проверяются на вместимость,
+    иначе пул каждого воркера получает треть своей доли, остальное идёт в overflow.
+    """
+    budget = (max_connections - reserved_connections) // workers
+    if budget < 1:
+        raise SystemExit(
+            f"{workers} workers do not fit into max_connections={max_connections} "
+            f"with {reserved_connections} reserved connections"
+        )
+
+    if "DB_POOL_SIZE" in os.environ or "DB_MAX_OVERFLOW" in os.environ:
+        pool_size = int(os.getenv("DB_POOL_SIZE", 10))
+        max_overflow = int(os.getenv("DB_MAX_OVERFLOW", 20))
+        if pool_size + max_overflow > budget:
+            raise SystemExit(
+                f"DB_POOL_SIZE + DB_MAX_OVERFLOW = {pool_size + max_overflow} exceeds "
+                f"the per-worker budget of {budget} connections"
+            )
+    else:
+        pool_size = max(1, budget // 3)
+        max_overflow = budget - pool_size
+
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    warmup = int(os.getenv("DB_POOL_WARMUP", pool_size))
+    os.environ["DB_POOL_WARMUP"] = str(min(warmup, pool_size))
+    return pool_size, max_overflow
+
+
+class DrainingServer(Server):
+    """Uvicorn server, который по первому SIGTERM сначала снимает воркер с балансировки.
+
+    /health/ready начинает отвечать 503, воркер ещё drain_delay секунд обслуживает
+    запросы, затем штатно закрывает соединения. Повторный сигнал завершает сразу.
+    """
+
+    def __init__(self, config, drain_delay: float):
+        super().__init__(config=config)
+        self.drain_delay = drain_delay
+        self.drain_deadline = None
+
+    def handle_exit(self, sig, frame):
+        if self.drain_delay > 0 and self.drain_deadline is None:
+            self.drain_deadline = time.monotonic() + self.drain_delay
+            startup = getattr(getattr(self.config.app, "state", None), "startup", None)
+            if startup is not None:
+                startup.mark_draining()
+            return
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        should_exit = await super().on_tick(counter)
+        if self.drain_deadline is not None and time.monotonic() >= self.drain_deadline:
+            return True
+        return should_exit
+
+
+class ProductionWorker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = DrainingServer(
+            config=self.config, drain_delay=float(os.getenv("SERVER_DRAIN_DELAY", "0"))
+        )
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+class Application(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Production server")
+    parser.add_argument("--host", default=os.getenv("API_IP", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", 8000)))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("SERVER_WORKERS", available_cpus()))
+    )
+    parser.add_argument(
+        "--preload", action="store_true", help="Import the app once in the master before forking"
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30)),
+        help="Seconds to finish in-flight requests after SIGTERM",
+    )
+    parser.add_argument(
+        "--drain-delay",
+        type=float,
+        default=float(os.getenv("SERVER_DRAIN_DELAY", "0")),
+        help="Seconds to keep serving with /health/ready = 503 before shutting down",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=int(os.getenv("DB_MAX_CONNECTIONS", 100)),
+        help="Postgres max_connections available to this deployment",
+    )
+    parser.add_argument(
+        "--reserved-connections",
+        type=int,
+        default=int(os.getenv("DB_RESERVED_CONNECTIONS", 10)),
+        help="Connections kept free for migrations, admin sessions and background tasks",
+    )
+    args = parser.parse_args()
+
+    # До импорта приложения: настройки БД читаются из окружения при импорте src.config
+    pool_size, max_overflow = size_worker_pools(
+        args.workers, args.max_connections, args.reserved_connections
+    )
+    os.environ["SERVER_DRAIN_DELAY"] = str(args.drain_delay)
+    # Продакшен-режим логирования, если он не задан явно
+    os.environ.setdefault("LOG_FORMAT", "json")
+    os.environ.setdefault("LOG_LEVEL", "INFO")
+    os.environ.setdefault("LOG_ENQUEUE", "True")
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATIO", "0.01")
+    from logger import setup_logging
+    from src.config import settings
+
+    # Логирование мастера настраивается так же, как у воркеров
+    setup_logging(settings.logging)
+    logger.info(
+        f"Starting {args.workers} workers, pool_size={pool_size}, max_overflow={max_overflow} "
+        f"per worker"
+    )
+
+    Application(
+        {
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": ProductionWorker,
+            "preload_app": args.preload,
+            "graceful_timeout": args.graceful_timeout + math.ceil(args.drain_delay),
+            "keepalive": 5,
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# startup.py
+import time
+
+# Модуль импортируется первым в main.py - считаем это моментом старта процесса
+PROCESS_STARTED_AT = time.perf_counter()
+
+from dataclasses import dataclass
+from typing import Optional
+
+from dishka import AsyncContainer
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.v1.feature.feature_config.cache import ConfigCache
+from database.database import ensure_database, warm_up_pool
+from src.config import settings
+
+
+@dataclass
+class StartupState:
+    """Состояние прогрева воркера"""
+
+    ready: bool = False
+    ready_at: Optional[float] = None
+    first_request_served: bool = False
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_at = time.perf_counter()
+
+    def mark_draining(self):
+        """Воркер завершается: снять его с балансировки, продолжая обслуживать запросы"""
+        self.ready = False
+
+
+async def bootstrap(container: AsyncContainer, state: StartupState):
+    """Асинхронная инициализация воркера до приёма трафика"""
+    started = time.perf_counter()
+    await ensure_database(settings.db)
+
+    engine = await container.get(AsyncEngine)
+    warmed_connections = await warm_up_pool(engine, settings.db.pool_warmup)
+
+    cache = await container.get(ConfigCache)
+    if settings.cache.preload_active_configs:
+        await cache.warm()
+    else:
+        cache.warmed = True
+
+    state.mark_ready()
+    logger.info(
+        f"Worker ready in {(state.ready_at - PROCESS_STARTED_AT) * 1000:.0f} ms since start "
+        f"(bootstrap {(state.ready_at - started) * 1000:.0f} ms, "
+        f"{warmed_connections} pool connections warmed)"
+    )
+
+
+class ColdStartMiddleware:
+    """Логирует время от старта процесса до первого обслуженного запроса"""
+
+    def __init__(self, app, state: StartupState):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if self.state.first_request_served or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        await self.app(scope, receive, send)
+        if not self.state.first_request_served:
+            self.state.first_request_served = True
+            finished = time.perf_counter()
+            logger.info(
+                f"First request served {(finished - PROCESS_STARTED_AT) * 1000:.0f} ms "
+                f"after start (request took {(finished - started) * 1000:.1f} ms)"
+            )
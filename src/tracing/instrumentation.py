@@ -0,0 +1,145 @@
+# tracing/instrumentation.py
+import functools
+import inspect
+from contextlib import nullcontext
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None
+
+# Классы оборачиваются @traced при импорте, ещё до init_tracing: обёртка ставится,
+# если трассировка включена в настройках, а спаны пишутся, только если провайдер установлен
+AVAILABLE = settings.tracing.enabled and trace is not None
+_enabled = False
+# ProxyTracer: начинает писать спаны после установки провайдера в init_tracing
+tracer = trace.get_tracer("bot-config-api") if trace is not None else None
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def set_tracing_enabled(enabled: bool):
+    """Выставляет init_tracing по результату установки провайдера"""
+    global _enabled
+    _enabled = AVAILABLE and enabled
+
+
+def _is_recording() -> bool:
+    return trace.get_current_span().is_recording()
+
+
+def start_span(name: str):
+    """Дочерний спан текущего запроса; ничего не делает вне трассируемого запроса"""
+    if not _enabled or not _is_recording():
+        return nullcontext()
+    return tracer.start_as_current_span(name)
+
+
+def traced(cls):
+    """Декоратор класса: спан на каждый публичный async-метод сервиса или репозитория"""
+    if not AVAILABLE:
+        return cls
+    for attr_name, method in list(vars(cls).items()):
+        if attr_name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, attr_name, _traced(method, f"{cls.__name__}.{attr_name}"))
+    return cls
+
+
+def _traced(method, name: str):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        # Несэмплированные запросы не создают дочерних спанов вовсе
+        if not _enabled or not _is_recording():
+            return await method(*args, **kwargs)
+        with tracer.start_as_current_span(name):
+            return await method(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_tracing(engine: AsyncEngine) -> AsyncEngine:
+    """Спан на каждый SQL-запрос движка"""
+    if _enabled:
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", _handle_error)
+    return engine
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not _is_recording():
+        return
+    operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+    context._otel_span = tracer.start_span(
+        operation,
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement,
+            "db.name": conn.engine.url.database or "",
+        },
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_otel_span", None)
+    if span is not None:
+        span.end()
+        context._otel_span = None
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_otel_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+        exception_context.execution_context._otel_span = None
+
+
+class TracingMiddleware:
+    """Корневой спан HTTP-запроса с W3C trace context из заголовков бота"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]
+        }
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            scope["method"], context=propagate.extract(carrier), kind=SpanKind.SERVER
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if span.is_recording():
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        span.update_name(f"{scope['method']} {route}")
+                        span.set_attribute("http.route", route)
+                    span.set_attribute("http.request.method", scope["method"])
+                    span.set_attribute("url.path", scope["path"])
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,115 @@
+# tracing/setup.py
+import threading
+from typing import Optional, Sequence
+
+from loguru import logger
+
+from src.config import TracingSettings
+from tracing.instrumentation import AVAILABLE, set_tracing_enabled
+
+_memory_exporter = None
+
+
+def init_tracing(tracing_settings: TracingSettings) -> bool:
+    """Установить TracerProvider с сэмплированием и выбранным экспортёром"""
+    enabled = _install_provider(tracing_settings)
+    # Без провайдера обёртки @traced, спаны SQL и start_span ничего не делают
+    set_tracing_enabled(enabled)
+    return enabled
+
+
+def _install_provider(tracing_settings: TracingSettings) -> bool:
+    if not tracing_settings.enabled:
+        return False
+    if not AVAILABLE:
+        logger.warning("opentelemetry-api is not installed, tracing disabled")
+        return False
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("opentelemetry-sdk is not installed, tracing disabled")
+        return False
+
+    exporter = _build_exporter(tracing_settings)
+    if exporter is None:
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": tracing_settings.service_name}),
+        # Решение о сэмплировании принимает бот, если он передал traceparent
+        sampler=ParentBased(TraceIdRatioBased(tracing_settings.sample_ratio)),
+    )
+    if tracing_settings.exporter == "memory":
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    logger.info(
+        f"Tracing enabled: exporter={tracing_settings.exporter}, "
+        f"sample_ratio={tracing_settings.sample_ratio}"
+    )
+    return True
+
+
+def get_memory_exporter():
+    """Экспортёр TRACING_EXPORTER=memory - для проверки спанов без коллектора"""
+    return _memory_exporter
+
+
+def _build_exporter(tracing_settings: TracingSettings):
+    global _memory_exporter
+
+    if tracing_settings.exporter == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        _memory_exporter = InMemorySpanExporter()
+        return _memory_exporter
+    if tracing_settings.exporter == "file":
+        return _json_lines_exporter(tracing_settings.file_path)
+    if tracing_settings.exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    if tracing_settings.exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp is not installed, tracing disabled")
+            return None
+        return OTLPSpanExporter()
+
+    logger.warning(f"Unknown TRACING_EXPORTER '{tracing_settings.exporter}', tracing disabled")
+    return None
+
+
+def _json_lines_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        """Пишет спаны в файл по одному JSON на строку"""
+
+        def __init__(self, file_path: str):
+            self._file = open(file_path, "a", encoding="utf-8")
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence) -> "SpanExportResult":
+            lines = [span.to_json(indent=None) for span in spans]
+            with self._lock:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            with self._lock:
+                self._file.close()
+
+        def force_flush(self, timeout_millis: Optional[int] = None) -> bool:
+            return True
+
+    return JsonLinesSpanExporter(path)
@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+# Настройки читаются из окружения при импорте src.config, поэтому до импорта приложения
+os.environ.setdefault("IS_TESTING", "True")
+os.environ.setdefault("DB_USER", "user")
+os.environ.setdefault("DB_PASSWORD", "password")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_TEST_NAME", "magics_service_database_test")
+os.environ.setdefault("DB_POOL_WARMUP", "1")
+os.environ.setdefault("REDIS_DB", "1")
+os.environ.setdefault("REDIS_PASSWORD", "password")
+os.environ.setdefault("API_IP", "127.0.0.1")
+os.environ.setdefault("SCHEDULER_ENABLED", "False")
+
+import asyncpg
+import httpx
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Тестовая БД с применёнными миграциями; без Postgres тесты с БД пропускаются"""
+    from database.database import ensure_database
+    from src.config import settings
+
+    try:
+        asyncio.run(ensure_database(settings.db))
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres is not available: {e}")
+
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(os.path.join(PROJECT_ROOT, "alembic.ini")), "head")
+
+
+@pytest.fixture
+async def client(database):
+    """Клиент приложения через ASGITransport: запросы выполняются в контексте теста"""
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
@@ -0,0 +1,75 @@
+"""Число SQL-запросов горячих эндпоинтов: рост ловит N+1 и лишние чтения до релиза"""
+
+import uuid
+
+import pytest
+
+from database.query_stats import assert_max_queries
+
+pytestmark = pytest.mark.anyio
+
+CONFIGS = "/api/v1/feature-configs"
+
+
+async def _create_config(client) -> str:
+    response = await client.post(
+        f"{CONFIGS}/", json={"name": f"config-{uuid.uuid4().hex[:12]}", "environment": "testing"}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def _create_feature(client) -> str:
+    response = await client.post(
+        "/api/v1/feature-flags/", json={"name": f"feature-{uuid.uuid4().hex[:12]}"}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def _add_feature(client, config_id: str, feature_id: str):
+    response = await client.post(
+        f"{CONFIGS}/{config_id}/features", json={"feature_id": feature_id, "is_enabled": True}
+    )
+    assert response.status_code == 201, response.text
+
+
+async def test_get_config_reads_config_in_one_round_per_relation(client):
+    config_id = await _create_config(client)
+    for _ in range(3):
+        await _add_feature(client, config_id, await _create_feature(client))
+
+    # Конфигурация, привязки, функции привязок, версии - независимо от числа функций
+    with assert_max_queries(4):
+        response = await client.get(f"{CONFIGS}/{config_id}")
+    assert response.status_code == 200
+    assert len(response.json()["features"]) == 3
+
+
+async def test_get_config_cache_hit_does_not_query(client):
+    config_id = await _create_config(client)
+    await client.get(f"{CONFIGS}/{config_id}")
+
+    with assert_max_queries(0):
+        response = await client.get(f"{CONFIGS}/{config_id}")
+    assert response.status_code == 200
+
+
+async def test_update_config(client):
+    config_id = await _create_config(client)
+
+    # Чтение конфигурации (4), UPDATE, последняя версия, INSERT версии, событие аудита
+    with assert_max_queries(8):
+        response = await client.put(f"{CONFIGS}/{config_id}", json={"description": "updated"})
+    assert response.status_code == 200
+    assert response.json()["description"] == "updated"
+
+
+async def test_add_feature_to_config(client):
+    config_id = await _create_config(client)
+    await _add_feature(client, config_id, await _create_feature(client))
+    feature_id = await _create_feature(client)
+
+    # Проверка привязки, INSERT, функция привязки, версия (2), аудит, полная конфигурация (4)
+    with assert_max_queries(10):
+        await _add_feature(client, config_id, feature_id)
@@ -0,0 +1,89 @@
+import hashlib
+import uuid
+
+import numpy as np
+import pytest
+
+from api.v1.feature import rollout
+
+SALT = "3f0c2a9e-5b1d-4c7e-9a8f-2d6b4e1c0a57"
+EDGE_USER_IDS = [0, 1, -1, 42, 2**31, -(2**31), 2**63 - 1, -(2**63)]
+
+
+def test_splitmix64_matches_reference_output():
+    # Первое значение эталонного SplitMix64 с нулевым состоянием
+    assert rollout.splitmix64(0) == 0xE220A8397B1DCDAF
+
+
+def test_salt_key_is_little_endian_sha256_prefix():
+    digest = hashlib.sha256(SALT.encode()).digest()
+    assert rollout.salt_key(SALT) == int.from_bytes(digest[:8], "little")
+
+
+def test_effective_salt_defaults_to_feature_id():
+    feature_id = uuid.uuid4()
+    assert rollout.effective_salt(feature_id, None) == str(feature_id)
+    assert rollout.effective_salt(feature_id, "") == str(feature_id)
+    assert rollout.effective_salt(feature_id, "custom") == "custom"
+
+
+@pytest.mark.parametrize(
+    "percentage, expected",
+    [
+        (0, 0),
+        (0.004, 0),
+        (0.005, 1),
+        (0.015, 2),
+        (0.025, 3),
+        (0.006, 1),
+        (12.34, 1234),
+        (0.29, 29),
+        (100, 10_000),
+        (150, 10_000),
+    ],
+)
+def test_threshold(percentage, expected):
+    assert rollout.threshold(percentage) == expected
+
+
+def test_negative_user_ids_are_reinterpreted_as_uint64():
+    assert rollout.bucket(-1, SALT) == (
+        rollout.splitmix64(rollout.MASK64 ^ rollout.salt_key(SALT)) % rollout.BUCKETS
+    )
+
+
+def test_vectorized_buckets_match_scalar():
+    user_ids = np.array(EDGE_USER_IDS + list(range(-500, 500)), dtype=np.int64)
+    expected = [rollout.bucket(int(user_id), SALT) for user_id in user_ids]
+    assert rollout.buckets(user_ids, SALT).tolist() == expected
+
+
+def test_bucket_depends_on_salt():
+    user_ids = np.arange(1000, dtype=np.int64)
+    assert not np.array_equal(rollout.buckets(user_ids, SALT), rollout.buckets(user_ids, "other"))
+
+
+def test_rollout_share_follows_percentage():
+    user_ids = np.arange(200_000, dtype=np.int64)
+    enabled = rollout.buckets(user_ids, SALT) < rollout.threshold(25)
+    assert abs(enabled.mean() - 0.25) < 0.01
+
+
+def test_evaluate_batch_matches_single_user_evaluation():
+    user_ids = np.array(EDGE_USER_IDS + list(range(1000)), dtype=np.int64)
+    bitmap, count = rollout.evaluate_batch(True, 30, user_ids, SALT)
+
+    expected = [rollout.is_enabled_for(True, 30, int(user_id), SALT) for user_id in user_ids]
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), bitorder="little")
+    assert bits[: len(user_ids)].astype(bool).tolist() == expected
+    assert not bits[len(user_ids) :].any()
+    assert count == sum(expected)
+
+
+@pytest.mark.parametrize(
+    "is_enabled, percentage, expected", [(False, 100, 0), (True, 0, 0), (True, 100, 10)]
+)
+def test_evaluate_batch_edge_percentages(is_enabled, percentage, expected):
+    bitmap, count = rollout.evaluate_batch(is_enabled, percentage, np.arange(10), SALT)
+    assert count == expected
+    assert len(bitmap) == 2
@@ -0,0 +1,145 @@
+import uuid
+
+import pytest
+
+from api.v1.feature import rollout
+from api.v1.feature.schemas import TargetingRules
+from api.v1.feature.targeting import CompiledRulesCache, compile_binding, compile_rules
+from database.models import FeatureConfig, FeatureConfigFlag, FeatureConfigVersion, FeatureFlag
+
+
+def _rules(*conditions, match="all") -> TargetingRules:
+    return TargetingRules.model_validate(
+        {
+            "match": match,
+            "conditions": [
+                {"attribute": attribute, "operator": operator, "value": value}
+                for attribute, operator, value in conditions
+            ],
+        }
+    )
+
+
+def _binding(**fields) -> FeatureConfigFlag:
+    fields.setdefault("is_enabled", True)
+    fields.setdefault("rollout_percentage", 100.0)
+    return FeatureConfigFlag(config_id=uuid.uuid4(), feature_id=uuid.uuid4(), **fields)
+
+
+@pytest.mark.parametrize("rules", [None, TargetingRules()])
+def test_compile_rules_without_conditions(rules):
+    assert compile_rules(rules) is None
+
+
+@pytest.mark.parametrize(
+    "operator, value, context, expected",
+    [
+        ("eq", "group", {"chat_type": "group"}, True),
+        ("eq", "group", {"chat_type": "private"}, False),
+        ("ne", "group", {"chat_type": "private"}, True),
+        ("in", ["group", "supergroup"], {"chat_type": "supergroup"}, True),
+        ("in", ["group", "supergroup"], {"chat_type": "private"}, False),
+        ("not_in", ["group"], {"chat_type": "private"}, True),
+        ("not_in", ["group"], {"chat_type": "group"}, False),
+        ("gt", 10, {"chat_type": 11}, True),
+        ("gte", 10, {"chat_type": 10}, True),
+        ("lt", 10, {"chat_type": 10}, False),
+        ("lte", 10, {"chat_type": 10}, True),
+        ("exists", True, {"chat_type": None}, True),
+        ("exists", True, {}, False),
+        ("exists", False, {}, True),
+    ],
+)
+def test_compile_rules_operators(operator, value, context, expected):
+    predicate = compile_rules(_rules(("chat_type", operator, value)))
+    assert predicate(context) is expected
+
+
+@pytest.mark.parametrize("operator, value", [("ne", "group"), ("not_in", ["group"]), ("lt", 5)])
+def test_missing_attribute_never_matches(operator, value):
+    assert compile_rules(_rules(("chat_type", operator, value)))({}) is False
+
+
+@pytest.mark.parametrize(
+    "operator, value, actual",
+    [("gt", 10, "eleven"), ("in", ["group"], ["group"]), ("not_in", ["group"], {"a": 1})],
+)
+def test_incomparable_context_value_does_not_match(operator, value, actual):
+    assert compile_rules(_rules(("chat_type", operator, value)))({"chat_type": actual}) is False
+
+
+def test_match_all_and_any():
+    conditions = (("chat_type", "eq", "group"), ("members", "gte", 100))
+    context = {"chat_type": "group", "members": 10}
+    assert compile_rules(_rules(*conditions, match="all"))(context) is False
+    assert compile_rules(_rules(*conditions, match="any"))(context) is True
+    assert compile_rules(_rules(*conditions, match="any"))({"members": 1}) is False
+
+
+def test_disabled_binding_is_always_off():
+    predicate = compile_binding(_binding(is_enabled=False))
+    assert predicate({"user_id": 1}) is False
+
+
+def test_full_rollout_without_rules_ignores_user_id():
+    assert compile_binding(_binding())({}) is True
+
+
+def test_binding_rules_are_read_from_json():
+    rules = _rules(("chat_type", "in", ["group"])).model_dump(mode="json")
+    predicate = compile_binding(_binding(rules=rules))
+    assert predicate({"chat_type": "group"}) is True
+    assert predicate({"chat_type": "private"}) is False
+
+
+@pytest.mark.parametrize("salt", [None, "custom-salt"])
+def test_partial_rollout_matches_rollout_module(salt):
+    binding = _binding(rollout_percentage=35.5, rollout_salt=salt)
+    predicate = compile_binding(binding)
+    effective_salt = rollout.effective_salt(binding.feature_id, salt)
+    for user_id in [*range(-200, 200), 2**63 - 1, -(2**63)]:
+        assert predicate({"user_id": user_id}) is rollout.is_enabled_for(
+            True, 35.5, user_id, effective_salt
+        )
+
+
+@pytest.mark.parametrize("context", [{}, {"user_id": "42"}, {"user_id": None}])
+def test_partial_rollout_requires_integer_user_id(context):
+    assert compile_binding(_binding(rollout_percentage=99.99))(context) is False
+
+
+def test_rules_are_checked_before_rollout():
+    rules = _rules(("chat_type", "eq", "group")).model_dump(mode="json")
+    predicate = compile_binding(_binding(rollout_percentage=99.99, rules=rules))
+    group = [predicate({"user_id": user_id, "chat_type": "group"}) for user_id in range(100)]
+    private = [predicate({"user_id": user_id, "chat_type": "private"}) for user_id in range(100)]
+    assert any(group)
+    assert not any(private)
+
+
+def _config(feature_name: str) -> FeatureConfig:
+    feature = FeatureFlag(id=uuid.uuid4(), name=feature_name)
+    binding = _binding(feature=feature)
+    return FeatureConfig(
+        id=uuid.uuid4(), features=[binding], versions=[FeatureConfigVersion(version_number=1)]
+    )
+
+
+def test_rules_cache_recompiles_after_clear():
+    # Переименование функции не создаёт версию: сервис очищает кэш после коммита
+    cache = CompiledRulesCache(max_entries=8, ttl=60)
+    config = _config("old")
+    assert cache.get(config).evaluate({}) == {"old": True}
+    assert cache.lookup(config.id, 1) is not None
+
+    cache.clear()
+    assert cache.lookup(config.id, 1) is None
+    config.features[0].feature.name = "new"
+    assert cache.get(config).evaluate({}) == {"new": True}
+
+
+def test_rules_cache_entries_expire():
+    cache = CompiledRulesCache(max_entries=8, ttl=0)
+    config = _config("feature")
+    cache.get(config)
+    assert cache.lookup(config.id, 1) is None